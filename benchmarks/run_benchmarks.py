@@ -0,0 +1,226 @@
+"""
+Phase-level benchmarks for gocam_unwinder on synthetic GO-CAM models.
+
+Generates models of increasing size with gocam_unwinder.synthetic, times each phase of the
+analysis and split separately, and prints a scaling table. With --models-dir, the models in a
+directory are timed too. Timings can be saved as a baseline and later runs compared against
+it; the script exits non-zero if any phase regressed.
+
+The committed benchmarks/baseline.json was recorded with the default sizes and the test models:
+
+    python benchmarks/run_benchmarks.py -o target/go_20250601.json --models-dir resources/test \
+        --save-baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py -o target/go_20250601.json --models-dir resources/test \
+        --baseline benchmarks/baseline.json
+"""
+import argparse
+import contextlib
+import gc
+import glob
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from gocam_unwinder.gocam_ttl import GoCamGraph, GoCamGraphBuilder  # noqa: E402
+from gocam_unwinder.serializers import OUTPUT_EXTENSIONS, OUTPUT_FORMATS  # noqa: E402
+from gocam_unwinder.synthetic import write_gocam_ttl  # noqa: E402
+
+PHASES = ["parse", "extract_edges", "build_components", "filter", "split", "serialize"]
+# Phases faster than this are too noisy to flag as regressions
+MIN_REGRESSION_SECONDS = 0.005
+
+
+@contextlib.contextmanager
+def timed(timings, phase):
+    # Collect first so one phase's garbage isn't charged to the next one
+    gc.collect()
+    start = time.perf_counter()
+    yield
+    timings[phase] = time.perf_counter() - start
+
+
+def time_phases(builder: GoCamGraphBuilder, model_file, output_file, output_format="ttl"):
+    """
+    Run the parse_ttl and split_evidence_and_write_ttl steps one phase at a time.
+
+    Returns: dict of phase name to elapsed seconds, and the analyzed GoCamGraph
+    """
+    timings = {}
+    with timed(timings, "parse"):
+        gocam = GoCamGraph()
+        gocam.g.parse(model_file, format="ttl")
+        gocam.build_index()
+        gocam.title = gocam.get_title()
+    with timed(timings, "extract_edges"):
+        edges = gocam.extract_edges()
+    with timed(timings, "build_components"):
+        gocam.standard_annotations = []
+        gocam.extract_standard_annotations(edges)
+    with timed(timings, "filter"):
+        gocam = builder.filter_out_non_std_annotations(gocam)
+    with timed(timings, "split"):
+        gocam.split_evidence()
+    with timed(timings, "serialize"):
+        gocam.write_ttl(output_file, output_format)
+    return timings, gocam
+
+
+def run_benchmarks(builder, sizes, params, repeat=3, output_format="ttl"):
+    """
+    Returns: list of result dicts, one per size, with the best-of-repeat time of each phase
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            model_file = os.path.join(tmp_dir, f"synthetic_{size}.ttl")
+            output_file = os.path.join(tmp_dir, f"synthetic_{size}_split{OUTPUT_EXTENSIONS[output_format]}")
+            write_gocam_ttl(model_file, annotations=size, **params)
+            best = {}
+            for _ in range(repeat):
+                timings, gocam = time_phases(builder, model_file, output_file, output_format)
+                for phase, elapsed in timings.items():
+                    best[phase] = min(best.get(phase, elapsed), elapsed)
+            results.append({
+                "annotations": size,
+                "triples": len(gocam.g),
+                "standard_annotations": len(gocam.standard_annotations),
+                "phases": best,
+            })
+    return results
+
+
+def run_model_benchmarks(builder, model_files, repeat=3, output_format="ttl"):
+    """
+    Returns: list of result dicts, one per model file, with the best-of-repeat time of each phase
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for model_file in model_files:
+            output_file = os.path.join(tmp_dir, f"model_split{OUTPUT_EXTENSIONS[output_format]}")
+            best = {}
+            for _ in range(repeat):
+                timings, gocam = time_phases(builder, model_file, output_file, output_format)
+                for phase, elapsed in timings.items():
+                    best[phase] = min(best.get(phase, elapsed), elapsed)
+            results.append({
+                "model": os.path.basename(model_file),
+                "triples": len(gocam.g),
+                "standard_annotations": len(gocam.standard_annotations),
+                "phases": best,
+            })
+    return results
+
+
+def scaling_exponent(results, phase):
+    # Slope of log(time) against log(size) between the smallest and largest runs, ~1 for linear
+    first, last = results[0], results[-1]
+    t0, t1 = first["phases"][phase], last["phases"][phase]
+    if len(results) < 2 or t0 <= 0 or t1 <= 0:
+        return None
+    return math.log(t1 / t0) / math.log(last["annotations"] / first["annotations"])
+
+
+def print_table(results, file=sys.stdout, key="annotations"):
+    print("\t".join([key, "triples"] + PHASES + ["total"]), file=file)
+    for result in results:
+        phases = result["phases"]
+        print("\t".join([str(result[key]), str(result["triples"])] +
+                        [f"{phases[phase] * 1000:.1f}ms" for phase in PHASES] +
+                        [f"{sum(phases.values()) * 1000:.1f}ms"]), file=file)
+    if key != "annotations":
+        return
+    exponents = [scaling_exponent(results, phase) for phase in PHASES]
+    print("\t".join(["scaling", ""] + ["-" if e is None else f"n^{e:.2f}" for e in exponents]), file=file)
+
+
+def compare_to_baseline(results, baseline_results, tolerance, key="annotations"):
+    """
+    Returns: list of regression messages for phases slower than baseline by more than tolerance
+    key: "annotations" for synthetic results, "model" for results of --models-dir
+    """
+    baseline_by_key = {result[key]: result["phases"] for result in baseline_results}
+    label = "{} annotations" if key == "annotations" else "{}"
+    regressions = []
+    for result in results:
+        baseline_phases = baseline_by_key.get(result[key])
+        if baseline_phases is None:
+            continue
+        for phase in PHASES:
+            elapsed, expected = result["phases"][phase], baseline_phases.get(phase)
+            if expected is None or elapsed < MIN_REGRESSION_SECONDS:
+                continue
+            if elapsed > expected * (1 + tolerance):
+                regressions.append(f"{phase} at {label.format(result[key])}: "
+                                   f"{elapsed * 1000:.1f}ms vs baseline {expected * 1000:.1f}ms")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time each gocam_unwinder phase on synthetic models")
+    parser.add_argument('-o', '--ontology_file', help="Path to the GO ontology json file", required=True)
+    parser.add_argument('--ontology-cache', help="Directory for compiled ontology caches")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 400, 1600],
+                        help="Annotation counts to generate (default: 100 400 1600)")
+    parser.add_argument('--edges-per-annotation', type=int, default=3)
+    parser.add_argument('--evidence-per-edge', type=int, default=2)
+    parser.add_argument('--chain-depth', type=int, default=1)
+    parser.add_argument('--metadata-collision-rate', type=float, default=0.9)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--models-dir', help="Also time each .ttl model in this directory")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per size; the fastest is kept")
+    parser.add_argument('--output-format', choices=OUTPUT_FORMATS, default="ttl")
+    parser.add_argument('--baseline', help="Baseline JSON file to compare against")
+    parser.add_argument('--save-baseline', help="Write this run's timings to a baseline JSON file")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed slowdown against the baseline as a fraction (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    params = {
+        "edges_per_annotation": args.edges_per_annotation,
+        "evidence_per_edge": args.evidence_per_edge,
+        "chain_depth": args.chain_depth,
+        "metadata_collision_rate": args.metadata_collision_rate,
+        "seed": args.seed,
+    }
+    builder = GoCamGraphBuilder(args.ontology_file, ontology_cache=args.ontology_cache)
+    results = run_benchmarks(builder, sorted(args.sizes), params, args.repeat, args.output_format)
+    print_table(results)
+    model_results = []
+    if args.models_dir:
+        model_files = sorted(glob.glob(os.path.join(args.models_dir, "*.ttl")))
+        model_results = run_model_benchmarks(builder, model_files, args.repeat, args.output_format)
+        print(file=sys.stdout)
+        print_table(model_results, key="model")
+
+    if args.save_baseline:
+        # Timings only compare meaningfully on the machine that recorded them
+        environment = {"python": platform.python_version(), "platform": platform.platform(),
+                       "cpu_count": os.cpu_count()}
+        with open(args.save_baseline, 'w') as f:
+            json.dump({"params": params, "output_format": args.output_format, "environment": environment,
+                       "results": results, "model_results": model_results}, f, indent=2)
+            f.write("\n")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["params"] != params or baseline["output_format"] != args.output_format:
+            print("Baseline was recorded with different parameters, not comparing", file=sys.stderr)
+            return 0
+        regressions = compare_to_baseline(results, baseline["results"], args.tolerance)
+        regressions += compare_to_baseline(model_results, baseline.get("model_results", []), args.tolerance,
+                                           key="model")
+        for regression in regressions:
+            print(f"REGRESSION: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,5 +3,13 @@ from setuptools import setup, find_packages
 setup(
     name='gocam-evidence-unwinder',
     packages=find_packages(where='src'),
-    package_dir={'': 'src'}
-)
\ No newline at end of file
+    package_dir={'': 'src'},
+    install_requires=['rdflib', 'ontobio>=2.8.8', 'numpy'],
+    extras_require={
+        # --export-columns to .parquet files
+        'parquet': ['pyarrow'],
+    },
+    entry_points={
+        'console_scripts': ['gocam-unwinder=gocam_unwinder.cli:main'],
+    }
+)
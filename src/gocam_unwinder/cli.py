@@ -0,0 +1,517 @@
+import argparse
+import collections
+import heapq
+import importlib.util
+import json
+import math
+import multiprocessing
+import os
+import shutil
+import sys
+
+# Only lightweight imports at module level: rdflib and ontobio are imported by main() once
+# arguments are parsed, so --help and argument errors return immediately.
+from .report import REPORT_HEADERS
+
+parser = argparse.ArgumentParser(prog="gocam-unwinder", epilog="Subcommands: 'gocam-unwinder aggregate' summarizes an --export-columns table across the corpus, and 'gocam-unwinder merge-reports' combines the --report-file outputs of --shard runs. Run them with --help for details.")
+parser.add_argument('-m', '--model_filename', help="Single GO-CAM model file to process (.ttl, .ttl.gz or .ttl.bz2)")
+parser.add_argument('-d', '--models_folder', help="Directory containing GO-CAM model files (.ttl, .ttl.gz or .ttl.bz2), or a tar archive of them (optionally compressed), which is read without extracting it")
+parser.add_argument('-l', '--pathway_id_list', help="File containing list of model IDs (one per line) to filter processing")
+parser.add_argument('-o', '--ontology_filename', help="GO ontology filename (JSON format)")
+parser.add_argument('--split-evidence', action='store_true', help="Split multi-evidence edges into separate edges")
+parser.add_argument('--output-dir', help="Output directory for split evidence files")
+parser.add_argument('--dry-run', action='store_true', help="With --split-evidence, only report how many axioms and individuals splitting would add to each model, without writing anything")
+parser.add_argument('--link-unchanged', action='store_true', help="With --split-evidence, hard-link models that splitting doesn't change into the output instead of copying them (Turtle output only)")
+parser.add_argument('--report-file', help="Output file for statistics report (TSV format). If not specified, output goes to stdout.")
+parser.add_argument('--ontology-cache', help="Directory for a compiled molecular function lookup, built from the ontology on first use and reused while the ontology file is unchanged")
+parser.add_argument('--model-cache', help="Directory for a binary cache of parsed models, keyed by model content. Models parsed with rdflib are loaded from it instead of re-parsing their Turtle")
+parser.add_argument('--model-cache-max-mb', type=float, metavar='MB', help="With --model-cache, evict the least recently used entries after the run until the cache is no larger than MB megabytes")
+parser.add_argument('--graph-backend', choices=["rdflib", "dict"], default="rdflib", help="Graph that models parsed with rdflib are held in: 'rdflib' (default) is an rdflib Graph; 'dict' is a leaner dict-indexed graph that analyzes and splits models the same way, faster")
+parser.add_argument('--spill-triples', type=int, metavar='N', help="Parse models with more than N triples into a temporary SQLite database on disk instead of memory (0: every model). Slower, but keeps memory use low for very large models")
+parser.add_argument('--spill-dir', help="With --spill-triples, directory for the temporary databases (default: the system temp directory)")
+parser.add_argument('--incremental', action='store_true', help="Keep a manifest in --output-dir and skip models that are unchanged since the last (possibly interrupted) run, reusing their report rows")
+parser.add_argument('--reader', choices=["auto", "rdflib", "stream"], default="auto", help="How to read models: 'auto' (default) and 'stream' use a lightweight scanner instead of a full rdflib Graph, parsing a model with rdflib only when splitting changes it or the scanner can't read it; 'rdflib' always builds the Graph")
+parser.add_argument('--output-format', choices=["ttl", "ttl-fast", "nt", "patch", "sparql"], default="ttl", help="Format of split output: 'ttl' (default) is rdflib's pretty Turtle; 'ttl-fast' (flat Turtle) and 'nt' (N-Triples) are streamed and much faster on large models; 'sparql' writes only the triples the split adds and removes, as a SPARQL Update (.ru) per model that any triple store holding the models can run, plus a combined --corpus-patch; 'patch' writes the same changes as an RDF Patch (.rdfp), which only this tool's rdf_patch.apply_patch can apply")
+parser.add_argument('--corpus-patch', metavar='FILE', help="With --output-format sparql or patch, file for the combined update of every model (default: corpus.ru or corpus.rdfp in --output-dir)")
+parser.add_argument('--export-columns', metavar='FILE', help="Write every model's edges and evidence to a columnar table: FILE.npz (NumPy), or FILE.parquet (plus FILE.evidence.parquet; requires pyarrow). Summarize it with 'gocam-unwinder aggregate FILE'")
+parser.add_argument('--profile', help="Write a JSON-lines record per processed model with wall and CPU time per phase, graph counts and peak memory to this file")
+parser.add_argument('--profile-tracemalloc', action='store_true', help="With --profile, also record each model's peak Python allocations using tracemalloc (slow)")
+parser.add_argument('--profile-slowest', type=int, default=0, metavar='N', help="With --profile, re-run the N slowest models under cProfile and write their stats next to the profile file")
+parser.add_argument('--serve', choices=["stdio", "http"], help="Keep the ontology loaded and serve analyze/split requests instead of processing -m/-d: 'stdio' reads JSON-lines requests from stdin and writes responses to stdout, 'http' listens on --serve-address")
+parser.add_argument('--serve-address', default="127.0.0.1:8765", metavar='HOST:PORT', help="Address for --serve http (default: 127.0.0.1:8765)")
+parser.add_argument('--serve-workers', type=int, default=4, metavar='N', help="Requests handled at once by --serve stdio (default: 4)")
+parser.add_argument('--max-in-flight', type=int, metavar='N', help="Maximum number of models read ahead or being processed at once (default: 4 per job, at least 2)")
+parser.add_argument('--max-in-flight-mb', type=float, metavar='MB', help="Maximum size on disk, in megabytes, of the models read ahead or being processed at once. A larger model is processed on its own")
+parser.add_argument('--shard', metavar='i/N', help="Only process shard i of N (1 <= i <= N) of the -d models, so a corpus can be split across machines. Models are assigned by a hash of their model ID, which is the same on every machine")
+parser.add_argument('--shard-balance', choices=["hash", "size"], default="hash", help="With --shard, 'hash' (default) assigns each model by its ID alone; 'size' balances the shards' total file size, which requires every machine to see the same model files (directories only)")
+parser.add_argument('--sample', type=int, metavar='N', help="Only process a seeded random sample of N of the -d models, and estimate corpus totals and shares for the report columns with confidence intervals")
+parser.add_argument('--sample-fraction', type=float, metavar='F', help="Like --sample, with a sample of fraction F (0 < F <= 1) of the models")
+parser.add_argument('--sample-seed', type=int, default=0, help="With --sample, seed for drawing the sample (default: 0)")
+parser.add_argument('--sample-strata', type=int, default=1, metavar='K', help="With --sample, draw the sample from K strata of models of similar file size, so large and small models are both represented (default: 1, a simple random sample; directories only)")
+parser.add_argument('--sample-confidence', type=float, default=0.95, metavar='LEVEL', help="With --sample, confidence level of the intervals (default: 0.95)")
+parser.add_argument('--estimates-file', help="With --sample, output file for the estimates (TSV format). If not specified, they go to stderr")
+parser.add_argument('--model-timeout', type=float, metavar='SECONDS', help="Abort any model that takes longer than SECONDS to process, and carry on with the rest. Models run in worker processes (at least one, even without --jobs) so a stuck model can be stopped")
+parser.add_argument('--model-max-rss', type=float, metavar='MB', help="Abort any model whose worker process grows by more than MB megabytes of resident memory while processing it, and carry on with the rest (requires /proc, e.g. Linux)")
+parser.add_argument('--quarantine-report', metavar='FILE', help="With --model-timeout or --model-max-rss, write a JSON-lines record per aborted or failed model to FILE: the reason, the phase it was in, elapsed time, memory growth, file size and graph counts")
+parser.add_argument('-j', '--jobs', type=int, default=1, help="Number of worker processes for processing models in parallel (default: 1)")
+
+
+def write_cprofile_stats(builder, model_files, profile_filename, options):
+    """
+    Re-run model_files under cProfile, writing <profile file base>.<model id>.prof for each.
+
+    Split output goes to a temporary directory so the run's output is left untouched.
+    """
+    import cProfile
+    import tempfile
+    from .gocam_ttl import process_model_file
+    from .model_input import model_filename
+
+    options = dict(options)
+    for option in ("profile", "trace_memory", "edge_columns"):
+        options.pop(option, None)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        options["output_dir"] = tmp_dir
+        for model_file in model_files:
+            model_id = model_filename(model_file).split(".")[0]
+            stats_filename = f"{os.path.splitext(profile_filename)[0]}.{model_id}.prof"
+            profiler = cProfile.Profile()
+            profiler.runcall(process_model_file, builder, model_file, **options)
+            profiler.dump_stats(stats_filename)
+
+
+aggregate_parser = argparse.ArgumentParser(prog="gocam-unwinder aggregate", description="Corpus-wide distributions over an --export-columns table: evidence per edge, edges per annotation, multi-evidence edges by relation and evidence counts by type, contributor, source and provider")
+aggregate_parser.add_argument('columns_file', help="Table written by --export-columns (.npz or .parquet)")
+aggregate_parser.add_argument('--top', type=int, default=20, metavar='N', help="Rows in each ranked section (default: 20)")
+aggregate_parser.add_argument('--standard-only', action='store_true', help="Only count edges in standard annotations, and their evidence")
+aggregate_parser.add_argument('--json', action='store_true', help="Write the aggregates as JSON instead of tab-separated tables")
+
+
+def aggregate_main(argv):
+    args = aggregate_parser.parse_args(argv)
+    if args.columns_file.endswith(".parquet") and importlib.util.find_spec("pyarrow") is None:
+        aggregate_parser.error("Reading .parquet tables requires pyarrow")
+    from .columnar import aggregate, format_aggregates, read_columns
+
+    aggregates = aggregate(read_columns(args.columns_file), args.top, args.standard_only)
+    if args.json:
+        print(json.dumps(aggregates, indent=2))
+    else:
+        print(format_aggregates(aggregates))
+
+
+merge_parser = argparse.ArgumentParser(prog="gocam-unwinder merge-reports", description="Combine the --report-file outputs of --shard runs into one report sorted by model ID, with a final row of corpus totals. Fails without writing anything if a model is reported twice, or (with -d or -l) if a model is missing")
+merge_parser.add_argument('report_files', nargs='+', help="Shard reports to merge")
+merge_parser.add_argument('--output', help="Merged report file (default: stdout)")
+merge_parser.add_argument('-d', '--models_folder', help="Check the reports cover exactly the models in this directory or tar archive")
+merge_parser.add_argument('-l', '--pathway_id_list', help="Check the reports cover exactly these model IDs (with -d, the listed models in the directory)")
+merge_parser.add_argument('--no-totals', action='store_true', help="Don't add the totals row")
+
+
+def merge_reports_main(argv):
+    args = merge_parser.parse_args(argv)
+    from .model_input import iter_model_names
+    from .report import merge_reports, report_totals
+
+    expected = None
+    if args.models_folder:
+        expected = {name.split(".")[0] for name in iter_model_names(args.models_folder)}
+    if args.pathway_id_list:
+        with open(args.pathway_id_list) as f:
+            listed = {line.strip() for line in f if line.strip()}
+        expected = listed if expected is None else expected & listed
+    try:
+        rows, problems = merge_reports(args.report_files, expected)
+    except ValueError as e:
+        merge_parser.error(str(e))
+    if problems:
+        for problem in problems:
+            print(problem, file=sys.stderr)
+        sys.exit(f"merge-reports: {len(problems)} problems; nothing was written")
+    if not args.no_totals:
+        rows.append(report_totals(rows))
+
+    output = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        print("\t".join(REPORT_HEADERS), file=output)
+        for row in rows:
+            print("\t".join(row), file=output)
+    finally:
+        if args.output:
+            output.close()
+
+
+def write_estimates(sample, sampled_rows, args):
+    from .sampling import ESTIMATE_HEADERS, estimate_corpus
+    try:
+        estimates = estimate_corpus(sample, sampled_rows, args.sample_confidence)
+    except ValueError as e:
+        sys.exit(f"Can't estimate corpus totals: {e}")
+    estimates_file = open(args.estimates_file, 'w') if args.estimates_file else sys.stderr
+    try:
+        design = "simple random sample" if len(sample.strata) == 1 else f"{len(sample.strata)} size strata"
+        print(f"# Estimated from {sample.sample_size()} sampled of {sample.population_size()} models "
+              f"({design}, seed {sample.seed}, {args.sample_confidence:g} confidence)", file=estimates_file)
+        print("\t".join(ESTIMATE_HEADERS), file=estimates_file)
+        for row in estimates:
+            print("\t".join(row), file=estimates_file)
+    finally:
+        if args.estimates_file:
+            estimates_file.close()
+
+
+def remove_partial_output(model_file, output_filename):
+    """
+    Remove whatever split output an aborted model left behind, unless it is the model itself.
+    """
+    if not os.path.exists(output_filename):
+        return
+    if isinstance(model_file, str) and os.path.exists(model_file) and os.path.samefile(model_file, output_filename):
+        return
+    os.remove(output_filename)
+
+
+def open_model_cache(args):
+    if not args.model_cache:
+        return None
+    from .model_cache import ParsedModelCache
+    max_bytes = None if args.model_cache_max_mb is None else int(args.model_cache_max_mb * 1024 * 1024)
+    return ParsedModelCache(args.model_cache, max_bytes)
+
+
+def graph_store_factory(args):
+    if args.spill_triples is None:
+        return None
+    from .graph_store import SpillStoreFactory
+    return SpillStoreFactory(args.spill_triples, args.spill_dir)
+
+
+def serve(args):
+    from .server import UnwinderService, make_http_server, serve_jsonl
+
+    model_cache = open_model_cache(args)
+    service = UnwinderService(args.ontology_filename, args.ontology_cache, model_cache, args.reader, args.output_format,
+                              log=sys.stderr, graph_store=graph_store_factory(args), graph_backend=args.graph_backend)
+    try:
+        if args.serve == "stdio":
+            serve_jsonl(service, sys.stdin, sys.stdout, args.serve_workers)
+        else:
+            host, _, port = args.serve_address.rpartition(":")
+            server = make_http_server(service, host or "127.0.0.1", int(port))
+            print(f"Serving on http://{server.server_address[0]}:{server.server_address[1]}", file=sys.stderr,
+                  flush=True)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                server.server_close()
+    finally:
+        if model_cache:
+            model_cache.evict()
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "aggregate":
+        aggregate_main(argv[1:])
+        return
+    if argv and argv[0] == "merge-reports":
+        merge_reports_main(argv[1:])
+        return
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.jobs > 1 and "fork" not in multiprocessing.get_all_start_methods():
+        parser.error("--jobs requires a platform that supports forking worker processes")
+    if (args.dry_run or args.link_unchanged) and not args.split_evidence:
+        parser.error("--dry-run and --link-unchanged require --split-evidence")
+    shard = None
+    if args.shard:
+        from .sharding import parse_shard
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+        if not args.models_folder or args.model_filename:
+            parser.error("--shard requires -d")
+    if args.export_columns and args.incremental:
+        parser.error("--export-columns can't be used with --incremental, which skips unchanged models")
+    if args.export_columns and args.export_columns.endswith(".parquet") and importlib.util.find_spec("pyarrow") is None:
+        parser.error("--export-columns with a .parquet file requires pyarrow")
+    if args.dry_run and args.incremental:
+        parser.error("--dry-run can't be used with --incremental")
+    if args.incremental and not args.output_dir:
+        parser.error("--incremental requires --output-dir")
+    if (args.profile_tracemalloc or args.profile_slowest) and not args.profile:
+        parser.error("--profile-tracemalloc and --profile-slowest require --profile")
+    if args.serve_workers < 1:
+        parser.error("--serve-workers must be at least 1")
+    if args.max_in_flight is not None and args.max_in_flight < 1:
+        parser.error("--max-in-flight must be at least 1")
+    if args.model_cache_max_mb is not None and not args.model_cache:
+        parser.error("--model-cache-max-mb requires --model-cache")
+    if args.spill_dir and args.spill_triples is None:
+        parser.error("--spill-dir requires --spill-triples")
+    change_output = args.output_format in ("patch", "sparql")
+    if args.corpus_patch and not change_output:
+        parser.error("--corpus-patch requires --output-format sparql or patch")
+    if change_output and args.split_evidence and not args.dry_run and not (args.output_dir or args.corpus_patch):
+        parser.error(f"--output-format {args.output_format} requires --output-dir or --corpus-patch")
+    if args.spill_triples is not None and args.graph_backend != "rdflib":
+        parser.error("--spill-triples requires --graph-backend rdflib")
+    sampling = args.sample is not None or args.sample_fraction is not None
+    if args.sample is not None and args.sample_fraction is not None:
+        parser.error("--sample and --sample-fraction can't be used together")
+    if args.sample is not None and args.sample < 1:
+        parser.error("--sample must be at least 1")
+    if args.sample_fraction is not None and not 0 < args.sample_fraction <= 1:
+        parser.error("--sample-fraction must be more than 0 and at most 1")
+    if args.sample_strata < 1:
+        parser.error("--sample-strata must be at least 1")
+    if not 0 < args.sample_confidence < 1:
+        parser.error("--sample-confidence must be between 0 and 1")
+    if sampling and (not args.models_folder or args.model_filename):
+        parser.error("--sample and --sample-fraction require -d")
+    if args.estimates_file and not sampling:
+        parser.error("--estimates-file requires --sample or --sample-fraction")
+    watched = args.model_timeout is not None or args.model_max_rss is not None
+    if (args.model_timeout is not None and args.model_timeout <= 0) or \
+            (args.model_max_rss is not None and args.model_max_rss <= 0):
+        parser.error("--model-timeout and --model-max-rss must be positive")
+    if watched and "fork" not in multiprocessing.get_all_start_methods():
+        parser.error("--model-timeout and --model-max-rss require a platform that supports forking worker processes")
+    if args.quarantine_report and not watched:
+        parser.error("--quarantine-report requires --model-timeout or --model-max-rss")
+
+    if args.serve:
+        if args.model_filename or args.models_folder:
+            parser.error("--serve can't be used with -m or -d")
+        if watched:
+            parser.error("--model-timeout and --model-max-rss can't be used with --serve")
+        serve(args)
+        return
+
+    from .model_input import is_archive, iter_model_files, model_filename, strip_model_extension
+    archive_input = bool(args.models_folder and not args.model_filename and is_archive(args.models_folder))
+    if archive_input and args.shard_balance == "size" and shard:
+        parser.error("--shard-balance size can't be used with a tar archive")
+    if archive_input and sampling and args.sample_strata > 1:
+        parser.error("--sample-strata can't be used with a tar archive")
+    if archive_input and args.incremental:
+        parser.error("--incremental can't be used with a tar archive")
+    if archive_input and args.split_evidence and not args.dry_run and not args.output_dir:
+        parser.error("--split-evidence with a tar archive requires --output-dir")
+
+    from .gocam_ttl import GoCamGraphBuilder, collect_model_file, process_model_files_in_parallel, \
+        split_output_filename
+    from .pipeline import InFlightBudget, ModelReader
+    from .serializers import OUTPUT_EXTENSIONS
+    if args.model_max_rss is not None:
+        from .watchdog import rss_available
+        if not rss_available():
+            parser.error("--model-max-rss requires /proc to measure worker memory")
+
+    # Load model ID list if provided
+    model_id_filter = None
+    if args.pathway_id_list:
+        with open(args.pathway_id_list, 'r') as f:
+            model_id_filter = set(line.strip() for line in f if line.strip())
+    if shard:
+        from .sharding import HashShard, balance_by_size
+        index, count = shard
+        if args.shard_balance == "size":
+            model_sizes = [(strip_model_extension(os.path.basename(f)), os.path.getsize(f))
+                           for f in iter_model_files(args.models_folder, model_id_filter)]
+            model_id_filter = balance_by_size(model_sizes, count)[index]
+        else:
+            model_id_filter = HashShard(index, count, model_id_filter)
+    sample = None
+    if sampling:
+        from .model_input import iter_model_names
+        from .sampling import draw_sample
+        if archive_input:
+            # Archive members are listed from their headers; a simple random sample needs no sizes
+            model_sizes = [(strip_model_extension(f), 0) for f in iter_model_names(args.models_folder)
+                           if model_id_filter is None or strip_model_extension(f) in model_id_filter]
+        else:
+            model_sizes = [(strip_model_extension(os.path.basename(f)), os.path.getsize(f))
+                           for f in iter_model_files(args.models_folder, model_id_filter)]
+        population = len({model_id for model_id, _ in model_sizes})
+        sample_size = args.sample if args.sample is not None else max(1, math.ceil(args.sample_fraction * population))
+        sample = draw_sample(model_sizes, sample_size, args.sample_seed, args.sample_strata)
+        model_id_filter = sample
+
+    # Archive members are streamed one at a time, so model_files may be a generator
+    model_files = []
+    if args.model_filename:
+        model_files.append(args.model_filename)
+    elif args.models_folder:
+        model_files = iter_model_files(args.models_folder, model_id_filter)
+        if not archive_input:
+            # Sorted, since listdir order differs between file systems
+            model_files = sorted(model_files)
+
+    model_cache = open_model_cache(args)
+
+    go_cam_graph_builder = GoCamGraphBuilder(args.ontology_filename, args.ontology_cache, model_cache,
+                                             graph_store_factory(args), args.graph_backend)
+
+    # Open report file if specified, otherwise use stdout
+    report_file = None
+    if args.report_file:
+        report_file = open(args.report_file, 'w')
+        output = report_file
+    else:
+        output = sys.stdout
+
+    # Always print statistics header
+    print("\t".join(REPORT_HEADERS), file=output)
+
+    if args.output_dir and ((args.split_evidence and not args.dry_run) or args.incremental):
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    # Each model's patch is appended to the corpus patch in model order, so it can be applied in one go
+    corpus_patch = None
+    if change_output and args.split_evidence and not args.dry_run:
+        corpus_filename = args.corpus_patch or os.path.join(args.output_dir, "corpus" + OUTPUT_EXTENSIONS[args.output_format])
+        corpus_patch = open(corpus_filename, 'w', encoding="utf-8")
+
+    manifest = None
+    pending_files = model_files
+    current_files = set()
+    if args.incremental:
+        from .manifest import RunManifest
+        from .ontology_cache import ontology_digest
+        manifest = RunManifest(os.path.join(args.output_dir, RunManifest.FILENAME), ontology_digest(args.ontology_filename))
+        current_files = {f for f in model_files
+                         if manifest.is_current(f, args.split_evidence, split_output_filename(f, args.output_dir, args.output_format))}
+        pending_files = [f for f in model_files if f not in current_files]
+
+    # The run is a pipeline: the reader thread lists (or streams) and prefetches models, they are
+    # processed here or in the worker pool, and this thread writes the results. The budget
+    # bounds the models in between, so memory stays flat however large the corpus is.
+    max_in_flight = args.max_in_flight or max(2, 4 * args.jobs)
+    max_in_flight_bytes = None if args.max_in_flight_mb is None else int(args.max_in_flight_mb * 1024 * 1024)
+    reader = ModelReader(pending_files, InFlightBudget(max_in_flight, max_in_flight_bytes))
+
+    # Models handed out for processing, in order; results come back in the same order
+    issued = collections.deque()
+
+    def issue(files):
+        for f in files:
+            issued.append(f)
+            yield f
+
+    options = dict(split_evidence=args.split_evidence, output_dir=args.output_dir, reader=args.reader,
+                   output_format=args.output_format, dry_run=args.dry_run, link_unchanged=args.link_unchanged)
+    process = collect_model_file
+    profile_file = None
+    slowest = []  # heap of the --profile-slowest (wall time, sequence, model file)
+    if args.profile:
+        profile_file = open(args.profile, 'w')
+        options.update(profile=True, trace_memory=args.profile_tracemalloc)
+    corpus_columns = None
+    if args.export_columns:
+        from .columnar import CorpusColumns
+        corpus_columns = CorpusColumns()
+        options["edge_columns"] = True
+    quarantine_file = None
+    if watched:
+        from .watchdog import QuarantinedModel, process_model_files_watched
+        if args.quarantine_report:
+            quarantine_file = open(args.quarantine_report, 'w')
+        results = process_model_files_watched(go_cam_graph_builder, issue(reader), args.jobs, args.model_timeout,
+                                              args.model_max_rss, **options)
+    elif args.jobs > 1:
+        results = process_model_files_in_parallel(go_cam_graph_builder, issue(reader), args.jobs, process,
+                                                  **options)
+    else:
+        results = (process(go_cam_graph_builder, f, **options) for f in issue(reader))
+
+    def ordered_results():
+        # (model file, result) in model order, with a None result for models current in the manifest
+        if manifest is None:
+            for result in results:
+                yield issued.popleft(), result
+            return
+        for f in model_files:
+            if f in current_files:
+                yield f, None
+            else:
+                result = next(results)
+                yield issued.popleft(), result
+
+    sampled_rows = {}  # model ID -> report row, for --sample estimates
+
+    # Rows and split messages are written here, in model order, so parallel output never interleaves
+    try:
+        for sequence, (f, result) in enumerate(ordered_results()):
+            if watched and isinstance(result, QuarantinedModel):
+                # No row: the model is left out of the report and the manifest, so it is retried next run
+                print(result.message(), file=sys.stderr)
+                if quarantine_file:
+                    print(json.dumps(result.record()), file=quarantine_file, flush=True)
+                if args.split_evidence and not args.dry_run:
+                    remove_partial_output(f, split_output_filename(f, args.output_dir, args.output_format))
+                reader.task_done()
+                continue
+            if result is not None:
+                row, split_message, profile, edge_columns = result
+                if profile:
+                    print(json.dumps(profile.record()), file=profile_file, flush=True)
+                    # Keep only the slowest models (and their content, for archive members)
+                    heapq.heappush(slowest, (profile.wall, sequence, f))
+                    if len(slowest) > args.profile_slowest:
+                        heapq.heappop(slowest)
+                if edge_columns:
+                    corpus_columns.add(edge_columns)
+                if manifest:
+                    manifest.record(f, row, args.split_evidence, split_output_filename(f, args.output_dir, args.output_format))
+            else:
+                row, split_message = manifest.get_row(f), None
+            print("\t".join(row), file=output)
+            if sample:
+                sampled_rows[strip_model_extension(model_filename(f))] = row
+            if split_message:
+                print(split_message)
+            if corpus_patch:
+                # Models current in the manifest still have their patch from the earlier run
+                with open(split_output_filename(f, args.output_dir, args.output_format), encoding="utf-8") as model_patch:
+                    shutil.copyfileobj(model_patch, corpus_patch)
+            if result is not None:
+                reader.task_done()
+    finally:
+        # Lets the reader thread (and the pool feeding on it) stop if the run failed
+        reader.close()
+        if corpus_patch:
+            corpus_patch.close()
+        if quarantine_file:
+            quarantine_file.close()
+
+    if manifest:
+        manifest.close()
+
+    if sample:
+        write_estimates(sample, sampled_rows, args)
+
+    if corpus_columns:
+        corpus_columns.write(args.export_columns)
+
+    if model_cache:
+        model_cache.evict()
+
+    if profile_file:
+        profile_file.close()
+        if args.profile_slowest:
+            slowest_files = [f for _, _, f in sorted(slowest, reverse=True)]
+            write_cprofile_stats(go_cam_graph_builder, slowest_files, args.profile, options)
+
+    # Close report file if it was opened
+    if report_file:
+        report_file.close()
+
+
+if __name__ == "__main__":
+    main()
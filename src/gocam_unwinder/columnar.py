@@ -0,0 +1,254 @@
+from array import array
+
+import numpy as np
+
+CONTRIBUTOR = "http://purl.org/dc/elements/1.1/contributor"
+SOURCE = "http://purl.org/dc/elements/1.1/source"
+PROVIDED_BY = "http://purl.org/pav/providedBy"
+
+# Integer-coded columns index into the table's "strings" dictionary; -1 means missing
+EDGE_COLUMNS = ["edge_model", "edge_annotation", "edge_standard", "edge_relation", "edge_source_type",
+                "edge_target_type", "edge_evidence_count"]
+EVIDENCE_COLUMNS = ["evidence_edge", "evidence_type", "evidence_contributor", "evidence_source",
+                    "evidence_provided_by"]
+# Columns that are row numbers or counts rather than codes
+_UNCODED_COLUMNS = {"edge_annotation", "edge_standard", "edge_evidence_count", "evidence_edge"}
+
+
+class ModelEdgeColumns:
+    """
+    One model's edges and evidence as plain tuples, collected (e.g. in a worker process) before
+    the split changes the graph and added to a CorpusColumns table in the main process.
+    """
+    __slots__ = ("model_id", "edges", "evidence")
+
+    def __init__(self, model_id):
+        self.model_id = model_id
+        self.edges = []  # (annotation, is standard, relation, source type, target type, evidence count)
+        self.evidence = []  # (model edge index, evidence type, contributor, source, provided by)
+
+    def add_graph(self, gocam_graph):
+        signatures = gocam_graph.get_evidence_signatures()
+        annotations = [(annot, True) for annot in gocam_graph.standard_annotations]
+        annotations.extend((annot, False) for annot in gocam_graph.non_standard_annotations)
+        for annotation_index, (annot, standard) in enumerate(annotations):
+            for edge in annot.edges.values():
+                edge_index = len(self.edges)
+                evidence_uris = edge.evidence_uris
+                self.edges.append((annotation_index, standard, _str(edge.property_uri), _str(edge.source_type),
+                                   _str(edge.target_type), len(evidence_uris)))
+                for evidence_uri in evidence_uris:
+                    metadata = dict(signatures.get(evidence_uri, ()))
+                    self.evidence.append((edge_index, _str(gocam_graph.get_individual_type(evidence_uri)),
+                                          _first(metadata, CONTRIBUTOR), _first(metadata, SOURCE),
+                                          _first(metadata, PROVIDED_BY)))
+
+
+def _str(term):
+    return None if term is None else str(term)
+
+
+def _first(metadata, pred):
+    # An evidence individual with several contributors (etc.) is counted under the first
+    values = metadata.get(pred)
+    return values[0] if values else None
+
+
+class CorpusColumns:
+    """
+    Columnar edge and evidence tables for a whole corpus: one row per edge and one per evidence
+    link, with models, relations, types and agents integer-coded against a shared dictionary.
+    """
+    def __init__(self):
+        self.strings = {}  # string -> code, in code order
+        self.columns = {name: array('i') for name in EDGE_COLUMNS + EVIDENCE_COLUMNS}
+        self.annotations = 0
+
+    def code(self, value):
+        if value is None:
+            return -1
+        code = self.strings.get(value)
+        if code is None:
+            code = self.strings[value] = len(self.strings)
+        return code
+
+    def add(self, model_columns: ModelEdgeColumns):
+        columns = self.columns
+        code = self.code
+        model = code("gomodel:" + model_columns.model_id)
+        first_edge = len(columns["edge_model"])
+        annotations = 0
+        for annotation, standard, relation, source_type, target_type, evidence_count in model_columns.edges:
+            columns["edge_model"].append(model)
+            columns["edge_annotation"].append(self.annotations + annotation)
+            columns["edge_standard"].append(standard)
+            columns["edge_relation"].append(code(relation))
+            columns["edge_source_type"].append(code(source_type))
+            columns["edge_target_type"].append(code(target_type))
+            columns["edge_evidence_count"].append(evidence_count)
+            annotations = max(annotations, annotation + 1)
+        self.annotations += annotations
+        for edge, evidence_type, contributor, source, provided_by in model_columns.evidence:
+            columns["evidence_edge"].append(first_edge + edge)
+            columns["evidence_type"].append(code(evidence_type))
+            columns["evidence_contributor"].append(code(contributor))
+            columns["evidence_source"].append(code(source))
+            columns["evidence_provided_by"].append(code(provided_by))
+
+    def arrays(self):
+        """
+        Returns: dict of column name -> numpy array, plus the "strings" dictionary
+        """
+        arrays = {name: np.frombuffer(values, dtype=np.int32).copy() if len(values) else np.zeros(0, dtype=np.int32)
+                  for name, values in self.columns.items()}
+        arrays["edge_standard"] = arrays["edge_standard"].astype(np.int8)
+        arrays["strings"] = np.array(list(self.strings), dtype=str)
+        return arrays
+
+    def write(self, filename):
+        """
+        Write the tables to a .npz file, or to a pair of Parquet files (filename for the edges and
+        <name>.evidence.parquet next to it) if filename ends with .parquet, which requires pyarrow.
+        """
+        if filename.endswith(".parquet"):
+            write_parquet(self.arrays(), filename)
+        else:
+            np.savez_compressed(filename, **self.arrays())
+
+
+def evidence_parquet_filename(filename):
+    return filename[:-len(".parquet")] + ".evidence.parquet"
+
+
+def write_parquet(arrays, filename):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    strings = pa.array(arrays["strings"].tolist(), type=pa.string())
+
+    def table(names):
+        columns = {}
+        for name in names:
+            values = arrays[name]
+            if name in _UNCODED_COLUMNS:
+                columns[name] = pa.array(values)
+            else:
+                # Dictionary-encoded, with missing values as nulls
+                indices = pa.array(values, mask=values < 0, type=pa.int32())
+                columns[name] = pa.DictionaryArray.from_arrays(indices, strings)
+        return pa.table(columns)
+
+    pq.write_table(table(EDGE_COLUMNS), filename)
+    pq.write_table(table(EVIDENCE_COLUMNS), evidence_parquet_filename(filename))
+
+
+def read_parquet(filename):
+    import pyarrow.parquet as pq
+
+    strings = {}
+    arrays = {}
+    for names, path in ((EDGE_COLUMNS, filename), (EVIDENCE_COLUMNS, evidence_parquet_filename(filename))):
+        table = pq.read_table(path)
+        for name in names:
+            column = table.column(name).combine_chunks()
+            if name in _UNCODED_COLUMNS:
+                arrays[name] = column.to_numpy()
+                continue
+            column = column.dictionary_encode() if not hasattr(column, "dictionary") else column
+            # Map this column's dictionary onto the shared one
+            mapping = np.array([strings.setdefault(value, len(strings)) for value in column.dictionary.to_pylist()]
+                               + [-1], dtype=np.int32)
+            indices = column.indices.fill_null(-1).to_numpy().astype(np.int64)
+            arrays[name] = mapping[indices]
+    arrays["strings"] = np.array(list(strings), dtype=str)
+    return arrays
+
+
+def read_columns(filename):
+    """
+    Returns: dict of column name -> numpy array, as written by CorpusColumns.write
+    """
+    if filename.endswith(".parquet"):
+        return read_parquet(filename)
+    with np.load(filename) as data:
+        return {name: data[name] for name in data.files}
+
+
+def _histogram(values):
+    counts = np.bincount(values) if len(values) else np.zeros(0, dtype=np.int64)
+    return {int(value): int(count) for value, count in enumerate(counts) if count}
+
+
+def _top_counts(codes, strings, top):
+    codes = codes[codes >= 0]
+    counts = np.bincount(codes, minlength=len(strings)) if len(codes) else np.zeros(len(strings), dtype=np.int64)
+    order = np.argsort(-counts, kind="stable")[:top]
+    return [(str(strings[code]), int(counts[code])) for code in order if counts[code]]
+
+
+def aggregate(arrays, top=20, standard_only=False):
+    """
+    Corpus-wide distributions over the columnar tables, computed with numpy.
+
+    top: number of rows in each ranked section
+    standard_only: only count edges (and their evidence) in standard annotations
+    Returns: dict of section name -> histogram dict or ranked list of (label, count...) tuples
+    """
+    strings = arrays["strings"]
+    edge_mask = arrays["edge_standard"] == 1 if standard_only else np.ones(len(arrays["edge_model"]), dtype=bool)
+    evidence_mask = edge_mask[arrays["evidence_edge"]]
+    evidence_counts = arrays["edge_evidence_count"][edge_mask]
+    relations = arrays["edge_relation"][edge_mask]
+
+    annotation_sizes = np.bincount(arrays["edge_annotation"][edge_mask]) if edge_mask.any() else np.zeros(0, dtype=int)
+    multi = evidence_counts > 1
+    relation_rows = []
+    if len(relations):
+        valid = relations >= 0
+        edges_by_relation = np.bincount(relations[valid], minlength=len(strings))
+        multi_by_relation = np.bincount(relations[valid & multi], minlength=len(strings))
+        for code in np.argsort(-multi_by_relation, kind="stable")[:top]:
+            if edges_by_relation[code]:
+                relation_rows.append((str(strings[code]), int(edges_by_relation[code]), int(multi_by_relation[code]),
+                                      round(float(multi_by_relation[code] / edges_by_relation[code]), 4)))
+
+    return {
+        "models": int(len(np.unique(arrays["edge_model"][edge_mask]))),
+        "edges": int(edge_mask.sum()),
+        "evidence": int(evidence_mask.sum()),
+        "evidence_per_edge": _histogram(evidence_counts),
+        "edges_per_annotation": _histogram(annotation_sizes[annotation_sizes > 0]),
+        "multi_evidence_by_relation": relation_rows,
+        "evidence_by_type": _top_counts(arrays["evidence_type"][evidence_mask], strings, top),
+        "evidence_by_contributor": _top_counts(arrays["evidence_contributor"][evidence_mask], strings, top),
+        "evidence_by_source": _top_counts(arrays["evidence_source"][evidence_mask], strings, top),
+        "evidence_by_provided_by": _top_counts(arrays["evidence_provided_by"][evidence_mask], strings, top),
+    }
+
+
+SECTION_HEADERS = {
+    "evidence_per_edge": ("Evidence per edge", "Edges"),
+    "edges_per_annotation": ("Edges per annotation", "Annotations"),
+    "multi_evidence_by_relation": ("Relation", "Edges", "Multi-evidence edges", "Share"),
+    "evidence_by_type": ("Evidence type", "Evidence"),
+    "evidence_by_contributor": ("Contributor", "Evidence"),
+    "evidence_by_source": ("Source", "Evidence"),
+    "evidence_by_provided_by": ("Provided by", "Evidence"),
+}
+
+
+def format_aggregates(aggregates):
+    """
+    Returns: the aggregates as text, one tab-separated table per section
+    """
+    lines = [f"{aggregates['models']} models with edges, {aggregates['edges']} edges, "
+             f"{aggregates['evidence']} evidence links"]
+    for section, headers in SECTION_HEADERS.items():
+        lines.append("")
+        lines.append("\t".join(headers))
+        rows = aggregates[section]
+        if isinstance(rows, dict):
+            rows = rows.items()
+        for row in rows:
+            lines.append("\t".join(str(value) for value in row))
+    return "\n".join(lines)
@@ -1,67 +1,168 @@
-import argparse
+import gc
+import multiprocessing
 import os
-import sys
+import shutil
+from collections.abc import Mapping
 
-import ontobio.util.go_utils
 import rdflib
-from ontobio.rdfgen import relations
 from rdflib import URIRef
 from prefixcommons import curie_util
 from typing import List
 
-parser = argparse.ArgumentParser()
-parser.add_argument('-m', '--model_filename', help="Single GO-CAM model file to process")
-parser.add_argument('-d', '--models_folder', help="Directory containing GO-CAM model files")
-parser.add_argument('-l', '--pathway_id_list', help="File containing list of model IDs (one per line) to filter processing")
-parser.add_argument('-o', '--ontology_filename', help="GO ontology filename (JSON format)")
-parser.add_argument('--split-evidence', action='store_true', help="Split multi-evidence edges into separate edges")
-parser.add_argument('--output-dir', help="Output directory for split evidence files")
-parser.add_argument('--report-file', help="Output file for statistics report (TSV format). If not specified, output goes to stdout.")
-
-GOCAM_RELATIONS = [str(r) for r in relations.__relation_label_lookup.values()]
+from . import ontology_cache
+from .graph_backend import new_graph
+from .model_cache import ParsedModelCache
+from .model_input import ArchiveMember, is_compressed, model_filename, read_model_text, strip_model_extension
+from .ontology_cache import MolecularFunctionCache
+from .profiling import ModelProfile, phase
+from .rdf_patch import format_patch, format_sparql_update
+from .report import report_row
+from .serializers import CHANGE_OUTPUT_FORMATS, OUTPUT_EXTENSIONS, replacing, serialize
+from .triage import model_may_have_multi_evidence
+from .turtle_scan import TurtleScanner, TurtleSyntaxError
+
+# ontobio is slow to import, so it is only imported when the ontology or its relation list is needed
+PART_OF = URIRef("http://purl.obolibrary.org/obo/BFO_0000050")
+
+_gocam_relations = None
+
+
+def get_gocam_relations(cache_dir=None):
+    """
+    URIs of the GO-CAM relations defined by ontobio, loaded on first use.
+
+    With cache_dir, the list is read from (or written to) the ontology cache so that runs
+    using a compiled ontology cache don't import ontobio at all.
+    """
+    global _gocam_relations
+    if _gocam_relations is None and cache_dir:
+        _gocam_relations = ontology_cache.read_gocam_relations(cache_dir)
+    if _gocam_relations is None:
+        from ontobio.rdfgen import relations
+        _gocam_relations = [str(r) for r in relations.__relation_label_lookup.values()]
+        if cache_dir:
+            ontology_cache.write_gocam_relations(cache_dir, _gocam_relations)
+    return _gocam_relations
+
+
+def __getattr__(name):
+    # GOCAM_RELATIONS is resolved lazily to keep ontobio out of module import
+    if name == "GOCAM_RELATIONS":
+        return get_gocam_relations()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_by_bnode_id(table, bnode_id):
+    """
+    Look up a table keyed by axiom bnode using a bnode_id, the bnode's string form.
+    """
+    value = table.get(rdflib.BNode(bnode_id))
+    if value is None:
+        # Named axioms are keyed by URI, and relations without an axiom by None
+        value = table.get(None if bnode_id == "None" else URIRef(bnode_id))
+    return value
 
 
 class StandardAnnotationEdge:
+    """
+    An axiom edge and its evidence.
+
+    Slotted and holding only references to the graph's own terms: bnode_id is derived from
+    bnode rather than stored, and evidence_uris is a read-only tuple.
+    """
+    __slots__ = ("bnode", "source_uri", "property_uri", "target_uri", "source_type", "target_type", "_evidence_uris")
+
     def __init__(self, bnode: rdflib.term.BNode, source_uri: rdflib.term.URIRef, target_uri: rdflib.term.URIRef,
                  property_uri: rdflib.term.URIRef,
                  # contributors: List[rdflib.term.URIRef], date: str,
                  # provided_by: rdflib.term.URIRef, created: str = None, date_accepted: str = None
                  ):
-        self.bnode_id = str(bnode)
         self.bnode = bnode
         self.source_uri = source_uri
         self.property_uri = property_uri
         self.target_uri = target_uri
         self.source_type = None
         self.target_type = None
-        self.evidence_uris = []
+        self._evidence_uris = ()
         # self.contributors = contributors
         # self.date = date
         # self.created = created
         # self.date_accepted = date_accepted
         # self.provided_by = provided_by
 
+    @property
+    def bnode_id(self):
+        return str(self.bnode)
+
+    @property
+    def evidence_uris(self):
+        return self._evidence_uris
+
+    def add_evidence(self, evidence_uris):
+        self._evidence_uris += tuple(evidence_uris)
+
+
+class AnnotationEdges(Mapping):
+    """
+    Read-only view of a StandardAnnotation's edges keyed by bnode_id.
+    """
+    __slots__ = ("_edges",)
+
+    def __init__(self, edges):
+        self._edges = edges  # axiom bnode -> StandardAnnotationEdge
+
+    def __getitem__(self, bnode_id):
+        edge = get_by_bnode_id(self._edges, bnode_id)
+        if edge is None:
+            raise KeyError(bnode_id)
+        return edge
+
+    def __iter__(self):
+        return (str(bnode) for bnode in self._edges)
+
+    def __len__(self):
+        return len(self._edges)
+
+    def values(self):
+        return self._edges.values()
+
 
 class StandardAnnotation:
+    __slots__ = ("_edges", "_individuals")
+
     def __init__(self):
-        self.edges = {}  # keyed by bnodeID
-        self.individuals = set()
+        self._edges = {}  # keyed by axiom bnode
+        self._individuals = set()
+
+    @property
+    def edges(self):
+        return AnnotationEdges(self._edges)
+
+    @property
+    def individuals(self):
+        return frozenset(self._individuals)
+
+    def bnodes(self):
+        return self._edges.keys()
+
+    def get_edge(self, bnode):
+        return self._edges[bnode]
 
     def add_edge(self, edge: StandardAnnotationEdge):
-        self.edges[edge.bnode_id] = edge
-        self.individuals.add(edge.source_uri)
-        self.individuals.add(edge.target_uri)
+        self._edges[edge.bnode] = edge
+        self._individuals.add(edge.source_uri)
+        self._individuals.add(edge.target_uri)
 
     def get_evidence_uris(self):
         evidence_uris = set()
-        for edge in self.edges.values():
-            [evidence_uris.add(ev) for ev in edge.evidence_uris]
+        for edge in self._edges.values():
+            evidence_uris.update(edge.evidence_uris)
         return evidence_uris
 
     def __str__(self):
-        if self.edges:
+        if self._edges:
             edge_classes = set()
-            for bnode_id, e in self.edges.items():
+            for e in self._edges.values():
                 edge_classes.add(e.source_type)
                 edge_classes.add(e.target_type)
             return " ".join(edge_classes)
@@ -69,6 +170,212 @@ class StandardAnnotation:
             super()
 
 
+class AnnotationComponent:
+    """
+    Union-find node for grouping edges into connected components.
+
+    Edges are appended to parts in the order the component receives them. Merging appends
+    the other component's parts list as a single item, so a merge is O(1) and edges()
+    flattens the nesting without recursion.
+    """
+    def __init__(self, order):
+        self.parent = self
+        self.size = 1
+        self.order = order  # position in the annotation list
+        self.parts = []
+
+    def find(self):
+        root = self
+        while root.parent is not root:
+            root = root.parent
+        node = self
+        while node.parent is not root:
+            node.parent, node = root, node.parent
+        return root
+
+    def merge(self, other: 'AnnotationComponent'):
+        """
+        Merge another root component into this one. The merged component keeps this
+        component's order and edge order, followed by the other component's edges.
+        """
+        root, child = (self, other) if self.size >= other.size else (other, self)
+        child.parent = root
+        root.size += child.size
+        self.parts.append(other.parts)
+        root.parts = self.parts
+        root.order = self.order
+        return root
+
+    def edges(self):
+        stack = [iter(self.parts)]
+        while stack:
+            for part in stack[-1]:
+                if isinstance(part, list):
+                    stack.append(iter(part))
+                    break
+                yield part
+            else:
+                stack.pop()
+
+
+class GoCamGraphIndex:
+    """
+    Lookup tables over a GoCamGraph's triples, built once right after parsing.
+
+    Replaces repeated rdflib scans in the hot paths (axiom lookup, evidence, individual
+    types, edge and annotation lookups). Graph mutations made through GoCamGraph.add_triple
+    and GoCamGraph.remove_triple are mirrored here so the index stays in sync with the graph.
+    """
+    EVIDENCE_PRED = rdflib.URIRef("http://geneontology.org/lego/evidence")
+    AXIOM_PREDS = {rdflib.namespace.OWL.annotatedSource: 0,
+                   rdflib.namespace.OWL.annotatedProperty: 1,
+                   rdflib.namespace.OWL.annotatedTarget: 2}
+
+    def __init__(self):
+        self.axiom_parts = {}  # axiom bnode -> [source, property, target]
+        self.axiom_bnodes = {}  # (source, property, target) -> axiom bnode
+        self.evidence = {}  # axiom bnode -> list of evidence URIs
+        self.individual_types = {}  # individual -> first non-NamedIndividual type
+        self.relations = {}  # individual -> list of (GO-CAM relation, object)
+        self.title = None
+        self.edges_by_bnode = {}  # axiom bnode -> StandardAnnotationEdge
+        self.annotation_by_bnode = {}
+        self.annotations_by_individual = {}
+        self._gocam_relations = {URIRef(r): None for r in get_gocam_relations()}  # ordered set
+
+    def build(self, g: rdflib.graph.Graph):
+        # Scan by predicate so each table keeps rdflib's per-predicate ordering (full
+        # iteration order is unstable), which keeps edge and evidence order deterministic
+        predicates = [rdflib.DC.title, rdflib.RDF.type, self.EVIDENCE_PRED]
+        predicates.extend(self.AXIOM_PREDS)
+        predicates.extend(self._gocam_relations)
+        for pred in predicates:
+            for triple in g.triples((None, pred, None)):
+                self.add(triple)
+
+    def add(self, triple):
+        subj, pred, obj = triple
+        if pred in self.AXIOM_PREDS:
+            parts = self.axiom_parts.get(subj)
+            if parts is None:
+                parts = self.axiom_parts[subj] = [None, None, None]
+            position = self.AXIOM_PREDS[pred]
+            if parts[position] is None:
+                parts[position] = obj
+                if None not in parts:
+                    self.axiom_bnodes.setdefault(tuple(parts), subj)
+        elif pred == self.EVIDENCE_PRED:
+            if isinstance(subj, rdflib.term.BNode):
+                self.evidence.setdefault(subj, []).append(obj)
+        elif pred == rdflib.RDF.type:
+            if obj != rdflib.namespace.OWL.NamedIndividual:
+                self.individual_types.setdefault(subj, obj)
+        elif pred in self._gocam_relations:
+            self.relations.setdefault(subj, []).append((pred, obj))
+        elif pred == rdflib.DC.title:
+            if self.title is None:
+                self.title = obj
+
+    def remove(self, triple):
+        subj, pred, obj = triple
+        if pred == self.EVIDENCE_PRED:
+            evidence_uris = self.evidence.get(subj)
+            if evidence_uris and obj in evidence_uris:
+                evidence_uris.remove(obj)
+        elif pred in self._gocam_relations:
+            relations = self.relations.get(subj)
+            if relations and (pred, obj) in relations:
+                relations.remove((pred, obj))
+
+    def get_axiom_bnode(self, source_id, relation, target_id):
+        return self.axiom_bnodes.get((source_id, relation, target_id))
+
+    def get_axiom_parts(self, bnode):
+        """
+        Returns: (source, target, property) of an axiom bnode, or None if incomplete
+        """
+        parts = self.axiom_parts.get(bnode)
+        if parts is None or None in parts:
+            return None
+        source_id, relation, target_id = parts
+        return source_id, target_id, relation
+
+    def index_edge(self, edge):
+        self.edges_by_bnode[edge.bnode] = edge
+
+    def index_standard_annotations(self, standard_annotations):
+        self.annotation_by_bnode = {}
+        self.annotations_by_individual = {}
+        for sa in standard_annotations:
+            for bnode in sa.bnodes():
+                self.annotation_by_bnode.setdefault(bnode, sa)
+            for individual in sa.individuals:
+                self.annotations_by_individual.setdefault(individual, []).append(sa)
+
+
+class PlannedAxiom:
+    """
+    A new axiom bnode planned by GoCamGraph.plan_split: a copy of original_bnode's edge between
+    new (suffixed) individuals, carrying one group of its evidence.
+    """
+    __slots__ = ("bnode", "original_bnode", "source_uri", "property_uri", "target_uri", "evidence_uris")
+
+    def __init__(self, bnode, original_bnode, source_uri, property_uri, target_uri, evidence_uris):
+        self.bnode = bnode
+        self.original_bnode = original_bnode
+        self.source_uri = source_uri
+        self.property_uri = property_uri
+        self.target_uri = target_uri
+        self.evidence_uris = evidence_uris
+
+
+class SplitPlan:
+    """
+    The changes split_evidence makes to a model: evidence links removed from the original
+    axioms, new axiom bnodes with their evidence, and new individuals (cloned from the
+    originals they are keyed to). A model with an empty plan is unchanged by the split.
+    """
+    def __init__(self):
+        self.removed_evidence = []  # (axiom bnode, evidence URI)
+        self.new_axioms = []  # PlannedAxiom, in creation order
+        self.new_individuals = {}  # new individual URI -> original individual URI
+
+    def is_empty(self):
+        return not self.removed_evidence and not self.new_axioms
+
+    def summary(self):
+        """
+        Returns: dict of counts, e.g. for a dry run report
+        """
+        return {"new_axioms": len(self.new_axioms), "new_individuals": len(self.new_individuals),
+                "removed_evidence": len(self.removed_evidence),
+                "added_evidence": sum(len(axiom.evidence_uris) for axiom in self.new_axioms)}
+
+    def apply(self, gocam: 'GoCamGraph'):
+        evidence_pred = GoCamGraphIndex.EVIDENCE_PRED
+        for bnode, evidence_uri in self.removed_evidence:
+            gocam.remove_triple((bnode, evidence_pred, evidence_uri))
+
+        cloned = set()
+        for axiom in self.new_axioms:
+            # Clone bnode metadata
+            gocam.clone_bnode(axiom.original_bnode, axiom.bnode)
+            # Individuals are cloned when first used, so each new individual is cloned once
+            for uri in (axiom.source_uri, axiom.target_uri):
+                if uri not in cloned:
+                    cloned.add(uri)
+                    gocam.clone_individual(self.new_individuals[uri], uri)
+
+            # Add the axiom triples
+            gocam.add_triple((axiom.bnode, rdflib.namespace.OWL.annotatedSource, axiom.source_uri))
+            gocam.add_triple((axiom.bnode, rdflib.namespace.OWL.annotatedTarget, axiom.target_uri))
+            gocam.add_triple((axiom.bnode, rdflib.namespace.OWL.annotatedProperty, axiom.property_uri))
+
+            # Add only the evidence for this group
+            for evidence_uri in axiom.evidence_uris:
+                gocam.add_triple((axiom.bnode, evidence_pred, evidence_uri))
+
+
 class GoCamGraph:
     PREDICATES_TO_COPY = [rdflib.RDF.type,
                           rdflib.namespace.DC.contributor,
@@ -77,44 +384,138 @@ class GoCamGraph:
                           rdflib.URIRef("http://purl.org/dc/terms/dateAccepted"),
                           rdflib.URIRef("http://purl.org/pav/providedBy"),
                           rdflib.RDFS.comment]
+    # Predicates that make up an evidence individual's metadata signature
+    EVIDENCE_METADATA_PREDICATES = PREDICATES_TO_COPY + [rdflib.URIRef("http://geneontology.org/lego/evidence-with"),
+                                                         rdflib.DC.source]
 
-    def __init__(self):
-        self.g = rdflib.graph.Graph()
+    def __init__(self, store: rdflib.store.Store = None, backend="rdflib"):
+        """
+        store: rdflib Store for the graph, e.g. a graph_store.SpillStore (default: in memory)
+        backend: "rdflib" (an rdflib Graph), or "dict" for the faster graph_backend.DictGraph,
+        which can't take a store
+        """
+        self.g = new_graph(backend, store)
+        self.index = GoCamGraphIndex()
         self.edges = []
-        self.standard_annotations = []
+        self._standard_annotations = []
         self.non_standard_annotations = []
         self.title = None
         self.individual_to_annotation = {}
+        self.evidence_signatures = None  # evidence URI -> interned metadata signature, computed on first use
+        self.evidence_groups = {}  # StandardAnnotation -> result of group_evidence_by_bnode
+        self.changes = None  # ("A" or "D", triple) for each change since record_changes(), if called
 
-    def write_ttl(self, filename):
-        self.g.serialize(destination=filename, format='ttl')
+    @property
+    def standard_annotations(self):
+        return self._standard_annotations
+
+    @standard_annotations.setter
+    def standard_annotations(self, standard_annotations):
+        # Reassigning the list (e.g. after filtering) refreshes the annotation lookups
+        self._standard_annotations = standard_annotations
+        self.index.index_standard_annotations(standard_annotations)
+
+    def build_index(self):
+        self.index = GoCamGraphIndex()
+        self.index.build(self.g)
+
+    def record_changes(self):
+        """
+        Start recording the triples added and removed through add_triple and remove_triple, e.g.
+        to write the split as a patch.
+        """
+        self.changes = []
+
+    def add_triple(self, triple):
+        if triple in self.g:
+            return
+        self.g.add(triple)
+        self.index.add(triple)
+        self.forget_evidence_signature(triple[0])
+        if self.changes is not None:
+            self.changes.append(("A", triple))
+
+    def remove_triple(self, triple):
+        if self.changes is not None and triple in self.g:
+            self.changes.append(("D", triple))
+        self.g.remove(triple)
+        self.index.remove(triple)
+        self.forget_evidence_signature(triple[0])
+
+    def forget_evidence_signature(self, subject):
+        # Metadata of an evidence individual changed; recompute its signature on next use
+        if self.evidence_signatures is not None and subject in self.evidence_signatures:
+            self.evidence_signatures = None
+            self.evidence_groups = {}
+
+    def predicate_triples(self, pred):
+        return self.g.triples((None, pred, None))
+
+    def triple_count(self):
+        return len(self.g)
+
+    def close(self):
+        if self.g is not None:
+            self.g.close()
+
+    def write_ttl(self, filename, output_format="ttl"):
+        """
+        output_format: "ttl" (rdflib's pretty Turtle), the streaming "ttl-fast" or "nt" writers,
+        or "patch" for an RDF Patch and "sparql" for a SPARQL Update of the changes recorded since
+        record_changes()
+        """
+        if output_format in CHANGE_OUTPUT_FORMATS:
+            if self.changes is None:
+                raise ValueError("Call record_changes() before changing the graph to write a patch")
+            format_changes = format_patch if output_format == "patch" else format_sparql_update
+            with replacing(filename) as tmp_filename, open(tmp_filename, 'w', encoding='utf-8') as f:
+                f.write(format_changes(self, self.changes))
+            return
+        serialize(self.g, filename, output_format)
 
     def get_evidence_metadata(self, evidence_uri):
         """
         Extract metadata for an evidence individual as a hashable tuple.
         This creates a signature that can identify equivalent evidence across edges.
         """
-        metadata = []
-
-        # Collect predicates defined in PREDICATES_TO_COPY
-        for pred in self.PREDICATES_TO_COPY:
-            values = sorted([str(obj) for obj in self.g.objects(evidence_uri, pred)])
-            if values:
-                metadata.append((str(pred), tuple(values)))
+        signatures = self.get_evidence_signatures()
+        if evidence_uri in signatures:
+            return signatures[evidence_uri]
+        return self.compute_evidence_signatures([evidence_uri])[evidence_uri]
 
-        # Also include evidence-with predicate
-        evidence_with_pred = rdflib.URIRef("http://geneontology.org/lego/evidence-with")
-        values = sorted([str(obj) for obj in self.g.objects(evidence_uri, evidence_with_pred)])
-        if values:
-            metadata.append((str(evidence_with_pred), tuple(values)))
-
-        # Include source predicate
-        source_pred = rdflib.DC.source
-        values = sorted([str(obj) for obj in self.g.objects(evidence_uri, source_pred)])
-        if values:
-            metadata.append((str(source_pred), tuple(values)))
+    def get_evidence_signatures(self):
+        """
+        Metadata signatures of every evidence individual referenced by an axiom, computed in
+        one batch on first use and reused by the consistency check and the split.
+        """
+        if self.evidence_signatures is None:
+            evidence_uris = set()
+            for uris in self.index.evidence.values():
+                evidence_uris.update(uris)
+            self.evidence_signatures = self.compute_evidence_signatures(evidence_uris)
+        return self.evidence_signatures
+
+    def compute_evidence_signatures(self, evidence_uris):
+        """
+        Returns: dict of evidence URI -> metadata signature (sorted tuple of (predicate, sorted values))
 
-        return tuple(sorted(metadata))
+        Scans each metadata predicate once instead of querying every evidence individual
+        separately. Equal signatures are interned, so they share one tuple object.
+        """
+        metadata = {evidence_uri: {} for evidence_uri in evidence_uris}
+        for pred in self.EVIDENCE_METADATA_PREDICATES:
+            pred_str = str(pred)
+            for subj, _, obj in self.predicate_triples(pred):
+                evidence_metadata = metadata.get(subj)
+                if evidence_metadata is not None:
+                    evidence_metadata.setdefault(pred_str, []).append(str(obj))
+
+        interned = {}
+        signatures = {}
+        for evidence_uri, evidence_metadata in metadata.items():
+            signature = tuple(sorted((pred_str, tuple(sorted(values))) for pred_str, values in evidence_metadata.items()))
+            signatures[evidence_uri] = interned.setdefault(signature, signature)
+        return signatures
 
     def group_evidence_by_metadata(self, std_annot: StandardAnnotation):
         """
@@ -133,57 +534,75 @@ class GoCamGraph:
             0: {edge1_id: [A], edge2_id: [C]},
             1: {edge1_id: [B], edge2_id: [D]}
         }
+
+        """
+        return {group_index: {str(bnode): evidence_uris for bnode, evidence_uris in group_edges.items()}
+                for group_index, group_edges in self.group_evidence_by_bnode(std_annot).items()}
+
+    def group_evidence_by_bnode(self, std_annot: StandardAnnotation):
         """
-        # Collect all evidence URIs and their metadata signatures
-        evidence_to_metadata = {}
+        group_evidence_by_metadata, with the edges keyed by their axiom bnode instead of its string.
+
+        Results are cached per annotation, so the split reuses the grouping done while filtering.
+        """
+        groups = self.evidence_groups.get(std_annot)
+        if groups is not None:
+            return groups
+
+        # Inverted index: metadata signature -> edge bnode -> evidence URIs, in first-seen order
+        signatures = self.get_evidence_signatures()
+        edges_by_signature = {}
         for edge in std_annot.edges.values():
             for evidence_uri in edge.evidence_uris:
-                if evidence_uri not in evidence_to_metadata:
-                    evidence_to_metadata[evidence_uri] = self.get_evidence_metadata(evidence_uri)
-
-        # Group evidence URIs by their metadata signature
-        metadata_to_evidence = {}
-        for evidence_uri, metadata in evidence_to_metadata.items():
-            if metadata not in metadata_to_evidence:
-                metadata_to_evidence[metadata] = []
-            metadata_to_evidence[metadata].append(evidence_uri)
-
-        # Build groups: for each metadata signature, find which evidence from each edge belongs to it
-        groups = {}
-        group_index = 0
-        for metadata_sig, evidence_list in metadata_to_evidence.items():
-            evidence_set = set(evidence_list)
-            group = {}
+                signature = signatures.get(evidence_uri)
+                if signature is None:
+                    signature = self.get_evidence_metadata(evidence_uri)
+                group = edges_by_signature.setdefault(signature, {})
+                group.setdefault(edge.bnode, []).append(evidence_uri)
+
+        groups = dict(enumerate(edges_by_signature.values()))
+        self.evidence_groups[std_annot] = groups
+        return groups
 
-            for edge in std_annot.edges.values():
-                # Find evidence from this edge that belongs to this metadata group
-                edge_evidence_in_group = [ev for ev in edge.evidence_uris if ev in evidence_set]
-                if edge_evidence_in_group:
-                    group[edge.bnode_id] = edge_evidence_in_group
+    def split_evidence_and_write_ttl(self, filename, output_format="ttl"):
+        """
+        Split multi-evidence edges (see split_evidence) and write the result to filename.
+        """
+        if output_format in CHANGE_OUTPUT_FORMATS:
+            self.record_changes()
+        self.split_evidence()
+        self.write_ttl(filename, output_format)
 
-            if group:
-                groups[group_index] = group
-                group_index += 1
+    def split_evidence(self):
+        """
+        Split multi-evidence edges by grouping evidence with identical metadata across edges
+        (see plan_split), modifying the graph in place.
 
-        return groups
+        Returns: the SplitPlan that was applied
+        """
+        plan = self.plan_split()
+        plan.apply(self)
+        return plan
 
-    def split_evidence_and_write_ttl(self, filename):
+    def plan_split(self):
         """
-        Split multi-evidence edges by grouping evidence with identical metadata across edges.
+        Work out how split_evidence would change the graph, without changing it.
 
         For each standard annotation:
         1. Group evidence by metadata signature (date, contributor, source, etc.)
-        2. For each evidence group, create a new annotation subgraph
+        2. For each evidence group, plan a new annotation subgraph
         3. First group keeps original nodes; subsequent groups get new nodes with suffix
 
         This ensures that evidence representing the same "evidence event" across
         different edges stays together in the split annotations.
-        """
-        evidence_pred = rdflib.URIRef("http://geneontology.org/lego/evidence")
 
+        Only the annotations and evidence metadata are needed, so streamed graphs can be planned too.
+        Returns: SplitPlan
+        """
+        plan = SplitPlan()
         for std_annot in self.standard_annotations:
             # Get evidence groups for this annotation
-            evidence_groups = self.group_evidence_by_metadata(std_annot)
+            evidence_groups = self.group_evidence_by_bnode(std_annot)
 
             # Track which individuals have been created for each group
             # Map: (original_uri, group_suffix) -> new_uri
@@ -198,63 +617,41 @@ class GoCamGraph:
                     suffix = f"-{group_index + 1}"
 
                 # Process each edge in this group
-                for edge_bnode_id, evidence_uris in group_edges.items():
-                    edge = std_annot.edges[edge_bnode_id]
+                for edge_bnode, evidence_uris in group_edges.items():
+                    edge = std_annot.get_edge(edge_bnode)
+                    original_bnode = rdflib.term.BNode(edge.bnode_id)
 
                     if suffix == "":
                         # First group: keep original bnode, but remove extra evidence
-                        original_bnode = rdflib.term.BNode(edge.bnode_id)
-                        # Remove all evidence except those in this group
                         for ev_uri in edge.evidence_uris:
                             if ev_uri not in evidence_uris:
-                                self.g.remove((original_bnode, evidence_pred, ev_uri))
-                    else:
-                        # Subsequent groups: create new bnode and individuals
-                        new_bnode = rdflib.term.BNode(edge.bnode_id + suffix)
-                        original_bnode = rdflib.term.BNode(edge.bnode_id)
-
-                        # Clone bnode metadata
-                        self.clone_bnode(original_bnode, new_bnode)
-
-                        # Get or create new individual URIs for source and target
-                        source_key = (str(edge.source_uri), suffix)
-                        if source_key not in individual_mapping:
-                            new_source_uri = rdflib.URIRef(str(edge.source_uri) + suffix)
-                            individual_mapping[source_key] = new_source_uri
-                            self.clone_individual(edge.source_uri, new_source_uri)
-                        else:
-                            new_source_uri = individual_mapping[source_key]
-
-                        target_key = (str(edge.target_uri), suffix)
-                        if target_key not in individual_mapping:
-                            new_target_uri = rdflib.URIRef(str(edge.target_uri) + suffix)
-                            individual_mapping[target_key] = new_target_uri
-                            self.clone_individual(edge.target_uri, new_target_uri)
-                        else:
-                            new_target_uri = individual_mapping[target_key]
-
-                        # Add the axiom triples
-                        self.g.add((new_bnode, rdflib.namespace.OWL.annotatedSource, new_source_uri))
-                        self.g.add((new_bnode, rdflib.namespace.OWL.annotatedTarget, new_target_uri))
-                        self.g.add((new_bnode, rdflib.namespace.OWL.annotatedProperty, edge.property_uri))
-
-                        # Add only the evidence for this group
-                        for evidence_uri in evidence_uris:
-                            self.g.add((new_bnode, evidence_pred, evidence_uri))
-
-        self.write_ttl(filename)
+                                plan.removed_evidence.append((original_bnode, ev_uri))
+                        continue
+
+                    # Subsequent groups: create new bnode and individuals
+                    new_bnode = rdflib.term.BNode(edge.bnode_id + suffix)
+                    new_uris = []
+                    for uri in (edge.source_uri, edge.target_uri):
+                        key = (str(uri), suffix)
+                        if key not in individual_mapping:
+                            individual_mapping[key] = rdflib.URIRef(str(uri) + suffix)
+                            plan.new_individuals.setdefault(individual_mapping[key], uri)
+                        new_uris.append(individual_mapping[key])
+                    plan.new_axioms.append(PlannedAxiom(new_bnode, original_bnode, new_uris[0], edge.property_uri,
+                                                        new_uris[1], evidence_uris))
+        return plan
 
     def clone_bnode(self, old_bnode: rdflib.term.BNode, new_bnode: rdflib.term.BNode):
         # Clone the bnode and its properties to a new bnode
         for pred, obj in self.g.predicate_objects(old_bnode):
             if pred in self.PREDICATES_TO_COPY:
-                self.g.add((new_bnode, pred, obj))
+                self.add_triple((new_bnode, pred, obj))
 
     def clone_individual(self, old_individual_uri: rdflib.URIRef, new_individual_uri: rdflib.URIRef):
         # Clone the individual and its properties to a new URI
         for pred, obj in self.g.predicate_objects(old_individual_uri):
             if pred in self.PREDICATES_TO_COPY:
-                self.g.add((new_individual_uri, pred, obj))
+                self.add_triple((new_individual_uri, pred, obj))
         # # Also clone the type
         # for obj in self.g.objects(old_individual_uri, rdflib.RDF.type):
         #     self.g.add((new_individual_uri, rdflib.RDF.type, obj))
@@ -266,41 +663,30 @@ class GoCamGraph:
                 yield triple
 
     def get_individual_type(self, individual_uri):
-        for obj in self.g.objects(individual_uri, rdflib.RDF.type):
-            if obj != rdflib.namespace.OWL.NamedIndividual:
-                return obj
+        return self.index.individual_types.get(individual_uri)
 
     def get_standard_annotation_by_bnode_id(self, bnode_id):
-        # Iterate all standard_annotations and their edges until an edge has bnode_id
-        for sa in self.standard_annotations:
-            if bnode_id in sa.edges:
-                return sa
+        return get_by_bnode_id(self.index.annotation_by_bnode, bnode_id)
 
     def get_standard_annotation_by_individual(self, individual_uri):
-        for sa in self.standard_annotations:
-            if individual_uri in sa.individuals:
-                return sa
+        standard_annotations = self.index.annotations_by_individual.get(individual_uri)
+        if standard_annotations:
+            return standard_annotations[0]
 
     def get_standard_annotations_by_individual(self, individual_uri):
-        standard_annotations = []
-        for sa in self.standard_annotations:
-            if individual_uri in sa.individuals:
-                standard_annotations.append(sa)
-        return standard_annotations
+        return list(self.index.annotations_by_individual.get(individual_uri, []))
 
     def get_edge_by_bnode_id(self, bnode_id):
-        for e in self.edges:
-            if e.bnode_id == bnode_id:
-                return e
+        return get_by_bnode_id(self.index.edges_by_bnode, bnode_id)
+
+    def get_edge_by_bnode(self, bnode):
+        return self.index.edges_by_bnode.get(bnode)
 
     def get_title(self):
-        for title in self.g.objects(None, rdflib.DC.title):
-            return title
+        return self.index.title
 
     def find_axiom_bits(self, bnode_id):
-        source_id = list(self.g.objects(bnode_id, rdflib.namespace.OWL.annotatedSource))[0]
-        target_id = list(self.g.objects(bnode_id, rdflib.namespace.OWL.annotatedTarget))[0]
-        relation = list(self.g.objects(bnode_id, rdflib.namespace.OWL.annotatedProperty))[0]
+        source_id, target_id, relation = self.index.get_axiom_parts(bnode_id)
         contributors = list(self.g.objects(bnode_id, rdflib.namespace.DC.contributor))
         date = next(self.g.objects(bnode_id, rdflib.namespace.DC.date), None)  # optional
         provided_by = next(self.g.objects(bnode_id, rdflib.URIRef("http://purl.org/pav/providedBy")), None)  # optional
@@ -309,120 +695,133 @@ class GoCamGraph:
         return source_id, target_id, relation, contributors, date, provided_by, created, date_accepted
 
     def find_axiom_bnode_by_triple(self, source_id, relation, target_id):
-        for bnode in self.g.subjects(rdflib.namespace.OWL.annotatedSource, source_id):
-            if list(self.g.objects(bnode, rdflib.namespace.OWL.annotatedTarget))[0] == target_id and list(self.g.objects(bnode, rdflib.namespace.OWL.annotatedProperty))[0] == relation:
-                return bnode
+        return self.index.get_axiom_bnode(source_id, relation, target_id)
 
     def extract_edges(self):
-        ets = list(self.evidence_triples())
-        for triple in ets:
-            bnode = triple[0]
-            bnode_id = str(bnode)
-
-
-            edge = self.get_edge_by_bnode_id(bnode_id)
+        for bnode, evidence_uris in self.index.evidence.items():
+            if not evidence_uris:
+                continue
+            edge = self.get_edge_by_bnode(bnode)
             if edge is None:
-                source_id, target_id, relation, contributors, date, provided_by, created, date_accepted = self.find_axiom_bits(bnode)
-                edge = StandardAnnotationEdge(bnode, source_id, target_id, relation,
-                                              # contributors, date, provided_by, created, date_accepted
-                                              )
+                source_id, target_id, relation = self.index.get_axiom_parts(bnode)
+                edge = StandardAnnotationEdge(bnode, source_id, target_id, relation)
                 self.edges.append(edge)
-            evidence_id = triple[2]
-            edge.evidence_uris.append(evidence_id)
+                self.index.index_edge(edge)
+            edge.add_evidence(evidence_uris)
         return self.edges
 
-    def extract_standard_annotations(self):
-        edges = self.extract_edges()
-        # Process all edges first to identify connected components
-        edge_to_annotation = {}  # Map to track which annotation each edge belongs to
+    def extract_standard_annotations(self, edges=None):
+        """
+        Group edges into StandardAnnotations in near-linear time and without recursion.
 
+        1. Edges with evidence are joined into connected components over shared individuals
+           using a union-find (AnnotationComponent).
+        2. Each annotation then takes in the edges downstream of its edges' targets through
+           GO-CAM relations. The walks of one annotation share a visited set, so a causal
+           chain is only walked once per annotation.
+
+        edges: result of extract_edges(), if it has already been called
+        """
+        if edges is None:
+            edges = self.extract_edges()
+        # Process all edges first to identify connected components
+        components = []
+        component_by_individual = {}
         for edge in edges:
             edge.source_type = self.get_individual_type(edge.source_uri)
             edge.target_type = self.get_individual_type(edge.target_uri)
 
-            source_annot = self.individual_to_annotation.get(edge.source_uri)
-            target_annot = self.individual_to_annotation.get(edge.target_uri)
-
-            if source_annot is None and target_annot is None:
-                # Create new annotation if neither individual belongs to one
-                new_annot = StandardAnnotation()
-                self.standard_annotations.append(new_annot)
-                new_annot.add_edge(edge)
-                self.individual_to_annotation[edge.source_uri] = new_annot
-                self.individual_to_annotation[edge.target_uri] = new_annot
-                edge_to_annotation[edge.bnode_id] = new_annot
-            elif source_annot is not None and target_annot is None:
-                # Add to source's annotation
-                source_annot.add_edge(edge)
-                self.individual_to_annotation[edge.target_uri] = source_annot
-                edge_to_annotation[edge.bnode_id] = source_annot
-            elif source_annot is None and target_annot is not None:
-                # Add to target's annotation
-                target_annot.add_edge(edge)
-                self.individual_to_annotation[edge.source_uri] = target_annot
-                edge_to_annotation[edge.bnode_id] = target_annot
-            elif source_annot is target_annot:
-                # Both already in same annotation
-                source_annot.add_edge(edge)
-                edge_to_annotation[edge.bnode_id] = source_annot
+            source_component = component_by_individual.get(edge.source_uri)
+            target_component = component_by_individual.get(edge.target_uri)
+            if source_component is not None:
+                source_component = source_component.find()
+            if target_component is not None:
+                target_component = target_component.find()
+
+            if source_component is None and target_component is None:
+                # Create new component if neither individual belongs to one
+                component = AnnotationComponent(len(components))
+                components.append(component)
+            elif target_component is None or source_component is target_component:
+                component = source_component
+            elif source_component is None:
+                component = target_component
             else:
-                # Both individuals belong to different annotations - merge them
-                # Keep source_annot, remove target_annot
-                for ind in list(target_annot.individuals):
-                    self.individual_to_annotation[ind] = source_annot
-
-                # Move all edges from target_annot to source_annot
-                for edge_id, edge_obj in target_annot.edges.items():
-                    source_annot.add_edge(edge_obj)
-                    edge_to_annotation[edge_id] = source_annot
-
-                # Remove target_annot from the list
-                self.standard_annotations.remove(target_annot)
-
-                # Add the current edge
-                source_annot.add_edge(edge)
-                edge_to_annotation[edge.bnode_id] = source_annot
+                # Both individuals belong to different components - merge target into source
+                component = source_component.merge(target_component)
+            component.parts.append(edge)
+            component_by_individual[edge.source_uri] = component
+            component_by_individual[edge.target_uri] = component
+
+        # Surviving components keep the list position of the annotation they were merged into
+        edge_to_annotation = {}
+        roots = sorted((c for c in components if c.parent is c), key=lambda c: c.order)
+        self.standard_annotations = []
+        for component in roots:
+            annot = StandardAnnotation()
+            for edge in component.edges():
+                annot.add_edge(edge)
+                edge_to_annotation[edge.bnode] = annot
+            for individual in annot.individuals:
+                self.individual_to_annotation[individual] = annot
+            self.standard_annotations.append(annot)
 
         # Now process related edges while maintaining annotation integrity
+        visited_by_annotation = {}
         for edge in edges:
-            annot = edge_to_annotation[edge.bnode_id]
-            for related_edge in self.find_related_edges(edge):
+            annot = edge_to_annotation[edge.bnode]
+            visited_bnodes = visited_by_annotation.setdefault(annot, set())
+            for related_edge in self.find_related_edges(edge, visited_bnodes):
                 annot.add_edge(related_edge)
-                edge_to_annotation[related_edge.bnode_id] = annot
+                edge_to_annotation[related_edge.bnode] = annot
                 self.individual_to_annotation[related_edge.source_uri] = annot
                 self.individual_to_annotation[related_edge.target_uri] = annot
+        # Refresh annotation lookups now that related edges have been added
+        self.index.index_standard_annotations(self.standard_annotations)
 
-    # Recursive function to find all edges that are part of the same StandardAnnotation
     def find_related_edges(self, edge: StandardAnnotationEdge, visited_bnodes=None):
+        """
+        Find all edges downstream of an edge's target through GO-CAM relations.
+
+        Iterative depth-first walk returning edges in the same order as the recursive walk did.
+        Edges whose bnode is already in visited_bnodes are returned but not walked again.
+        """
         if visited_bnodes is None:
             visited_bnodes = set()
-        if edge.bnode_id in visited_bnodes:
+        if edge.bnode in visited_bnodes:
             # Skip if we've already visited this edge
             return []
-        visited_bnodes.add(edge.bnode_id)
+        visited_bnodes.add(edge.bnode)
 
         related_edges = []
+        stack = [self.next_edges(edge)]
+        while stack:
+            for next_edge in stack[-1]:
+                related_edges.append(next_edge)
+                if next_edge.bnode not in visited_bnodes:
+                    visited_bnodes.add(next_edge.bnode)
+                    stack.append(self.next_edges(next_edge))
+                    break
+            else:
+                stack.pop()
+        return related_edges
+
+    def next_edges(self, edge: StandardAnnotationEdge):
+        # Edges leaving the target of this edge through GO-CAM relations
         source_type = self.get_individual_type(edge.target_uri)
-        for pred, obj in self.g.predicate_objects(edge.target_uri):
-            if str(pred) not in GOCAM_RELATIONS:
-                continue
+        for pred, obj in self.index.relations.get(edge.target_uri, []):
             bnode = self.find_axiom_bnode_by_triple(edge.target_uri, pred, obj)
-            bnode_id = str(bnode)
 
             # Look up the already-extracted edge instead of creating a new one
             # This preserves the evidence_uris that were populated during extract_edges()
-            next_edge = self.get_edge_by_bnode_id(bnode_id)
+            next_edge = self.get_edge_by_bnode(bnode)
 
             if next_edge is None:
                 # Edge wasn't extracted (no evidence), create a new one
                 next_edge = StandardAnnotationEdge(bnode, edge.target_uri, obj, pred)
                 next_edge.source_type = source_type
-                target_type = self.get_individual_type(obj)
-                next_edge.target_type = target_type
-
-            related_edges.append(next_edge)
-            related_edges.extend(self.find_related_edges(next_edge, visited_bnodes))
-        return related_edges
+                next_edge.target_type = self.get_individual_type(obj)
+            yield next_edge
 
     def has_consistent_evidence_across_edges(self, sa: StandardAnnotation):
         """
@@ -440,7 +839,7 @@ class GoCamGraph:
             return True
 
         # Get evidence groups
-        evidence_groups = self.group_evidence_by_metadata(sa)
+        evidence_groups = self.group_evidence_by_bnode(sa)
 
         # Check if each evidence group has evidence from all edges
         num_edges = len(sa.edges)
@@ -452,30 +851,178 @@ class GoCamGraph:
         return True
 
 
+class ReadOnlyGraphError(TypeError):
+    """
+    Raised on an attempt to change or write a StreamedGoCamGraph.
+    """
+
+
+class StreamedGoCamGraph(GoCamGraph):
+    """
+    GoCamGraph read in one pass with TurtleScanner instead of rdflib's parser.
+
+    Only the triples the analysis needs are kept: the GoCamGraphIndex tables and the evidence
+    metadata predicates. There is no rdflib Graph, so these models are read-only: they can be
+    analyzed, reported on and have their split planned, but changing or writing them raises
+    ReadOnlyGraphError.
+    """
+    def __init__(self):
+        super().__init__()
+        self.g = None
+        self.metadata_triples = {}  # metadata predicate -> list of (evidence URI, value)
+        self.scanned_triples = 0
+
+    @classmethod
+    def from_file(cls, ttl_filename):
+        gocam = cls()
+        index = gocam.index
+        metadata_predicates = set(cls.EVIDENCE_METADATA_PREDICATES)
+        index_predicates = set(index.AXIOM_PREDS)
+        index_predicates.update(index._gocam_relations)
+        index_predicates.update([index.EVIDENCE_PRED, rdflib.RDF.type, rdflib.DC.title])
+        metadata = {}
+        seen = set()  # repeated triples are kept once, as in an rdflib Graph
+        scanner = TurtleScanner()
+        if isinstance(ttl_filename, ArchiveMember) or is_compressed(ttl_filename):
+            triples = scanner.scan(read_model_text(ttl_filename))
+        else:
+            triples = scanner.scan_file(ttl_filename)
+        for triple in triples:
+            gocam.scanned_triples += 1
+            subj, pred, obj = triple
+            if pred in index_predicates:
+                if triple not in seen:
+                    seen.add(triple)
+                    index.add(triple)
+            if pred in metadata_predicates:
+                metadata.setdefault(pred, {}).setdefault(subj, {})[obj] = None
+        del seen
+
+        # Only evidence individuals' metadata is used
+        evidence_uris = set()
+        for uris in index.evidence.values():
+            evidence_uris.update(uris)
+        for pred, values_by_subject in metadata.items():
+            gocam.metadata_triples[pred] = [(subj, obj) for subj, values in values_by_subject.items()
+                                            if subj in evidence_uris for obj in values]
+        return gocam
+
+    def predicate_triples(self, pred):
+        for subj, obj in self.metadata_triples.get(pred, []):
+            yield subj, pred, obj
+
+    def triple_count(self):
+        return self.scanned_triples
+
+    def add_triple(self, triple):
+        raise ReadOnlyGraphError("Streamed models are read-only; parse them with rdflib to split")
+
+    def remove_triple(self, triple):
+        raise ReadOnlyGraphError("Streamed models are read-only; parse them with rdflib to split")
+
+    def write_ttl(self, filename, output_format="ttl"):
+        raise ReadOnlyGraphError("Streamed models are read-only and can't be written; parse them with rdflib to "
+                                 "split")
+
+
 class GoCamGraphBuilder:
-    def __init__(self, ontology):
-        parsed_ontology = ontobio.ontol_factory.OntologyFactory().create(ontology)
-        self.go_aspector = ontobio.util.go_utils.GoAspector(parsed_ontology)
+    def __init__(self, ontology, ontology_cache=None, model_cache: ParsedModelCache = None, graph_store=None,
+                 graph_backend="rdflib"):
+        """
+        ontology: GO ontology filename (JSON format)
+        ontology_cache: optional directory for a compiled MolecularFunctionCache. When the cache
+        for this ontology file exists it is memory-mapped and the ontology is not loaded at all.
+        model_cache: optional ParsedModelCache that parse_ttl loads models from (and adds them to)
+        instead of parsing the Turtle every time
+        graph_store: optional callable returning a new rdflib Store for each parsed model, e.g. a
+        graph_store.SpillStoreFactory to move large models to disk (default: in memory)
+        graph_backend: graph that parsed models are held in, see GoCamGraph. A graph_store
+        requires the "rdflib" backend.
+        """
+        if graph_store and graph_backend != "rdflib":
+            raise ValueError(f"A graph store can't be used with the {graph_backend!r} graph backend")
+        self.model_cache = model_cache
+        self.graph_store = graph_store
+        self.graph_backend = graph_backend
+        self.go_aspector = None
+        self.mf_cache = None
+        self.molecular_function_memo = {}  # URI -> bool
+        get_gocam_relations(ontology_cache)
+        if ontology_cache:
+            cache_path = MolecularFunctionCache.path_for(ontology_cache, ontology)
+            if not os.path.exists(cache_path):
+                from ontobio.ontol_factory import OntologyFactory
+                parsed_ontology = OntologyFactory().create(ontology)
+                MolecularFunctionCache.compile(parsed_ontology, cache_path)
+            self.mf_cache = MolecularFunctionCache(cache_path)
+        else:
+            from ontobio.ontol_factory import OntologyFactory
+            from ontobio.util.go_utils import GoAspector
+            parsed_ontology = OntologyFactory().create(ontology)
+            self.go_aspector = GoAspector(parsed_ontology)
 
     def uri_is_molecular_function(self, uri: URIRef):
         """
         Check if the URI refers to a molecular function in the GO ontology.
         """
+        is_mf = self.molecular_function_memo.get(uri)
+        if is_mf is None:
+            is_mf = self.molecular_function_memo[uri] = self._uri_is_molecular_function(uri)
+        return is_mf
+
+    def _uri_is_molecular_function(self, uri: URIRef):
         if uri == URIRef("http://purl.obolibrary.org/obo/go/extensions/reacto.owl#molecular_event"):
             return True
         parsed_curies = curie_util.contract_uri(str(uri))
         # parsed_curie = str(curie_util.contract_uri(str(uri)))
         if parsed_curies and parsed_curies[0].startswith("GO:"):
+            if self.mf_cache is not None:
+                return self.mf_cache.is_molecular_function(parsed_curies[0])
             return self.go_aspector.is_molecular_function(parsed_curies[0])
         return False
 
-    def parse_ttl(self, ttl_filename):
-        gocam = GoCamGraph()
-        gocam.g.parse(ttl_filename, format="ttl")
-        gocam.title = gocam.get_title()
+    def parse_ttl(self, ttl_filename, profile: ModelProfile = None):
+        """
+        profile: optional ModelProfile to time the phases into
+        """
+        gocam = GoCamGraph(self.graph_store() if self.graph_store else None, self.graph_backend)
+        with phase(profile, "parse"):
+            if self.model_cache is not None:
+                self.model_cache.parse(ttl_filename, gocam.g)
+            elif isinstance(ttl_filename, ArchiveMember) or is_compressed(ttl_filename):
+                gocam.g.parse(data=read_model_text(ttl_filename), format="ttl")
+            else:
+                gocam.g.parse(ttl_filename, format="ttl")
+            gocam.build_index()
+            gocam.title = gocam.get_title()
+        if profile:
+            profile.count_triples(gocam)
         gocam.standard_annotations = []
-        gocam.extract_standard_annotations()
-        gocam = self.filter_out_non_std_annotations(gocam)
+        return self.analyze(gocam, profile)
+
+    def scan_ttl(self, ttl_filename, profile: ModelProfile = None):
+        """
+        Analyze a model like parse_ttl, but read it with the streaming TurtleScanner instead of
+        building a full rdflib Graph. The result can be reported on but not split.
+
+        Raises TurtleSyntaxError for input the scanner can't read; parse_ttl is the fallback.
+        """
+        with phase(profile, "parse"):
+            gocam = StreamedGoCamGraph.from_file(ttl_filename)
+            gocam.title = gocam.get_title()
+        if profile:
+            profile.count_triples(gocam)
+        return self.analyze(gocam, profile)
+
+    def analyze(self, gocam: GoCamGraph, profile: ModelProfile = None):
+        with phase(profile, "extract_edges"):
+            edges = gocam.extract_edges()
+        if profile:
+            profile.count_edges(edges)
+        with phase(profile, "extract_standard_annotations"):
+            gocam.extract_standard_annotations(edges)
+        with phase(profile, "filter_out_non_std_annotations"):
+            gocam = self.filter_out_non_std_annotations(gocam)
         return gocam
 
     def filter_out_non_std_annotations(self, go_cam_graph: GoCamGraph):
@@ -495,7 +1042,7 @@ class GoCamGraphBuilder:
                 # source_curie = str(curie_util.contract_uri(str(edge.source_type)))
                 # if source_curie.startswith("GO:"):
                 #     source_is_mf = self.go_aspector.is_molecular_function(source_curie)
-                if edge.property_uri == URIRef(relations.lookup_label("part of")) and self.uri_is_molecular_function(edge.source_type):
+                if edge.property_uri == PART_OF and self.uri_is_molecular_function(edge.source_type):
                     part_of_edges.append(edge)
             if len(part_of_edges) > 1:
                 # If there are multiple part_of edges, this is not a standard annotation
@@ -508,75 +1055,214 @@ class GoCamGraphBuilder:
         return go_cam_graph
 
 
-if __name__ == "__main__":
-    args = parser.parse_args()
-
-    # Load model ID list if provided
-    model_id_filter = None
-    if args.pathway_id_list:
-        with open(args.pathway_id_list, 'r') as f:
-            model_id_filter = set(line.strip() for line in f if line.strip())
-
-    model_files = []
-    if args.model_filename:
-        model_files.append(args.model_filename)
-    elif args.models_folder:
-        for f in os.listdir(args.models_folder):
-            if f.endswith(".ttl"):
-                # If filter is provided, only include models in the filter
-                if model_id_filter is None or f.replace(".ttl", "") in model_id_filter:
-                    model_files.append(os.path.join(args.models_folder, f))
-
-    go_cam_graph_builder = GoCamGraphBuilder(args.ontology_filename)
-
-    # Open report file if specified, otherwise use stdout
-    report_file = None
-    if args.report_file:
-        report_file = open(args.report_file, 'w')
-        output = report_file
+def split_output_filename(model_file, output_dir=None, output_format="ttl"):
+    """
+    model_file: model path, or ArchiveMember (which requires output_dir)
+    """
+    extension = OUTPUT_EXTENSIONS[output_format]
+    if output_dir:
+        return os.path.join(output_dir, strip_model_extension(model_filename(model_file)) + extension)
+    if isinstance(model_file, ArchiveMember):
+        raise ValueError(f"Splitting {model_file} from an archive requires an output directory")
+    # Default to same directory with _split suffix
+    base_name = strip_model_extension(model_file)
+    return base_name + "_split" + extension
+
+
+def copy_unchanged_model(model_file, output_filename, link=False):
+    """
+    Write a model that splitting leaves unchanged to output_filename as it is, instead of
+    reserializing it. Compressed and archived models are written decompressed.
+
+    link: hard-link plain model files instead of copying them, where the file system allows.
+    Every output writer replaces its file rather than writing into it (see
+    serializers.replacing), so a later split of the model leaves a linked input untouched.
+    """
+    if isinstance(model_file, ArchiveMember) or is_compressed(model_file):
+        with replacing(output_filename) as tmp_filename, open(tmp_filename, 'w', encoding="utf-8") as f:
+            f.write(read_model_text(model_file))
+        return
+    if os.path.exists(output_filename):
+        if os.path.samefile(model_file, output_filename):
+            return  # splitting in place; the file is already what it should be
+        if link:
+            os.remove(output_filename)
+    if link:
+        try:
+            os.link(model_file, output_filename)
+            return
+        except OSError:
+            pass  # e.g. a different file system; copy instead
+    with replacing(output_filename) as tmp_filename:
+        shutil.copyfile(model_file, tmp_filename)
+
+
+# Output formats a model's own Turtle file can stand in for when splitting doesn't change it
+COPYABLE_OUTPUT_FORMATS = ("ttl", "ttl-fast")
+# Output formats written without parsing a model into a graph when splitting doesn't change it
+GRAPHLESS_UNCHANGED_FORMATS = COPYABLE_OUTPUT_FORMATS + CHANGE_OUTPUT_FORMATS
+
+
+def process_model_file(builder: GoCamGraphBuilder, model_file, split_evidence=False, output_dir=None, reader="auto",
+                       output_format="ttl", profile: ModelProfile = None, dry_run=False, link_unchanged=False,
+                       edge_columns=None):
+    """
+    Analyze one model file and optionally split its evidence.
+
+    reader: "rdflib" parses into a full rdflib Graph; "stream" uses the lighter
+    StreamedGoCamGraph, falling back to rdflib if the scanner can't read the file;
+    "auto" streams, and when splitting parses with rdflib only the models the split changes.
+    output_format: format of the split output, see GoCamGraph.write_ttl. A "patch" or "sparql"
+    update is written (empty when the split doesn't change the model) instead of the whole split
+    model.
+    profile: optional ModelProfile to record phase timings and graph counts into
+    dry_run: with split_evidence, only plan the split and report what it would add
+    link_unchanged: hard-link (rather than copy) models the split doesn't change to the output
+    edge_columns: optional columnar.ModelEdgeColumns to collect the model's edges and evidence into
+
+    Models the split doesn't change are copied to the output as they are when output_format is
+    Turtle, rather than reserialized. When splitting with the "auto" or "stream" reader, a textual
+    triage of the model picks the path: a model that provably has no multi-evidence edge is
+    streamed and copied without planning a split, and other models are parsed with rdflib
+    straight away.
+
+    Returns: (report row, split evidence message or None)
+    """
+    triage = split_evidence and not dry_run and reader != "rdflib"
+    if triage:
+        with phase(profile, "triage"):
+            may_split = model_may_have_multi_evidence(model_file)
+    if triage and (may_split or output_format not in GRAPHLESS_UNCHANGED_FORMATS):
+        # The split, or the output format, needs an rdflib graph anyway
+        gocam_graph = builder.parse_ttl(model_file, profile)
+    elif reader == "stream" or reader == "auto":
+        try:
+            gocam_graph = builder.scan_ttl(model_file, profile)
+        except TurtleSyntaxError:
+            gocam_graph = builder.parse_ttl(model_file, profile)
     else:
-        output = sys.stdout
-
-    # Always print statistics header
-    headers = ["Model ID", "Title", "Standard Annotations", "Non-Standard Annotations", "Multi-Evidence Annotations", "Mixed Annotation Type"]
-    print("\t".join(headers), file=output)
-
-    if args.split_evidence and args.output_dir:
-        os.makedirs(args.output_dir, exist_ok=True)
-
-    for f in model_files:
-        gocam_graph = go_cam_graph_builder.parse_ttl(f)
-        filename = os.path.basename(f)
+        gocam_graph = builder.parse_ttl(model_file, profile)
+    try:
+        filename = model_filename(model_file)
         model_id = filename.split(".")[0]
-        sanitized_title = gocam_graph.title.replace("\t", " ").replace("\n", " ")
-
-        # Print statistics
-        mixed_annotation_type = "No"
-        if gocam_graph.standard_annotations and gocam_graph.non_standard_annotations:
-            mixed_annotation_type = "Yes"
-
-        # Count annotations with multiple evidence on at least one edge
-        multi_evidence_count = 0
-        for std_annot in gocam_graph.standard_annotations:
-            for edge in std_annot.edges.values():
-                if len(edge.evidence_uris) > 1:
-                    multi_evidence_count += 1
-                    break  # Count this annotation once, move to next
-
-        print("\t".join(["gomodel:"+model_id, sanitized_title, str(len(gocam_graph.standard_annotations)), str(len(gocam_graph.non_standard_annotations)), str(multi_evidence_count), mixed_annotation_type]), file=output)
-
-        # Split evidence if requested
-        if args.split_evidence:
-            if args.output_dir:
-                output_filename = os.path.join(args.output_dir, filename)
-            else:
-                # Default to same directory with _split suffix
-                base_name = os.path.splitext(f)[0]
-                output_filename = base_name + "_split.ttl"
-
-            gocam_graph.split_evidence_and_write_ttl(output_filename)
-            print(f"Split evidence for {filename} -> {output_filename}")
+        row = report_row(gocam_graph, model_id)
+        if profile:
+            profile.count_graph(gocam_graph)
+        if edge_columns is not None:
+            edge_columns.add_graph(gocam_graph)
+        if not split_evidence:
+            return row, None
+
+        if triage and not may_split:
+            plan = SplitPlan()  # no edge has more than one evidence, so there's nothing to split
+        else:
+            with phase(profile, "plan_split"):
+                plan = gocam_graph.plan_split()
+        if dry_run:
+            summary = plan.summary()
+            if profile:
+                profile.counts.update(summary)
+            return row, (f"Dry run for {filename}: {summary['new_axioms']} new axioms, {summary['new_individuals']} "
+                         f"new individuals, {summary['removed_evidence']} evidence links moved")
+
+        output_filename = split_output_filename(model_file, output_dir, output_format)
+        if plan.is_empty() and output_format in COPYABLE_OUTPUT_FORMATS:
+            with phase(profile, "copy"):
+                copy_unchanged_model(model_file, output_filename, link_unchanged)
+            return row, f"Split evidence for {filename} -> {output_filename} (unchanged)"
+        if plan.is_empty() and output_format in CHANGE_OUTPUT_FORMATS:
+            with phase(profile, "serialize"):
+                with replacing(output_filename) as tmp_filename:
+                    open(tmp_filename, 'w').close()  # nothing to change
+            return row, f"Split evidence for {filename} -> {output_filename} (unchanged)"
+
+        if gocam_graph.g is None:
+            # Streamed graphs can't be modified; parse the model with rdflib to split it
+            gocam_graph = builder.parse_ttl(model_file, profile)
+            with phase(profile, "plan_split"):
+                plan = gocam_graph.plan_split()
+        if output_format in CHANGE_OUTPUT_FORMATS:
+            gocam_graph.record_changes()
+        with phase(profile, "split_evidence"):
+            plan.apply(gocam_graph)
+        with phase(profile, "serialize"):
+            gocam_graph.write_ttl(output_filename, output_format)
+        if profile:
+            profile.counts["output_triples"] = gocam_graph.triple_count()
+        return row, f"Split evidence for {filename} -> {output_filename}"
+    finally:
+        # Disk-backed stores delete their files
+        gocam_graph.close()
+
+
+def collect_model_file(builder: GoCamGraphBuilder, model_file, profile=False, trace_memory=False, edge_columns=False,
+                       **options):
+    """
+    process_model_file, optionally recording a ModelProfile of the run and collecting the model's
+    edges and evidence for a columnar export.
+
+    profile: True to record a ModelProfile, or a callable(model_file, trace_memory) making the
+    ModelProfile (or subclass) to record
+    trace_memory: with profile, also measure peak Python allocations with tracemalloc (slow)
+    Returns: (report row, split evidence message or None, ModelProfile or None, ModelEdgeColumns or None)
+    """
+    columns = None
+    if edge_columns:
+        from .columnar import ModelEdgeColumns
+        columns = ModelEdgeColumns(model_filename(model_file).split(".")[0])
+    if not profile:
+        row, split_message = process_model_file(builder, model_file, edge_columns=columns, **options)
+        return row, split_message, None, columns
+    profile_class = ModelProfile if profile is True else profile
+    with profile_class(model_file, trace_memory) as model_profile:
+        row, split_message = process_model_file(builder, model_file, profile=model_profile, edge_columns=columns,
+                                                **options)
+    return row, split_message, model_profile, columns
+
+
+def profile_model_file(builder: GoCamGraphBuilder, model_file, trace_memory=False, **options):
+    """
+    process_model_file, recording a ModelProfile of the run.
+
+    trace_memory: also measure peak Python allocations with tracemalloc (slow)
+    Returns: (report row, split evidence message or None, ModelProfile)
+    """
+    row, split_message, profile, _ = collect_model_file(builder, model_file, True, trace_memory, **options)
+    return row, split_message, profile
+
+
+# Builder shared with forked workers, set by process_model_files_in_parallel before the pool starts
+_worker_builder = None
+
+
+def _process_model_file_in_worker(task):
+    process, model_file, options = task
+    return process(_worker_builder, model_file, **options)
+
+
+def process_model_files_in_parallel(builder: GoCamGraphBuilder, model_files, jobs, process=process_model_file,
+                                    **options):
+    """
+    Process model files in a pool of forked worker processes.
+
+    Workers inherit the already-loaded builder (and its ontology) copy-on-write instead of
+    reloading it. Results are yielded in model_files order, whichever worker finishes first.
+    The pool takes model_files as fast as it can; pass a pipeline.ModelReader to bound how
+    many models (e.g. streamed out of an archive) are in flight at once.
+    process: process_model_file, profile_model_file or collect_model_file, called as
+    process(builder, model_file, **options)
+    options: keyword arguments for process
+    """
+    global _worker_builder
+    _worker_builder = builder
+    # Keep the ontology out of the cyclic GC's reach so collections in the workers
+    # don't touch (and copy) the shared pages
+    gc.freeze()
+    try:
+        context = multiprocessing.get_context("fork")
+        with context.Pool(jobs) as pool:
+            tasks = ((process, model_file, options) for model_file in model_files)
+            yield from pool.imap(_process_model_file_in_worker, tasks)
+    finally:
+        gc.unfreeze()
 
-    # Close report file if it was opened
-    if report_file:
-        report_file.close()
@@ -0,0 +1,189 @@
+from pathlib import Path
+from urllib.parse import urldefrag, urljoin
+
+import rdflib
+from rdflib import URIRef, plugin
+from rdflib.parser import Parser, create_input_source
+
+GRAPH_BACKENDS = ["rdflib", "dict"]
+
+
+class DictGraph:
+    """
+    Plain-dict stand-in for an rdflib Graph, holding a model's triples in two nested-dict
+    indexes: subject -> predicate -> objects, and predicate -> object -> subjects.
+
+    It has the part of the Graph API the unwinder uses (GoCamGraph, the serializers and the
+    model cache): parse, add, remove, "in", len, iteration, triples, subjects, predicates,
+    objects, predicate_objects, bind, namespaces, serialize and close. Skipping the Graph and
+    Memory store's context bookkeeping makes adding and matching triples much cheaper.
+
+    Triples matching a predicate come back in the same order as from rdflib's Memory store
+    (objects in the order first seen with the predicate, then subjects in insertion order), as
+    do a subject's predicates and objects, so a model is analyzed and split the same way with
+    either backend. There's no object index: patterns with only the object bound scan the graph.
+    """
+    def __init__(self):
+        self.spo = {}  # subject -> predicate -> {object: None}
+        self.pos = {}  # predicate -> object -> {subject: None}
+        self.triple_count = 0
+        self._namespaces = {}  # prefix -> namespace
+        self._prefixes = {}  # namespace -> prefix
+
+    def parse(self, source=None, format="ttl", data=None):
+        """
+        Parse RDF (Turtle by default) from a file name or file-like source, or from data, with
+        rdflib's parser.
+
+        Returns: self
+        """
+        source = create_input_source(source=source, data=data, format=format)
+        try:
+            plugin.get(format, Parser)().parse(source, self)
+        finally:
+            if source.auto_close:
+                source.close()
+        return self
+
+    def absolutize(self, uri, defrag=1):
+        # Used by rdflib's parsers for the base IRI; same as rdflib's NamespaceManager.absolutize
+        result = urljoin(f"{Path.cwd().as_uri()}/", uri, allow_fragments=not defrag)
+        if defrag:
+            result = urldefrag(result)[0]
+        elif uri and uri[-1] == "#" and result[-1] != "#":
+            result += "#"
+        return URIRef(result)
+
+    def add(self, triple):
+        subj, pred, obj = triple
+        predicates = self.spo.get(subj)
+        if predicates is None:
+            predicates = self.spo[subj] = {}
+        objects = predicates.get(pred)
+        if objects is None:
+            objects = predicates[pred] = {}
+        elif obj in objects:
+            return self
+        objects[obj] = None
+        # Emptied dicts are kept on removal (as in Memory), so a re-added triple keeps its place
+        objects_by_pred = self.pos.get(pred)
+        if objects_by_pred is None:
+            objects_by_pred = self.pos[pred] = {}
+        subjects = objects_by_pred.get(obj)
+        if subjects is None:
+            subjects = objects_by_pred[obj] = {}
+        subjects[subj] = None
+        self.triple_count += 1
+        return self
+
+    def remove(self, triple_pattern):
+        for subj, pred, obj in list(self.triples(triple_pattern)):
+            del self.spo[subj][pred][obj]
+            del self.pos[pred][obj][subj]
+            self.triple_count -= 1
+        return self
+
+    def triples(self, triple_pattern):
+        # Keys are copied level by level (as Memory does), so callers can change the graph while iterating
+        subj, pred, obj = triple_pattern
+        if subj is not None:
+            predicates = self.spo.get(subj)
+            if predicates is None:
+                return
+            for p in (list(predicates) if pred is None else [pred]):
+                objects = predicates.get(p)
+                if objects is None:
+                    continue
+                if obj is None:
+                    for o in list(objects):
+                        yield subj, p, o
+                elif obj in objects:
+                    yield subj, p, obj
+        elif pred is not None:
+            objects_by_pred = self.pos.get(pred)
+            if objects_by_pred is None:
+                return
+            for o in (list(objects_by_pred) if obj is None else [obj]):
+                for s in list(objects_by_pred.get(o, ())):
+                    yield s, pred, o
+        else:
+            for s, predicates in list(self.spo.items()):
+                for p, objects in list(predicates.items()):
+                    if obj is None:
+                        for o in list(objects):
+                            yield s, p, o
+                    elif obj in objects:
+                        yield s, p, obj
+
+    def __contains__(self, triple_pattern):
+        for _ in self.triples(triple_pattern):
+            return True
+        return False
+
+    def __iter__(self):
+        return self.triples((None, None, None))
+
+    def __len__(self):
+        return self.triple_count
+
+    def subjects(self, predicate=None, object=None):
+        for subj, _, _ in self.triples((None, predicate, object)):
+            yield subj
+
+    def predicates(self, subject=None, object=None):
+        for _, pred, _ in self.triples((subject, None, object)):
+            yield pred
+
+    def objects(self, subject=None, predicate=None):
+        for _, _, obj in self.triples((subject, predicate, None)):
+            yield obj
+
+    def predicate_objects(self, subject=None):
+        for _, pred, obj in self.triples((subject, None, None)):
+            yield pred, obj
+
+    def bind(self, prefix, namespace, override=True):
+        namespace = URIRef(namespace)
+        if not override and (prefix in self._namespaces or namespace in self._prefixes):
+            return
+        # One prefix per namespace and one namespace per prefix, as in Memory
+        self._prefixes.pop(self._namespaces.pop(prefix, None), None)
+        self._namespaces.pop(self._prefixes.pop(namespace, None), None)
+        self._namespaces[prefix] = namespace
+        self._prefixes[namespace] = prefix
+
+    def namespaces(self):
+        yield from list(self._namespaces.items())
+
+    def to_rdflib(self):
+        """
+        Returns: a new rdflib Graph with the same triples and namespace bindings
+        """
+        g = rdflib.Graph()
+        for prefix, namespace in self.namespaces():
+            g.bind(prefix, namespace)
+        for pred in self.pos:
+            for triple in self.triples((None, pred, None)):
+                g.add(triple)
+        return g
+
+    def serialize(self, destination, format="ttl"):
+        # rdflib's serializers need a real Graph
+        self.to_rdflib().serialize(destination=destination, format=format)
+
+    def close(self):
+        pass
+
+
+def new_graph(backend="rdflib", store=None):
+    """
+    Returns: an empty graph for a model: an rdflib Graph (in store, an rdflib Store, if given)
+    or a DictGraph
+    """
+    if backend == "rdflib":
+        return rdflib.graph.Graph() if store is None else rdflib.graph.Graph(store=store)
+    if store is not None:
+        raise ValueError(f"The {backend!r} graph backend doesn't take an rdflib Store")
+    if backend == "dict":
+        return DictGraph()
+    raise ValueError(f"Unknown graph backend {backend!r}, expected one of {GRAPH_BACKENDS}")
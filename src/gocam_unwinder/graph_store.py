@@ -0,0 +1,288 @@
+import os
+import sqlite3
+import tempfile
+import weakref
+
+from rdflib.plugins.stores.memory import Memory
+from rdflib.store import Store
+from rdflib.term import BNode, Literal, URIRef
+
+# Term kinds
+_URI, _BNODE, _LITERAL, _TYPED_LITERAL, _LANG_LITERAL = range(5)
+
+_SCHEMA = """
+CREATE TABLE terms (id INTEGER PRIMARY KEY, kind INTEGER NOT NULL, value TEXT NOT NULL, extra TEXT NOT NULL,
+                    UNIQUE (kind, value, extra));
+CREATE TABLE pairs (id INTEGER PRIMARY KEY, p INTEGER NOT NULL, o INTEGER NOT NULL, UNIQUE (p, o));
+CREATE TABLE triples (s INTEGER NOT NULL, p INTEGER NOT NULL, o INTEGER NOT NULL, po INTEGER NOT NULL,
+                      UNIQUE (s, p, o));
+CREATE INDEX triples_pos ON triples (p, po);
+CREATE INDEX triples_o ON triples (o);
+"""
+
+# Terms kept in memory on each side of the dictionary; the rest are looked up in SQLite
+TERM_CACHE_SIZE = 1 << 16
+
+
+def _encode_term(term):
+    if isinstance(term, URIRef):
+        return _URI, str(term), ""
+    if isinstance(term, BNode):
+        return _BNODE, str(term), ""
+    if isinstance(term, Literal):
+        if term.language:
+            return _LANG_LITERAL, str(term), term.language
+        if term.datatype:
+            return _TYPED_LITERAL, str(term), str(term.datatype)
+        return _LITERAL, str(term), ""
+    raise ValueError(f"Can't store {term!r} in a SQLite graph store")
+
+
+def _decode_term(kind, value, extra):
+    if kind == _URI:
+        return URIRef(value)
+    if kind == _BNODE:
+        return BNode(value)
+    if kind == _TYPED_LITERAL:
+        return Literal(value, datatype=URIRef(extra))
+    if kind == _LANG_LITERAL:
+        return Literal(value, lang=extra)
+    return Literal(value)
+
+
+def _close_database(connection, path):
+    connection.close()
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class SQLiteStore(Store):
+    """
+    rdflib Store that keeps a model's triples in a temporary SQLite database on disk instead of
+    in memory, for models too large to parse into the default Memory store. Only SQLite's page
+    cache and a bounded term cache stay in memory.
+
+    Triples matching a predicate are returned in the same order as the Memory store (objects
+    in the order first seen with the predicate, then subjects in insertion order), so a model
+    is analyzed and split the same way in either store. Other patterns come back in insertion
+    order. There is one graph per store; contexts are ignored.
+
+    The database is deleted when the store is closed or garbage collected.
+    directory: where to create the database (default: the system temp directory)
+    cache_mb: SQLite page cache size
+    """
+    context_aware = False
+    formula_aware = False
+    graph_aware = False
+
+    def __init__(self, directory=None, cache_mb=64):
+        super().__init__()
+        fd, self.path = tempfile.mkstemp(prefix="gocam-", suffix=".sqlite", dir=directory)
+        os.close(fd)
+        self.connection = sqlite3.connect(self.path, isolation_level=None)
+        self._finalizer = weakref.finalize(self, _close_database, self.connection, self.path)
+        # The database is scratch space: no journal, no syncing, and one open transaction
+        self.connection.executescript(f"PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;"
+                                      f"PRAGMA cache_size = {-1024 * cache_mb}; {_SCHEMA} BEGIN;")
+        self.term_ids = {}  # term -> id, cleared when full
+        self.terms = {}  # id -> term, cleared when full
+        self.triple_count = 0
+        self.__namespace = {}
+        self.__prefix = {}
+
+    def close(self, commit_pending_transaction=False):
+        self._finalizer()
+
+    def term_id(self, term, create=False):
+        """
+        Returns: the term's id, or None if it isn't in the store (and create is False)
+        """
+        term_id = self.term_ids.get(term)
+        if term_id is not None:
+            return term_id
+        key = _encode_term(term)
+        execute = self.connection.execute
+        row = execute("SELECT id FROM terms WHERE kind = ? AND value = ? AND extra = ?", key).fetchone()
+        if row is None:
+            if not create:
+                return None
+            term_id = execute("INSERT INTO terms (kind, value, extra) VALUES (?, ?, ?)", key).lastrowid
+        else:
+            term_id = row[0]
+        if len(self.term_ids) >= TERM_CACHE_SIZE:
+            self.term_ids.clear()
+        self.term_ids[term] = term_id
+        return term_id
+
+    def term(self, term_id):
+        term = self.terms.get(term_id)
+        if term is None:
+            row = self.connection.execute("SELECT kind, value, extra FROM terms WHERE id = ?", (term_id,)).fetchone()
+            term = _decode_term(*row)
+            if len(self.terms) >= TERM_CACHE_SIZE:
+                self.terms.clear()
+            self.terms[term_id] = term
+        return term
+
+    def add(self, triple, context=None, quoted=False):
+        s, p, o = (self.term_id(term, create=True) for term in triple)
+        execute = self.connection.execute
+        row = execute("SELECT id FROM pairs WHERE p = ? AND o = ?", (p, o)).fetchone()
+        po = row[0] if row else execute("INSERT INTO pairs (p, o) VALUES (?, ?)", (p, o)).lastrowid
+        if execute("INSERT OR IGNORE INTO triples (s, p, o, po) VALUES (?, ?, ?, ?)", (s, p, o, po)).rowcount:
+            self.triple_count += 1
+
+    def _where(self, triple_pattern):
+        """
+        Returns: (SQL condition on the pattern's term ids, parameters), or None if a term of the
+        pattern isn't in the store
+        """
+        conditions = []
+        params = []
+        for column, term in zip("spo", triple_pattern):
+            if term is not None:
+                term_id = self.term_id(term)
+                if term_id is None:
+                    return None
+                conditions.append(f"{column} = ?")
+                params.append(term_id)
+        return " AND ".join(conditions) or "1", params
+
+    def triples(self, triple_pattern, context=None):
+        where = self._where(triple_pattern)
+        if where is None:
+            return
+        condition, params = where
+        # Pairs (and so po) are numbered in the order they're first seen, as in Memory's pos index
+        order = "po, rowid" if triple_pattern[0] is None and triple_pattern[1] is not None else "rowid"
+        # fetchall, since callers may change the graph while iterating
+        rows = self.connection.execute(f"SELECT s, p, o FROM triples WHERE {condition} ORDER BY {order}",
+                                       params).fetchall()
+        term = self.term
+        for s, p, o in rows:
+            yield (term(s), term(p), term(o)), iter(())
+
+    def remove(self, triple_pattern, context=None):
+        where = self._where(triple_pattern)
+        if where is not None:
+            condition, params = where
+            self.triple_count -= self.connection.execute(f"DELETE FROM triples WHERE {condition}", params).rowcount
+
+    def __len__(self, context=None):
+        return self.triple_count
+
+    def contexts(self, triple=None):
+        return iter(())
+
+    def bind(self, prefix, namespace, override=True):
+        # Same bookkeeping as Memory.bind
+        bound_namespace = self.__namespace.get(prefix)
+        bound_prefix = self.__prefix.get(namespace)
+        if bound_prefix is None:
+            bound_prefix = self.__prefix.get(bound_namespace)
+        if override:
+            if bound_prefix is not None:
+                del self.__namespace[bound_prefix]
+            if bound_namespace is not None:
+                del self.__prefix[bound_namespace]
+            self.__prefix[namespace] = prefix
+            self.__namespace[prefix] = namespace
+        else:
+            self.__prefix[namespace if bound_namespace is None else bound_namespace] = \
+                prefix if bound_prefix is None else bound_prefix
+            self.__namespace[prefix if bound_prefix is None else bound_prefix] = \
+                namespace if bound_namespace is None else bound_namespace
+
+    def namespace(self, prefix):
+        return self.__namespace.get(prefix)
+
+    def prefix(self, namespace):
+        return self.__prefix.get(namespace)
+
+    def namespaces(self):
+        yield from list(self.__namespace.items())
+
+
+class SpillStore(Store):
+    """
+    rdflib Store that starts in memory and moves a model to a SQLiteStore on disk once it has
+    more than max_triples triples, so small models stay fast and large ones don't exhaust memory.
+
+    max_triples: triple count above which the model spills to disk (0: always on disk)
+    directory: where to create the SQLite database (default: the system temp directory)
+    """
+    context_aware = False
+    formula_aware = False
+    graph_aware = False
+
+    def __init__(self, max_triples, directory=None):
+        super().__init__()
+        self.max_triples = max_triples
+        self.directory = directory
+        self.backend = SQLiteStore(directory) if max_triples <= 0 else Memory()
+
+    @property
+    def spilled(self):
+        return isinstance(self.backend, SQLiteStore)
+
+    def spill(self):
+        """
+        Move the triples and namespace bindings to a SQLiteStore, predicate by predicate so each
+        predicate's triples keep their order.
+        """
+        memory = self.backend
+        disk = SQLiteStore(self.directory)
+        for prefix, namespace in memory.namespaces():
+            disk.bind(prefix, namespace)
+        predicates = {pred: None for (_, pred, _), _ in memory.triples((None, None, None))}
+        for pred in predicates:
+            for triple, _ in memory.triples((None, pred, None)):
+                disk.add(triple)
+        self.backend = disk
+
+    def close(self, commit_pending_transaction=False):
+        self.backend.close()
+
+    # Contexts aren't passed on, so Memory keeps every triple in its default graph
+    def add(self, triple, context=None, quoted=False):
+        self.backend.add(triple, None, quoted)
+        if not self.spilled and len(self.backend) > self.max_triples:
+            self.spill()
+
+    def remove(self, triple_pattern, context=None):
+        self.backend.remove(triple_pattern)
+
+    def triples(self, triple_pattern, context=None):
+        return self.backend.triples(triple_pattern)
+
+    def __len__(self, context=None):
+        return len(self.backend)
+
+    def contexts(self, triple=None):
+        return iter(())
+
+    def bind(self, prefix, namespace, override=True):
+        self.backend.bind(prefix, namespace, override)
+
+    def namespace(self, prefix):
+        return self.backend.namespace(prefix)
+
+    def prefix(self, namespace):
+        return self.backend.prefix(namespace)
+
+    def namespaces(self):
+        return self.backend.namespaces()
+
+
+class SpillStoreFactory:
+    """
+    Creates a SpillStore for each parsed model; see GoCamGraphBuilder.
+    """
+    def __init__(self, max_triples, directory=None):
+        self.max_triples = max_triples
+        self.directory = directory
+
+    def __call__(self):
+        return SpillStore(self.max_triples, self.directory)
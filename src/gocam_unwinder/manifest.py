@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+
+
+def file_fingerprint(filename, with_hash=True):
+    """
+    Returns: dict with the file's size, mtime_ns and (optionally) sha256 content hash
+    """
+    stat = os.stat(filename)
+    fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(filename, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        fingerprint["sha256"] = digest.hexdigest()
+    return fingerprint
+
+
+class RunManifest:
+    """
+    Record of the models already processed into an output directory, used for incremental runs.
+
+    One JSON line per processed model (keyed by file name) with the model file's size, mtime and
+    content hash, the ontology version, whether it was split, and its report row. Records are
+    appended and flushed as each model finishes, so an interrupted run resumes where it stopped.
+    Later lines replace earlier ones for the same model; close() compacts the file.
+    """
+    FILENAME = "manifest.jsonl"
+
+    def __init__(self, manifest_filename, ontology_version):
+        self.manifest_filename = manifest_filename
+        self.ontology_version = ontology_version
+        self.records = {}
+        if os.path.exists(manifest_filename):
+            with open(manifest_filename) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A run killed mid-write can leave a truncated last line
+                        continue
+                    self.records[record["model"]] = record
+        self._file = open(manifest_filename, 'a')
+        if self._file.tell() > 0:
+            # Start on a fresh line in case the last run died mid-write
+            self._file.write("\n")
+
+    def is_current(self, model_file, split_evidence=False, output_filename=None):
+        """
+        True if model_file is unchanged since it was recorded with the same ontology and,
+        when splitting, its split output still exists. Only hashes the file if its size
+        or mtime changed.
+        """
+        record = self.records.get(os.path.basename(model_file))
+        if record is None or record["ontology"] != self.ontology_version:
+            return False
+        if split_evidence and not (record["split"] and output_filename == record["output_file"]
+                                   and os.path.exists(output_filename)):
+            return False
+        fingerprint = file_fingerprint(model_file, with_hash=False)
+        if fingerprint["size"] != record["size"]:
+            return False
+        if fingerprint["mtime_ns"] != record["mtime_ns"]:
+            # Touched but possibly unchanged (e.g. a fresh checkout); compare content
+            fingerprint = file_fingerprint(model_file)
+            if fingerprint["sha256"] != record["sha256"]:
+                return False
+            self.record(model_file, record["row"], record["split"], record["output_file"], fingerprint)
+        return True
+
+    def get_row(self, model_file):
+        return self.records[os.path.basename(model_file)]["row"]
+
+    def record(self, model_file, row, split_evidence=False, output_filename=None, fingerprint=None):
+        """
+        Record model_file as processed. A run that doesn't split keeps an existing split record
+        (split and output_file) as long as the model and ontology are unchanged, so a report-only
+        run doesn't make the next split run redo the split.
+        """
+        if fingerprint is None:
+            fingerprint = file_fingerprint(model_file)
+        previous = self.records.get(os.path.basename(model_file))
+        if (not split_evidence and previous is not None and previous["split"]
+                and previous["ontology"] == self.ontology_version and previous["size"] == fingerprint["size"]
+                and previous["sha256"] == fingerprint["sha256"]):
+            split_evidence, output_filename = True, previous["output_file"]
+        record = {"model": os.path.basename(model_file), **fingerprint, "ontology": self.ontology_version,
+                  "split": bool(split_evidence), "output_file": output_filename, "row": row}
+        self.records[record["model"]] = record
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+        # Rewrite with one line per model
+        tmp_filename = f"{self.manifest_filename}.{os.getpid()}.tmp"
+        with open(tmp_filename, 'w') as f:
+            for record in self.records.values():
+                f.write(json.dumps(record) + "\n")
+        os.replace(tmp_filename, self.manifest_filename)
@@ -0,0 +1,271 @@
+import hashlib
+import os
+import struct
+import sys
+import threading
+from array import array
+
+import rdflib
+from rdflib.term import BNode, Literal, URIRef
+
+from .model_input import decode_model_data, read_model_bytes
+
+MAGIC = b"GCMC"
+FORMAT_VERSION = 1
+# magic, format version, term count, triple count, namespace count, term text length
+_HEADER = struct.Struct("<4sIIIII")
+
+# Term kinds
+_URI, _BNODE, _LITERAL, _TYPED_LITERAL, _LANG_LITERAL, _STRING = range(6)
+
+
+def model_digest(data: bytes):
+    """
+    Content hash of a model's (possibly compressed) bytes, used to key the cache.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def _little_endian(values):
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _read_array(typecode, data, offset, count):
+    values = array(typecode)
+    end = offset + count * values.itemsize
+    values.frombytes(data[offset:end])
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values, end
+
+
+def encode_graph(g: rdflib.Graph):
+    """
+    Encode a parsed model as a term dictionary plus an array of integer triples.
+
+    Layout (little-endian): header, term kinds (uint8), term text end offsets (uint32),
+    term extras (int32: datatype or language term of a literal, else -1), namespace
+    bindings (uint32 prefix/namespace term pairs), triples (uint32 subject/predicate/object
+    term ids), then the UTF-8 term text.
+
+    Triples are written predicate by predicate in rdflib's per-predicate order, so the
+    loaded graph scans each predicate in the same order as a freshly parsed one.
+    """
+    term_ids = {}
+    kinds = array('B')
+    ends = array('I')
+    extras = array('i')
+    texts = []
+    text_length = 0
+
+    def term_id(term, kind=None):
+        nonlocal text_length
+        key = (kind, term) if kind == _STRING else term
+        i = term_ids.get(key)
+        if i is not None:
+            return i
+        extra = -1
+        if kind is None:
+            if isinstance(term, URIRef):
+                kind = _URI
+            elif isinstance(term, BNode):
+                kind = _BNODE
+            elif isinstance(term, Literal):
+                if term.language is not None:
+                    kind, extra = _LANG_LITERAL, term_id(term.language, _STRING)
+                elif term.datatype is not None:
+                    kind, extra = _TYPED_LITERAL, term_id(term.datatype)
+                else:
+                    kind = _LITERAL
+            else:
+                raise ValueError(f"Can't cache term {term!r}")
+        text = str(term)
+        i = term_ids[key] = len(kinds)
+        kinds.append(kind)
+        text_length += len(text)
+        ends.append(text_length)
+        extras.append(extra)
+        texts.append(text)
+        return i
+
+    # Only bindings the parser added; a new Graph already has rdflib's defaults
+    default_bindings = set(rdflib.Graph().namespaces())
+    bindings = array('I')
+    for prefix, namespace in g.namespaces():
+        if (prefix, namespace) not in default_bindings:
+            bindings.append(term_id(prefix, _STRING))
+            bindings.append(term_id(str(namespace), _STRING))
+
+    triples = array('I')
+    for pred in sorted(set(g.predicates())):
+        p = term_id(pred)
+        for subj, _, obj in g.triples((None, pred, None)):
+            triples.append(term_id(subj))
+            triples.append(p)
+            triples.append(term_id(obj))
+
+    text = "".join(texts).encode("utf-8")
+    return b"".join([_HEADER.pack(MAGIC, FORMAT_VERSION, len(kinds), len(triples) // 3, len(bindings) // 2, len(text)),
+                     kinds.tobytes(), _little_endian(ends), _little_endian(extras), _little_endian(bindings),
+                     _little_endian(triples), text])
+
+
+def decode_graph(data: bytes, g: rdflib.Graph = None):
+    """
+    Load triples encoded by encode_graph into g (a new Graph by default).
+
+    Returns: g
+    Raises ValueError if data isn't a cache entry in the current format.
+    """
+    if len(data) < _HEADER.size:
+        raise ValueError("Truncated model cache entry")
+    magic, version, n_terms, n_triples, n_bindings, text_size = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError("Not a model cache entry in the current format")
+    offset = _HEADER.size
+    kinds = data[offset:offset + n_terms]
+    offset += n_terms
+    ends, offset = _read_array('I', data, offset, n_terms)
+    extras, offset = _read_array('i', data, offset, n_terms)
+    bindings, offset = _read_array('I', data, offset, 2 * n_bindings)
+    triples, offset = _read_array('I', data, offset, 3 * n_triples)
+    if len(data) != offset + text_size:
+        raise ValueError("Truncated model cache entry")
+    if max(triples, default=0) >= n_terms or max(bindings, default=0) >= n_terms:
+        raise ValueError("Damaged model cache entry")
+    text = data[offset:].decode("utf-8")
+
+    # Datatype and language terms always precede the literals that use them
+    terms = []
+    start = 0
+    for kind, end, extra in zip(kinds, ends, extras):
+        value = text[start:end]
+        start = end
+        if kind == _URI:
+            terms.append(URIRef(value))
+        elif kind == _BNODE:
+            terms.append(BNode(value))
+        elif kind == _LITERAL:
+            terms.append(Literal(value))
+        elif kind == _TYPED_LITERAL:
+            terms.append(Literal(value, datatype=terms[extra]))
+        elif kind == _LANG_LITERAL:
+            terms.append(Literal(value, lang=terms[extra]))
+        else:
+            terms.append(value)
+
+    if g is None:
+        g = rdflib.Graph()
+    for i in range(0, len(bindings), 2):
+        g.bind(terms[bindings[i]], terms[bindings[i + 1]])
+    add = g.add
+    for i in range(0, len(triples), 3):
+        add((terms[triples[i]], terms[triples[i + 1]], terms[triples[i + 2]]))
+    return g
+
+
+class ParsedModelCache:
+    """
+    On-disk cache of parsed models, one encode_graph file per model keyed by the hash of the
+    model file's content. Loading an entry skips the Turtle parser entirely.
+
+    Entries are written atomically, so worker processes can share a cache directory. Loading
+    an entry touches its modification time; evict() removes the least recently used entries
+    until the cache fits in max_bytes.
+    """
+    FILENAME_TEMPLATE = "{digest}.gcm"
+
+    def __init__(self, cache_dir, max_bytes=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path_for(self, digest):
+        return os.path.join(self.cache_dir, self.FILENAME_TEMPLATE.format(digest=digest))
+
+    def load(self, digest, g: rdflib.Graph = None):
+        """
+        Returns: the cached graph for digest, loaded into g, or None if it isn't cached
+        """
+        cache_path = self.path_for(digest)
+        try:
+            with open(cache_path, 'rb') as f:
+                data = f.read()
+            os.utime(cache_path)
+        except FileNotFoundError:
+            return None
+        try:
+            return decode_graph(data, g)
+        except (ValueError, IndexError):
+            # Stale format or a damaged file; it is replaced by the next store
+            return None
+
+    def store(self, digest, g: rdflib.Graph):
+        cache_path = self.path_for(digest)
+        # Write to a temporary file first so concurrent runs (and server threads) never see a partial entry
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(encode_graph(g))
+        os.replace(tmp_path, cache_path)
+
+    def parse(self, model, g: rdflib.Graph):
+        """
+        Load a model path or ArchiveMember into g from the cache, or parse it with rdflib and
+        cache the result.
+
+        Returns: g
+        """
+        data = read_model_bytes(model)
+        digest = model_digest(data)
+        if self.load(digest, g) is not None:
+            self.hits += 1
+            return g
+        self.misses += 1
+        g.parse(data=decode_model_data(model, data), format="ttl")
+        self.store(digest, g)
+        return g
+
+    def entries(self):
+        """
+        Returns: list of (modification time, size, path) of the cache entries
+        """
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".gcm") and entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, max_bytes=None):
+        """
+        Remove least recently used entries until the cache is no larger than max_bytes
+        (default: the cache's max_bytes).
+
+        Returns: number of entries removed
+        """
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+        if max_bytes is None:
+            return 0
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
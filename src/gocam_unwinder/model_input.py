@@ -0,0 +1,155 @@
+import bz2
+import gzip
+import os
+import tarfile
+
+MODEL_EXTENSIONS = (".ttl", ".ttl.gz", ".ttl.bz2")
+_DECOMPRESSORS = {".gz": gzip.decompress, ".bz2": bz2.decompress}
+
+
+class ArchiveMember:
+    """
+    A model held in memory, read out of a tar archive (or sent inline to the server): the
+    member's name and (still compressed, for .ttl.gz/.ttl.bz2 members) content.
+    """
+    __slots__ = ("archive", "name", "data")
+
+    def __init__(self, archive, name, data: bytes):
+        self.archive = archive
+        self.name = name
+        self.data = data
+
+    def __str__(self):
+        return f"{self.archive}:{self.name}"
+
+
+def model_filename(model):
+    """
+    Returns: file name of a model path or ArchiveMember, without directories
+    """
+    if isinstance(model, ArchiveMember):
+        return os.path.basename(model.name)
+    return os.path.basename(model)
+
+
+def strip_model_extension(filename):
+    """
+    Returns: filename without its .ttl, .ttl.gz or .ttl.bz2 extension
+    """
+    for extension in MODEL_EXTENSIONS:
+        if filename.endswith(extension):
+            return filename[:-len(extension)]
+    return os.path.splitext(filename)[0]
+
+
+def is_model_filename(filename):
+    return filename.endswith(MODEL_EXTENSIONS)
+
+
+def is_compressed(model):
+    name = model.name if isinstance(model, ArchiveMember) else model
+    return os.path.splitext(name)[1] in _DECOMPRESSORS
+
+
+def read_model_bytes(model):
+    """
+    Returns: the content of a model path or ArchiveMember, still compressed for .gz and .bz2
+    """
+    if isinstance(model, ArchiveMember):
+        return model.data
+    with open(model, 'rb') as f:
+        return f.read()
+
+
+def decode_model_data(model, data: bytes):
+    """
+    Returns: the Turtle text of a model's content (see read_model_bytes), decompressing .gz and .bz2
+    """
+    name = model.name if isinstance(model, ArchiveMember) else model
+    decompress = _DECOMPRESSORS.get(os.path.splitext(name)[1])
+    if decompress:
+        data = decompress(data)
+    return data.decode("utf-8")
+
+
+def read_model_text(model):
+    """
+    Returns: the Turtle text of a model path or ArchiveMember, decompressing .gz and .bz2
+    """
+    return decode_model_data(model, read_model_bytes(model))
+
+
+def is_archive(path):
+    return os.path.isfile(path) and tarfile.is_tarfile(path)
+
+
+def iter_archive_models(archive_path, model_id_filter=None):
+    """
+    Stream models out of a tar archive (optionally gzip, bz2 or xz compressed) one member
+    at a time, without extracting it. Members that are not models or are not in
+    model_id_filter are skipped without reading their content, as are later copies of a model
+    (e.g. X.ttl.gz after X.ttl): only the first member of each model ID is yielded.
+    """
+    seen = set()
+    with tarfile.open(archive_path, mode="r|*") as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+            filename = os.path.basename(member.name)
+            if not is_model_filename(filename):
+                continue
+            model_id = strip_model_extension(filename)
+            if model_id in seen or (model_id_filter is not None and model_id not in model_id_filter):
+                continue
+            seen.add(model_id)
+            yield ArchiveMember(archive_path, member.name, archive.extractfile(member).read())
+
+
+def iter_model_names(models_path):
+    """
+    File names of the models in a directory or tar archive, one per model ID, chosen as by
+    iter_model_files. Archive members are listed from their headers without reading their content.
+    """
+    if is_archive(models_path):
+        seen = set()
+        with tarfile.open(models_path, mode="r|*") as archive:
+            for member in archive:
+                filename = os.path.basename(member.name)
+                if member.isfile() and is_model_filename(filename) and strip_model_extension(filename) not in seen:
+                    seen.add(strip_model_extension(filename))
+                    yield filename
+        return
+    yield from _model_filenames_by_id(models_path).values()
+
+
+def _model_filenames_by_id(directory):
+    # Model ID -> file name, preferring X.ttl to X.ttl.gz to X.ttl.bz2 when a model has several files
+    filenames = {}
+    for f in os.listdir(directory):
+        if is_model_filename(f):
+            model_id = strip_model_extension(f)
+            current = filenames.get(model_id)
+            if current is None or _extension_rank(f) < _extension_rank(current):
+                filenames[model_id] = f
+    return filenames
+
+
+def _extension_rank(filename):
+    return next(i for i, extension in enumerate(MODEL_EXTENSIONS) if filename.endswith(extension))
+
+
+def iter_model_files(models_path, model_id_filter=None):
+    """
+    Model files in a directory (.ttl, .ttl.gz and .ttl.bz2), or the models in a tar archive.
+
+    Each model ID is processed once, since its files would share a split output file and a
+    report row: of a directory's X.ttl, X.ttl.gz and X.ttl.bz2, the first present in that order
+    is used, and of an archive's, the first member.
+    """
+    if is_archive(models_path):
+        yield from iter_archive_models(models_path, model_id_filter)
+        return
+    for model_id, f in _model_filenames_by_id(models_path).items():
+        # If filter is provided, only include models in the filter
+        if model_id_filter is None or model_id in model_id_filter:
+            yield os.path.join(models_path, f)
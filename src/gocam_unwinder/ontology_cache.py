@@ -0,0 +1,115 @@
+import bisect
+import functools
+import hashlib
+import mmap
+import os
+import sys
+from array import array
+from importlib import metadata
+
+MOLECULAR_FUNCTION_ROOT = "GO:0003674"
+RELATIONS_FILENAME_TEMPLATE = "gocam_relations_ontobio-{version}.txt"
+
+
+@functools.lru_cache(maxsize=None)
+def ontology_digest(ontology_filename):
+    """
+    Content hash of the ontology file, used to key compiled caches to an ontology release.
+    """
+    digest = hashlib.sha256()
+    with open(ontology_filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class MolecularFunctionCache:
+    """
+    Compiled molecular function closure: the sorted numeric IDs of GO:0003674 and all of its
+    is_a descendants, stored as little-endian uint32 values and memory-mapped on load.
+
+    Answers the same question as GoAspector.is_molecular_function without loading the ontology.
+    """
+    FILENAME_TEMPLATE = "go_mf_{digest}.u32"
+
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        self._mmap = None
+        if os.path.getsize(cache_path) == 0:
+            self.ids = array('I')
+            return
+        with open(cache_path, 'rb') as f:
+            if sys.byteorder == "little":
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self.ids = memoryview(self._mmap).cast('I')
+            else:
+                self.ids = array('I')
+                self.ids.frombytes(f.read())
+                self.ids.byteswap()
+
+    def __contains__(self, go_id: int):
+        i = bisect.bisect_left(self.ids, go_id)
+        return i < len(self.ids) and self.ids[i] == go_id
+
+    def __len__(self):
+        return len(self.ids)
+
+    def is_molecular_function(self, go_curie):
+        prefix, _, local_id = go_curie.partition(":")
+        if prefix != "GO" or not local_id.isdigit():
+            return False
+        return int(local_id) in self
+
+    @classmethod
+    def path_for(cls, cache_dir, ontology_filename):
+        digest = ontology_digest(ontology_filename)
+        return os.path.join(cache_dir, cls.FILENAME_TEMPLATE.format(digest=digest[:16]))
+
+    @staticmethod
+    def compile(parsed_ontology, cache_path):
+        """
+        Write the molecular function closure of an ontobio ontology to cache_path.
+        """
+        go_ids = set()
+        for curie in parsed_ontology.descendants(MOLECULAR_FUNCTION_ROOT, relations=["subClassOf"], reflexive=True):
+            prefix, _, local_id = curie.partition(":")
+            if prefix == "GO" and local_id.isdigit():
+                go_ids.add(int(local_id))
+        ids = array('I', sorted(go_ids))
+        if sys.byteorder != "little":
+            ids.byteswap()
+
+        cache_dir = os.path.dirname(cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temporary file first so concurrent runs never see a partial cache
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            ids.tofile(f)
+        os.replace(tmp_path, cache_path)
+
+
+def relations_cache_path(cache_dir):
+    # The relation list ships with ontobio, so it is keyed by the installed ontobio version
+    return os.path.join(cache_dir, RELATIONS_FILENAME_TEMPLATE.format(version=metadata.version("ontobio")))
+
+
+def read_gocam_relations(cache_dir):
+    """
+    Returns: the cached GO-CAM relation URIs, or None if they have not been cached yet
+    """
+    cache_path = relations_cache_path(cache_dir)
+    if not os.path.exists(cache_path):
+        return None
+    with open(cache_path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def write_gocam_relations(cache_dir, gocam_relations):
+    cache_path = relations_cache_path(cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        for relation in gocam_relations:
+            print(relation, file=f)
+    os.replace(tmp_path, cache_path)
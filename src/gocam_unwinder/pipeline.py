@@ -0,0 +1,132 @@
+import collections
+import os
+import queue
+import threading
+
+from .model_input import ArchiveMember
+
+_DONE = object()
+
+
+def model_cost(model):
+    """
+    Returns: bytes a model counts against an InFlightBudget: its size on disk, or its (still
+    compressed) data for an ArchiveMember
+    """
+    if isinstance(model, ArchiveMember):
+        return len(model.data)
+    return os.path.getsize(model)
+
+
+def prefetch(model):
+    """
+    Ask the OS to start reading a model file into the page cache, so the read overlaps with
+    processing the models ahead of it. ArchiveMembers are already in memory.
+    """
+    if isinstance(model, ArchiveMember) or not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(model, os.O_RDONLY)
+    except OSError:
+        return  # reported when the model is processed
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    finally:
+        os.close(fd)
+
+
+class InFlightBudget:
+    """
+    Limits the models (and their bytes) between being read and their result being written.
+
+    A model that doesn't fit waits until enough earlier models are released. A model larger
+    than max_bytes on its own is let through once nothing else is in flight, so the pipeline
+    never stalls.
+    """
+    def __init__(self, max_models=None, max_bytes=None):
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self.models = 0
+        self.bytes = 0
+        self.closed = False
+        self._condition = threading.Condition()
+
+    def _fits(self, cost):
+        if self.models == 0:
+            return True
+        if self.max_models is not None and self.models >= self.max_models:
+            return False
+        return self.max_bytes is None or self.bytes + cost <= self.max_bytes
+
+    def acquire(self, cost):
+        """
+        Block until a model of cost bytes fits in the budget.
+
+        Returns: False if the budget was closed while waiting
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.closed or self._fits(cost))
+            if self.closed:
+                return False
+            self.models += 1
+            self.bytes += cost
+            return True
+
+    def release(self, cost):
+        with self._condition:
+            self.models -= 1
+            self.bytes -= cost
+            self._condition.notify_all()
+
+    def close(self):
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+
+class ModelReader:
+    """
+    First stage of a run: lists the models (or streams them out of an archive) on a background
+    thread, prefetching each file, as far ahead as the InFlightBudget allows.
+
+    Iterating yields the models in order. Call task_done() as each model's result is written,
+    in the same order, to release its share of the budget. The thread only starts once
+    iteration does, so worker processes can be forked before it exists.
+    """
+    def __init__(self, model_files, budget: InFlightBudget):
+        self.budget = budget
+        self._costs = collections.deque()  # costs of the models handed out, in order
+        self._queue = queue.Queue()  # bounded by the budget
+        self._thread = threading.Thread(target=self._read, args=(model_files,), name="model-reader", daemon=True)
+
+    def _read(self, model_files):
+        try:
+            for model in model_files:
+                cost = model_cost(model)
+                if not self.budget.acquire(cost):
+                    break
+                prefetch(model)
+                self._queue.put((model, cost))
+        except BaseException as e:
+            self._queue.put((e, None))
+        finally:
+            self._queue.put((_DONE, None))
+
+    def __iter__(self):
+        if self._thread.ident is None:  # not started yet
+            self._thread.start()
+        while True:
+            model, cost = self._queue.get()
+            if model is _DONE:
+                return
+            if cost is None:
+                raise model
+            self._costs.append(cost)
+            yield model
+
+    def task_done(self):
+        self.budget.release(self._costs.popleft())
+
+    def close(self):
+        # Stop reading ahead; the thread exits at its next budget check
+        self.budget.close()
@@ -0,0 +1,185 @@
+import contextlib
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+from .model_input import model_filename
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+_VM_HWM_RE = re.compile(r"^VmHWM:\s+(\d+) kB", re.MULTILINE)
+
+
+def phase(profile, name):
+    """
+    Context manager timing a phase into profile, or doing nothing if profile is None.
+    """
+    if profile is None:
+        return contextlib.nullcontext()
+    return profile.phase(name)
+
+
+def rss_available():
+    return os.path.exists("/proc/self/statm")
+
+
+def rss_kb(pid="self"):
+    """
+    Returns: current resident set size of process pid (by default this one) in KiB, or None if
+    it can't be read (e.g. the process is gone, or there's no /proc)
+    """
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def reset_peak_rss():
+    """
+    Reset this process's peak RSS (VmHWM) to its current RSS, so peak_rss_kb measures from now.
+
+    Returns: True if it was reset, which requires Linux's /proc/self/clear_refs
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def peak_rss_kb():
+    """
+    Returns: this process's peak RSS in KiB since it started or since reset_peak_rss, or None if
+    unavailable
+    """
+    try:
+        with open("/proc/self/status") as f:
+            match = _VM_HWM_RE.search(f.read())
+        if match:
+            return int(match.group(1))
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class ModelProfile:
+    """
+    Wall and CPU time per phase, graph counts and memory use of processing one model.
+
+    Used as a context manager around the whole model; the phases are timed with phase().
+    Memory is the process's RSS before and after the model, and its peak RSS while processing
+    it. On Linux the peak is reset as the model starts, so it's the model's own peak. Elsewhere
+    the process's peak can only be attributed to the model when the model raised it, and is
+    None otherwise. The peak is per process, so models profiled concurrently on threads of one
+    process (e.g. in server mode) share it.
+    trace_memory: also measure the peak of Python allocations with tracemalloc. This is more
+    precise than RSS but slows processing down considerably.
+    """
+    def __init__(self, model_file, trace_memory=False):
+        self.model = model_filename(model_file)
+        self.trace_memory = trace_memory
+        self.phases = {}  # phase name -> {"wall": seconds, "cpu": seconds}
+        self.counts = {}
+        self.wall = self.cpu = 0.0
+        self.rss_start_kb = self.rss_end_kb = self.peak_rss_kb = None
+        self.tracemalloc_peak_bytes = None
+
+    def __enter__(self):
+        if self.trace_memory:
+            # Leave a tracemalloc session someone else started running
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start()
+            else:
+                tracemalloc.reset_peak()
+        self.rss_start_kb = rss_kb()
+        self._peak_reset = reset_peak_rss()
+        self._previous_peak_kb = None if self._peak_reset else peak_rss_kb()
+        self._start = time.perf_counter(), time.process_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.wall = time.perf_counter() - self._start[0]
+        self.cpu = time.process_time() - self._start[1]
+        self.rss_end_kb = rss_kb()
+        peak = peak_rss_kb()
+        if self._peak_reset or (peak is not None and self._previous_peak_kb is not None
+                                and peak > self._previous_peak_kb):
+            self.peak_rss_kb = peak
+        if self.trace_memory:
+            self.tracemalloc_peak_bytes = tracemalloc.get_traced_memory()[1]
+            if self._started_tracing:
+                tracemalloc.stop()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            timing = self.phases.setdefault(name, {"wall": 0.0, "cpu": 0.0})
+            timing["wall"] += time.perf_counter() - wall
+            timing["cpu"] += time.process_time() - cpu
+
+    def count_triples(self, gocam_graph):
+        """
+        Record the size of a parsed GoCamGraph, before it is analyzed.
+        """
+        self.counts["triples"] = gocam_graph.triple_count()
+
+    def count_edges(self, edges):
+        """
+        Record the edges extracted from a model, before its annotations are.
+        """
+        self.counts["edges"] = len(edges)
+        self.counts["evidence"] = sum(len(edge.evidence_uris) for edge in edges)
+
+    def count_graph(self, gocam_graph):
+        """
+        Record the size of an analyzed GoCamGraph.
+        """
+        self.count_triples(gocam_graph)
+        self.count_edges(gocam_graph.edges)
+        self.counts["standard_annotations"] = len(gocam_graph.standard_annotations)
+        self.counts["non_standard_annotations"] = len(gocam_graph.non_standard_annotations)
+
+    def rss_growth_kb(self):
+        """
+        Returns: change in RSS over the model in KiB (negative if memory was returned to the
+        system), or None if RSS couldn't be read
+        """
+        if self.rss_start_kb is None or self.rss_end_kb is None:
+            return None
+        return self.rss_end_kb - self.rss_start_kb
+
+    def record(self):
+        """
+        Returns: JSON-serializable dict, one line of the --profile file
+        """
+        record = {
+            "model": self.model,
+            "wall": round(self.wall, 6),
+            "cpu": round(self.cpu, 6),
+            "phases": {name: {"wall": round(timing["wall"], 6), "cpu": round(timing["cpu"], 6)}
+                       for name, timing in self.phases.items()},
+            "counts": self.counts,
+            "rss_start_kb": self.rss_start_kb,
+            "rss_end_kb": self.rss_end_kb,
+            "rss_growth_kb": self.rss_growth_kb(),
+            "peak_rss_kb": self.peak_rss_kb,
+        }
+        if self.trace_memory:
+            record["tracemalloc_peak_bytes"] = self.tracemalloc_peak_bytes
+        return record
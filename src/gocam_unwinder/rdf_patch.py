@@ -0,0 +1,176 @@
+import hashlib
+
+import rdflib
+from rdflib.plugins.parsers.ntriples import W3CNTriplesParser
+
+from .serializers import term
+
+AXIOM_PREDICATES = (rdflib.OWL.annotatedSource, rdflib.OWL.annotatedProperty, rdflib.OWL.annotatedTarget)
+
+
+def axiom_label(source, property, target):
+    """
+    Blank node label for the axiom annotating (source, property, target) in a patch:
+    "axiom-" and the first 32 hex digits of the SHA-256 of "<source> <property> <target>"
+    (the terms in N-Triples form). Blank node labels don't survive loading a model, so this
+    is how a patch names an axiom both in the model it was made from and in a triple store.
+    """
+    key = " ".join(term(node) for node in (source, property, target))
+    return "axiom-" + hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+
+def _axiom_key(gocam_graph, bnode):
+    # (source, property, target) identifying an axiom blank node wherever the model is loaded
+    parts = gocam_graph.index.get_axiom_parts(bnode)
+    if parts is not None:
+        source, target, property = parts
+        unique = gocam_graph.find_axiom_bnode_by_triple(source, property, target) == bnode
+        if unique and not any(isinstance(node, rdflib.BNode) for node in parts):
+            return source, property, target
+    raise ValueError(f"Can't write a patch that changes blank node {bnode}: it isn't an axiom with a unique "
+                     f"annotated source, property and target")
+
+
+def _bnode_label(gocam_graph, bnode):
+    return axiom_label(*_axiom_key(gocam_graph, bnode))
+
+
+def format_patch(gocam_graph, changes):
+    """
+    changes: list of ("A", triple) and ("D", triple) in the order they were made, as recorded by
+    GoCamGraph.record_changes
+    Returns: the changes as an RDF Patch transaction (empty if there are none). Blank nodes are
+    axioms, labelled by axiom_label.
+    """
+    if not changes:
+        return ""
+    labels = {}
+    lines = ["TX ."]
+    for op, triple in changes:
+        nodes = []
+        for node in triple:
+            if isinstance(node, rdflib.BNode):
+                label = labels.get(node)
+                if label is None:
+                    label = labels[node] = _bnode_label(gocam_graph, node)
+                nodes.append(f"_:{label}")
+            else:
+                nodes.append(term(node))
+        lines.append(f"{op} {' '.join(nodes)} .")
+    lines.append("TC .")
+    return "\n".join(lines) + "\n"
+
+
+def _net_changes(changes):
+    # triple -> "A" or "D": a triple ends up as its last change left it, whatever came before
+    net = {}
+    for op, triple in changes:
+        net[triple] = op
+    return net
+
+
+def format_sparql_update(gocam_graph, changes):
+    """
+    changes: as for format_patch
+    Returns: the changes as a SPARQL 1.1 Update request (empty if there are none), which any
+    store holding the model can run. Unlike a patch's blank node labels, this doesn't depend on
+    how the store labels blank nodes: changes to an existing axiom are matched through its
+    owl:annotatedSource, owl:annotatedProperty and owl:annotatedTarget, one DELETE/INSERT ...
+    WHERE operation per axiom. New triples are added with INSERT DATA, where new axioms are
+    labelled by axiom_label. Every operation ends with ";", so requests can be concatenated.
+    """
+    net = _net_changes(changes)
+    new_axioms = {triple[0] for triple, op in net.items()
+                  if op == "A" and triple[1] == rdflib.OWL.annotatedSource and isinstance(triple[0], rdflib.BNode)}
+    by_axiom = {}  # existing axiom blank node -> ([triples to delete], [triples to insert])
+    deletes = []
+    inserts = []
+    for triple, op in net.items():
+        bnodes = [node for node in triple if isinstance(node, rdflib.BNode)]
+        existing = [node for node in bnodes if node not in new_axioms]
+        if op == "D" and len(existing) < len(bnodes):
+            continue  # a new axiom's triple that was added and removed again
+        if not existing:
+            (inserts if op == "A" else deletes).append(triple)
+        elif len(existing) < len(bnodes) or len(set(existing)) > 1:
+            raise ValueError(f"Can't write a SPARQL update for {triple}: it links two axioms")
+        else:
+            by_axiom.setdefault(existing[0], ([], []))[op == "A"].append(triple)
+
+    def render(triple, axiom=None):
+        nodes = []
+        for node in triple:
+            if node == axiom:
+                nodes.append("?axiom")
+            elif isinstance(node, rdflib.BNode):
+                nodes.append(f"_:{_bnode_label(gocam_graph, node)}")
+            else:
+                nodes.append(term(node))
+        return f"  {' '.join(nodes)} ."
+
+    operations = []
+    for axiom, (axiom_deletes, axiom_inserts) in by_axiom.items():
+        source, property, target = _axiom_key(gocam_graph, axiom)
+        lines = []
+        if axiom_deletes:
+            lines += ["DELETE {", *(render(triple, axiom) for triple in axiom_deletes), "}"]
+        if axiom_inserts:
+            lines += ["INSERT {", *(render(triple, axiom) for triple in axiom_inserts), "}"]
+        lines += ["WHERE {", f"  ?axiom {term(rdflib.OWL.annotatedSource)} {term(source)} ;",
+                  f"    {term(rdflib.OWL.annotatedProperty)} {term(property)} ;",
+                  f"    {term(rdflib.OWL.annotatedTarget)} {term(target)} .", "} ;"]
+        operations.append("\n".join(lines))
+    if deletes:
+        operations.append("\n".join(["DELETE DATA {", *(render(triple) for triple in deletes), "} ;"]))
+    if inserts:
+        operations.append("\n".join(["INSERT DATA {", *(render(triple) for triple in inserts), "} ;"]))
+    return "".join(operation + "\n" for operation in operations)
+
+
+def axiom_labels(g):
+    """
+    Returns: dict of axiom_label -> axiom blank node, for the complete axioms in g (an rdflib
+    Graph or a graph_backend.DictGraph)
+    """
+    parts = {}
+    for position, pred in enumerate(AXIOM_PREDICATES):
+        for subj, _, obj in g.triples((None, pred, None)):
+            if isinstance(subj, rdflib.BNode):
+                parts.setdefault(subj, [None, None, None])[position] = obj
+    labels = {}
+    for bnode, (source, property, target) in parts.items():
+        if source is not None and property is not None and target is not None:
+            labels.setdefault(axiom_label(source, property, target), bnode)
+    return labels
+
+
+class _LastTriple:
+    # W3CNTriplesParser sink
+    triple_parsed = None
+
+    def triple(self, s, p, o):
+        self.triple_parsed = (s, p, o)
+
+
+def apply_patch(g, patch):
+    """
+    Apply an RDF Patch written by format_patch (or several, e.g. a corpus patch) to g, a graph of
+    the models it was made from. Axiom labels name the matching axioms of g; other blank node
+    labels are new blank nodes. A generic RDF Patch processor would take the labels of deleted
+    axioms as new blank nodes, and delete nothing; format_sparql_update doesn't have this problem.
+
+    Returns: g
+    """
+    sink = _LastTriple()
+    parser = W3CNTriplesParser(sink, bnode_context=axiom_labels(g))
+    for line_number, line in enumerate(patch.splitlines(), 1):
+        op, _, statement = line.strip().partition(" ")
+        if op in ("A", "D"):
+            parser.parsestring(statement)
+            if op == "A":
+                g.add(sink.triple_parsed)
+            else:
+                g.remove(sink.triple_parsed)
+        elif op not in ("TX", "TC", "H", "") and not op.startswith("#"):
+            raise ValueError(f"Line {line_number} of the patch isn't an RDF Patch row: {line!r}")
+    return g
@@ -0,0 +1,67 @@
+REPORT_HEADERS = ["Model ID", "Title", "Standard Annotations", "Non-Standard Annotations", "Multi-Evidence Annotations", "Mixed Annotation Type"]
+
+
+def report_row(gocam_graph, model_id):
+    """
+    Statistics report row for an analyzed GoCamGraph.
+    """
+    sanitized_title = gocam_graph.title.replace("\t", " ").replace("\n", " ")
+
+    mixed_annotation_type = "No"
+    if gocam_graph.standard_annotations and gocam_graph.non_standard_annotations:
+        mixed_annotation_type = "Yes"
+
+    # Count annotations with multiple evidence on at least one edge
+    multi_evidence_count = 0
+    for std_annot in gocam_graph.standard_annotations:
+        for edge in std_annot.edges.values():
+            if len(edge.evidence_uris) > 1:
+                multi_evidence_count += 1
+                break  # Count this annotation once, move to next
+
+    return ["gomodel:" + model_id, sanitized_title, str(len(gocam_graph.standard_annotations)),
+            str(len(gocam_graph.non_standard_annotations)), str(multi_evidence_count), mixed_annotation_type]
+
+
+def read_report(report_filename):
+    """
+    Returns: the rows of a report written by the CLI, without its header
+    Raises ValueError if the file doesn't start with the report header.
+    """
+    with open(report_filename) as f:
+        header = f.readline().rstrip("\n").split("\t")
+        if header != REPORT_HEADERS:
+            raise ValueError(f"{report_filename} is not a statistics report")
+        return [line.rstrip("\n").split("\t") for line in f if line.strip()]
+
+
+def merge_reports(report_filenames, expected_model_ids=None):
+    """
+    Combine the reports of several shards of a run.
+
+    expected_model_ids: optional model IDs (without the gomodel: prefix) the reports should cover
+    Returns: (rows sorted by model ID, list of problems: duplicated, missing or unexpected models)
+    """
+    rows = {}
+    sources = {}  # model ID -> report files it appears in
+    for report_filename in report_filenames:
+        for row in read_report(report_filename):
+            rows.setdefault(row[0], row)
+            sources.setdefault(row[0], []).append(report_filename)
+
+    problems = [f"{model_id} appears {len(files)} times, in {', '.join(files)}"
+                for model_id, files in sorted(sources.items()) if len(files) > 1]
+    if expected_model_ids is not None:
+        expected = {"gomodel:" + model_id for model_id in expected_model_ids}
+        problems.extend(f"{model_id} is missing" for model_id in sorted(expected - rows.keys()))
+        problems.extend(f"{model_id} is not in the corpus" for model_id in sorted(rows.keys() - expected))
+    return [rows[model_id] for model_id in sorted(rows)], problems
+
+
+def report_totals(rows):
+    """
+    Returns: a "Total" row for rows: the model count and the sums of the annotation columns
+    """
+    return ["Total", f"{len(rows)} models", str(sum(int(row[2]) for row in rows)),
+            str(sum(int(row[3]) for row in rows)), str(sum(int(row[4]) for row in rows)),
+            str(sum(row[5] == "Yes" for row in rows))]
@@ -0,0 +1,173 @@
+import math
+import random
+from statistics import NormalDist
+
+from .report import REPORT_HEADERS
+
+ESTIMATE_HEADERS = ["Column", "Sampled Total", "Estimated Total", "Total Low", "Total High", "Estimated Share",
+                    "Share Low", "Share High"]
+
+# Report columns that are estimated, by index in a report row
+ESTIMATED_COLUMNS = [2, 3, 4, 5]
+
+
+def allocate(stratum_sizes, sample_size):
+    """
+    Split sample_size between strata in proportion to their sizes, taking at least two models
+    from each stratum (where the sample is large enough) so every stratum's variance can be
+    estimated.
+
+    Returns: list of the number of models to draw from each stratum
+    """
+    population_size = sum(stratum_sizes)
+    if sample_size >= population_size:
+        return list(stratum_sizes)
+    counts = [0] * len(stratum_sizes)
+    minimums = [min(size, 2) for size in stratum_sizes]
+    if sum(minimums) <= sample_size:
+        counts = minimums
+    # Give each remaining model to the stratum furthest below its proportional share
+    for _ in range(sample_size - sum(counts)):
+        index = max((i for i, size in enumerate(stratum_sizes) if counts[i] < size),
+                    key=lambda i: stratum_sizes[i] * sample_size / population_size - counts[i])
+        counts[index] += 1
+    return counts
+
+
+class SampleDesign:
+    """
+    A seeded random sample of a corpus' models, drawn separately from size strata: the models
+    sorted by file size and cut into strata of about equal count. With one stratum it's a
+    simple random sample.
+
+    It can be used wherever a set of model IDs filters the models, e.g. iter_model_files.
+    strata: list of the model IDs in each stratum
+    sampled: list of the model IDs drawn from each stratum
+    """
+    def __init__(self, strata, sampled, seed):
+        self.strata = strata
+        self.sampled = sampled
+        self.seed = seed
+        self.model_ids = set().union(*sampled)
+
+    def __contains__(self, model_id):
+        return model_id in self.model_ids
+
+    def population_size(self):
+        return sum(len(stratum) for stratum in self.strata)
+
+    def sample_size(self):
+        return len(self.model_ids)
+
+
+def draw_sample(model_sizes, sample_size, seed=0, strata=1):
+    """
+    Draw a SampleDesign of sample_size models (all of them, if there are fewer).
+
+    The sample only depends on the model IDs, their sizes and the seed, not on listing order.
+    model_sizes: iterable of (model ID, size in bytes). Sizes are only used to form strata.
+    """
+    # Files of the same model (e.g. .ttl and .ttl.gz) count as one model
+    sizes = {}
+    for model_id, size in model_sizes:
+        sizes[model_id] = sizes.get(model_id, 0) + size
+    ordered = sorted(sizes, key=lambda model_id: (sizes[model_id], model_id))
+    strata = min(strata, len(ordered)) or 1
+    bounds = [len(ordered) * i // strata for i in range(strata + 1)]
+    model_strata = [sorted(ordered[bounds[i]:bounds[i + 1]]) for i in range(strata)]
+
+    rng = random.Random(seed)
+    counts = allocate([len(stratum) for stratum in model_strata], sample_size)
+    sampled = [rng.sample(stratum, count) for stratum, count in zip(model_strata, counts)]
+    return SampleDesign(model_strata, sampled, seed)
+
+
+def _column_values(row, column):
+    # (value counted in the column total, whether the model counts towards the column's share)
+    if REPORT_HEADERS[column] == "Mixed Annotation Type":
+        value = 1 if row[column] == "Yes" else 0
+    else:
+        value = int(row[column])
+    return value, 1 if value > 0 else 0
+
+
+def _stratified_total(design, values_by_model):
+    """
+    Returns: (estimated corpus total, its variance) from the sampled models' values, with the
+    standard stratified estimator. A stratum with fewer than two processed models (e.g. because
+    some were quarantined) borrows the variance of the whole sample, and its mean too if it has
+    none.
+    """
+    values = list(values_by_model.values())
+    pooled_mean = sum(values) / len(values)
+    pooled_variance = sum((v - pooled_mean) ** 2 for v in values) / (len(values) - 1) if len(values) > 1 else 0.0
+    total = variance = 0.0
+    for stratum, sampled in zip(design.strata, design.sampled):
+        stratum_values = [values_by_model[model_id] for model_id in sampled if model_id in values_by_model]
+        population, n = len(stratum), len(stratum_values)
+        if n == population:
+            total += sum(stratum_values)  # every model in the stratum was processed
+            continue
+        if n < 2:
+            mean = stratum_values[0] if stratum_values else pooled_mean
+            stratum_variance = pooled_variance
+        else:
+            mean = sum(stratum_values) / n
+            stratum_variance = sum((v - mean) ** 2 for v in stratum_values) / (n - 1)
+        total += population * mean
+        variance += population ** 2 * (1 - n / population) * stratum_variance / max(n, 1)
+    return total, variance
+
+
+def _wilson_interval(share, n, z):
+    if math.isinf(n):
+        return share, share
+    center = (share + z * z / (2 * n)) / (1 + z * z / n)
+    half_width = z / (1 + z * z / n) * math.sqrt(share * (1 - share) / n + z * z / (4 * n * n))
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+def estimate_corpus(design, rows_by_model, confidence=0.95):
+    """
+    Estimate corpus-wide report totals from the rows of the sampled models.
+
+    For each annotation column there's an estimated corpus total (for "Mixed Annotation Type",
+    the number of mixed models) and the share of models with a non-zero value (or "Yes"), each
+    with a confidence interval. Total intervals use the normal approximation, and share
+    intervals the Wilson score interval on the sample's effective size, which stays sensible
+    for rare features.
+
+    rows_by_model: dict of model ID -> report row, for the sampled models that were processed
+    Returns: list of rows under ESTIMATE_HEADERS, starting with the model counts
+    Raises ValueError if no sampled model was processed.
+    """
+    rows_by_model = {model_id: row for model_id, row in rows_by_model.items() if model_id in design}
+    if not rows_by_model:
+        raise ValueError("None of the sampled models were processed, so nothing can be estimated")
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    population = design.population_size()
+    processed = len(rows_by_model)
+    estimates = [["Models", str(processed), str(population), str(population), str(population), "", "", ""]]
+    for column in ESTIMATED_COLUMNS:
+        values = {model_id: _column_values(row, column) for model_id, row in rows_by_model.items()}
+        sampled_total = sum(value for value, _ in values.values())
+        total, variance = _stratified_total(design, {model_id: value for model_id, (value, _) in values.items()})
+        half_width = z * math.sqrt(variance)
+        # The corpus total can't be lower than what the sample already contains
+        total_low, total_high = max(sampled_total, total - half_width), total + half_width
+
+        present, present_variance = _stratified_total(design,
+                                                      {model_id: flag for model_id, (_, flag) in values.items()})
+        share = min(1.0, present / population)
+        share_variance = present_variance / population ** 2
+        if share_variance > 0 and 0 < share < 1:
+            effective_size = share * (1 - share) / share_variance
+        elif processed == population:
+            effective_size = math.inf
+        else:
+            # No variation in the sample: what a simple random sample of this size would give
+            effective_size = processed / (1 - processed / population)
+        share_low, share_high = _wilson_interval(share, effective_size, z)
+        estimates.append([REPORT_HEADERS[column], str(sampled_total), f"{total:.1f}", f"{total_low:.1f}",
+                          f"{total_high:.1f}", f"{share:.4f}", f"{share_low:.4f}", f"{share_high:.4f}"])
+    return estimates
@@ -0,0 +1,114 @@
+import contextlib
+import os
+import re
+import threading
+
+import rdflib
+
+OUTPUT_FORMATS = ["ttl", "ttl-fast", "nt"]
+# "patch" and "sparql" output is the split's changes rather than a graph; see rdf_patch
+CHANGE_OUTPUT_FORMATS = ("patch", "sparql")
+OUTPUT_EXTENSIONS = {"ttl": ".ttl", "ttl-fast": ".ttl", "nt": ".nt", "patch": ".rdfp", "sparql": ".ru"}
+
+_IRI_ESCAPE_RE = re.compile(r'[\x00-\x20<>"{}|^`\\]')
+_LITERAL_ESCAPE_RE = re.compile(r'[\\"\n\r]')
+_LITERAL_ESCAPES = {'\\': '\\\\', '"': '\\"', '\n': '\\n', '\r': '\\r'}
+
+
+def iri_term(uri):
+    value = str(uri)
+    if _IRI_ESCAPE_RE.search(value):
+        value = _IRI_ESCAPE_RE.sub(lambda m: f"\\u{ord(m.group()):04X}", value)
+    return f"<{value}>"
+
+
+def literal_term(literal: rdflib.Literal):
+    # Single-line quoted form, valid in both N-Triples and Turtle
+    value = str(literal)
+    if _LITERAL_ESCAPE_RE.search(value):
+        value = _LITERAL_ESCAPE_RE.sub(lambda m: _LITERAL_ESCAPES[m.group()], value)
+    if literal.language:
+        return f'"{value}"@{literal.language}'
+    if literal.datatype:
+        return f'"{value}"^^{iri_term(literal.datatype)}'
+    return f'"{value}"'
+
+
+def term(node):
+    if isinstance(node, rdflib.Literal):
+        return literal_term(node)
+    if isinstance(node, rdflib.BNode):
+        return f"_:{node}"
+    return iri_term(node)
+
+
+@contextlib.contextmanager
+def replacing(filename):
+    """
+    Context manager yielding a temporary filename to write in place of filename, which it
+    replaces once the block completes. Truncating filename instead would also overwrite any
+    other hard link to it, such as the input model an earlier --link-unchanged run linked.
+    """
+    tmp_filename = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        yield tmp_filename
+        os.replace(tmp_filename, filename)
+    finally:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+
+
+def _sorted_subjects(g: rdflib.graph.Graph):
+    # Sorting only the subjects keeps output deterministic without holding the serialization
+    return sorted(set(g.subjects()), key=lambda s: (isinstance(s, rdflib.BNode), str(s)))
+
+
+def write_ntriples(g: rdflib.graph.Graph, filename):
+    """
+    Write g as N-Triples, one subject at a time, without building the serialization in memory.
+    """
+    with open(filename, 'w', encoding='utf-8') as f:
+        for subj in _sorted_subjects(g):
+            subj_term = term(subj)
+            for pred, obj in g.predicate_objects(subj):
+                f.write(f"{subj_term} {iri_term(pred)} {term(obj)} .\n")
+
+
+def write_turtle_fast(g: rdflib.graph.Graph, filename):
+    """
+    Write g as flat Turtle: one block per subject, with ';' between predicates and ',' between
+    objects of the same predicate, emitted as the graph is iterated. Unlike rdflib's pretty
+    serializer it doesn't nest blank nodes or compute prefixes.
+    """
+    with open(filename, 'w', encoding='utf-8') as f:
+        for subj in _sorted_subjects(g):
+            f.write(term(subj))
+            previous_pred = None
+            for pred, obj in g.predicate_objects(subj):
+                if pred == previous_pred:
+                    f.write(f" , {term(obj)}")
+                    continue
+                if previous_pred is not None:
+                    f.write(" ;\n\t")
+                else:
+                    f.write(" ")
+                pred_term = "a" if pred == rdflib.RDF.type else iri_term(pred)
+                f.write(f"{pred_term} {term(obj)}")
+                previous_pred = pred
+            f.write(" .\n\n")
+
+
+def serialize(g: rdflib.graph.Graph, filename, output_format="ttl"):
+    """
+    Write g to filename in output_format, replacing the file rather than writing into it (see
+    replacing).
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format {output_format!r}, expected one of {OUTPUT_FORMATS}")
+    with replacing(filename) as tmp_filename:
+        if output_format == "ttl":
+            g.serialize(destination=tmp_filename, format='ttl')
+        elif output_format == "ttl-fast":
+            write_turtle_fast(g, tmp_filename)
+        else:
+            write_ntriples(g, tmp_filename)
@@ -0,0 +1,225 @@
+import collections
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import ontology_cache
+from .gocam_ttl import GoCamGraphBuilder, profile_model_file
+from .model_input import ArchiveMember
+from .report import REPORT_HEADERS
+
+
+class RequestError(ValueError):
+    pass
+
+
+class UnwinderService:
+    """
+    Keeps a GoCamGraphBuilder (and its ontology) loaded between requests.
+
+    A request is a dict with an "op":
+    - "analyze": report row for a model, given as a "model" path or as inline "ttl" text
+      (with an optional "model_id", used for the row and output file name)
+    - "split": analyze and split the model. The split output is written to "output_dir" if
+      given, otherwise it is returned in the response as "output"
+    - "reload": load the ontology again, e.g. after a new GO release
+    - "stats": request count so far and latency percentiles of the recent requests
+
+    Optional "reader" and "output_format" request fields override the service defaults.
+    Responses echo the request's "id" and report the request's latency in milliseconds.
+    Requests may be handled concurrently; a reload doesn't disturb requests in progress.
+    log: optional stream to write a line per request, with its latency, to
+    graph_store: optional factory of rdflib Stores for parsed models, see GoCamGraphBuilder
+    graph_backend: graph that parsed models are held in, see GoCamGraphBuilder
+    """
+    def __init__(self, ontology_filename, ontology_cache_dir=None, model_cache=None, reader="auto",
+                 output_format="ttl", log=None, graph_store=None, graph_backend="rdflib"):
+        self.ontology_filename = ontology_filename
+        self.ontology_cache_dir = ontology_cache_dir
+        self.model_cache = model_cache
+        self.reader = reader
+        self.output_format = output_format
+        self.log = log
+        self.graph_store = graph_store
+        self.graph_backend = graph_backend
+        self.builder = None
+        self.requests = 0
+        self.errors = 0
+        self.latencies_ms = collections.deque(maxlen=10000)  # most recent requests
+        self._reload_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        with self._reload_lock:
+            # The ontology file may have been replaced since the digest was taken
+            ontology_cache.ontology_digest.cache_clear()
+            # Requests in progress keep the builder they started with
+            self.builder = GoCamGraphBuilder(self.ontology_filename, self.ontology_cache_dir, self.model_cache,
+                                             self.graph_store, self.graph_backend)
+
+    def handle(self, request):
+        """
+        Returns: response dict; errors are reported in the response rather than raised
+        """
+        start = time.perf_counter()
+        response = {"id": request.get("id")} if isinstance(request, dict) else {"id": None}
+        try:
+            if not isinstance(request, dict):
+                raise RequestError("Request must be a JSON object")
+            response.update(self._handle(request))
+            response["ok"] = True
+        except Exception as e:
+            # A bad request or model must not take the server down
+            response["ok"] = False
+            response["error"] = f"{type(e).__name__}: {e}"
+        latency_ms = (time.perf_counter() - start) * 1000
+        response["latency_ms"] = round(latency_ms, 3)
+        with self._stats_lock:
+            self.requests += 1
+            self.errors += not response["ok"]
+            self.latencies_ms.append(latency_ms)
+        if self.log:
+            op = request.get("op") if isinstance(request, dict) else None
+            model = (request.get("model") or request.get("model_id", "")) if isinstance(request, dict) else ""
+            status = "ok" if response["ok"] else "error"
+            print(f"{op}\t{model}\t{status}\t{latency_ms:.1f} ms", file=self.log, flush=True)
+        return response
+
+    def _handle(self, request):
+        op = request.get("op")
+        if op == "reload":
+            self.reload()
+            return {}
+        if op == "stats":
+            return self.stats()
+        if op not in ("analyze", "split"):
+            raise RequestError(f"Unknown op {op!r}")
+
+        model = self._request_model(request)
+        output_format = request.get("output_format", self.output_format)
+        options = dict(split_evidence=op == "split", reader=request.get("reader", self.reader),
+                       output_format=output_format)
+        builder = self.builder
+        if op == "split" and not request.get("output_dir"):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                row, split_message, profile = profile_model_file(builder, model, output_dir=tmp_dir, **options)
+                (output_name,) = os.listdir(tmp_dir)
+                with open(os.path.join(tmp_dir, output_name), encoding="utf-8") as f:
+                    output = f.read()
+            response = {"output": output}
+        else:
+            row, split_message, profile = profile_model_file(builder, model, output_dir=request.get("output_dir"),
+                                                             **options)
+            response = {"message": split_message} if split_message else {}
+        response["row"] = dict(zip(REPORT_HEADERS, row))
+        response["phases"] = {name: round(timing["wall"] * 1000, 3) for name, timing in profile.phases.items()}
+        return response
+
+    @staticmethod
+    def _request_model(request):
+        if "ttl" in request:
+            # Inline models are processed like an archive member: in memory, by model ID
+            model_id = request.get("model_id", "inline")
+            if os.path.basename(model_id) != model_id or not model_id:
+                raise RequestError(f"Invalid model_id {model_id!r}")
+            return ArchiveMember("<request>", f"{model_id}.ttl", request["ttl"].encode("utf-8"))
+        if "model" in request:
+            return request["model"]
+        raise RequestError("Request needs a 'model' path or inline 'ttl'")
+
+    def stats(self):
+        with self._stats_lock:
+            latencies = sorted(self.latencies_ms)
+            requests, errors = self.requests, self.errors
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))], 3)
+
+        return {"requests": requests, "errors": errors,
+                "latencies_ms": {"p50": percentile(50), "p90": percentile(90), "p99": percentile(99),
+                               "max": round(latencies[-1], 3) if latencies else None}}
+
+
+def serve_jsonl(service: UnwinderService, instream=None, outstream=None, workers=4):
+    """
+    JSON-lines protocol: one request object per input line, one response per output line.
+
+    Up to workers requests are handled at once, so responses can come back out of order;
+    match them to requests by "id". Returns at the end of the input, once all responses
+    are written.
+    """
+    instream = instream or sys.stdin
+    outstream = outstream or sys.stdout
+    write_lock = threading.Lock()
+
+    def write(response):
+        with write_lock:
+            print(json.dumps(response), file=outstream, flush=True)
+
+    with ThreadPoolExecutor(workers) as executor:
+        for line in instream:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                write({"id": None, "ok": False, "error": f"Invalid JSON: {e}"})
+                continue
+            executor.submit(lambda request: write(service.handle(request)), request)
+
+
+class UnwinderRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /analyze, /split or /reload with a JSON request body (without "op"); GET /stats.
+    """
+    service: UnwinderService = None
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/stats":
+            self.send_error(404)
+            return
+        self._send(self.service.handle({"op": "stats"}))
+
+    def do_POST(self):
+        op = self.path.strip("/")
+        if op not in ("analyze", "split", "reload"):
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as e:
+            self._send({"id": None, "ok": False, "error": f"Invalid JSON: {e}"}, 400)
+            return
+        if isinstance(request, dict):
+            request["op"] = op
+        response = self.service.handle(request)
+        self._send(response, 200 if response["ok"] else 400)
+
+    def _send(self, response, status=200):
+        body = json.dumps(response).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # The service logs each request with its latency instead
+        pass
+
+
+def make_http_server(service: UnwinderService, host="127.0.0.1", port=8765):
+    """
+    Returns: a ThreadingHTTPServer (one thread per request) serving service; call serve_forever()
+    """
+    handler = type("Handler", (UnwinderRequestHandler,), {"service": service})
+    return ThreadingHTTPServer((host, port), handler)
@@ -0,0 +1,70 @@
+import hashlib
+import heapq
+
+
+def parse_shard(text):
+    """
+    Parse a shard spec "i/N" (1 <= i <= N).
+
+    Returns: (zero-based shard index, shard count)
+    Raises ValueError for a malformed spec.
+    """
+    index, sep, count = text.partition("/")
+    if not sep or not index.isdigit() or not count.isdigit():
+        raise ValueError(f"Shard must look like i/N, e.g. 1/4, not {text!r}")
+    index, count = int(index), int(count)
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard {index}/{count} is out of range; use 1/{count} to {count}/{count}")
+    return index - 1, count
+
+
+def shard_of(model_id, count):
+    """
+    Returns: the zero-based shard a model ID belongs to. The hash doesn't depend on the Python
+    process (unlike hash()), so every machine assigns a model to the same shard.
+    """
+    digest = hashlib.sha256(model_id.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count
+
+
+class HashShard:
+    """
+    Model ID filter for one shard of a corpus partitioned by model ID hash. It can be used
+    wherever a set of model IDs filters the models, e.g. iter_model_files.
+
+    A model always lands in the same shard, however the rest of the corpus changes.
+    model_ids: optional set of model IDs (-l) that the shard is restricted to
+    """
+    def __init__(self, index, count, model_ids=None):
+        self.index = index
+        self.count = count
+        self.model_ids = model_ids
+
+    def __contains__(self, model_id):
+        if self.model_ids is not None and model_id not in self.model_ids:
+            return False
+        return shard_of(model_id, self.count) == self.index
+
+
+def balance_by_size(model_sizes, count):
+    """
+    Partition models into count shards of about equal total size: the largest models are
+    assigned first, each to the shard with the smallest total so far.
+
+    Every machine must see the same model files and sizes to compute the same partition.
+    model_sizes: iterable of (model ID, size in bytes)
+    Returns: list of count sets of model IDs
+    """
+    # Files of the same model (e.g. .ttl and .ttl.gz) stay together
+    sizes = {}
+    for model_id, size in model_sizes:
+        sizes[model_id] = sizes.get(model_id, 0) + size
+
+    shards = [set() for _ in range(count)]
+    totals = [(0, index) for index in range(count)]  # heap of (total size, shard index)
+    # Ties are broken by model ID, so the partition doesn't depend on listing order
+    for model_id, size in sorted(sizes.items(), key=lambda model: (-model[1], model[0])):
+        total, index = heapq.heappop(totals)
+        shards[index].add(model_id)
+        heapq.heappush(totals, (total + size, index))
+    return shards
@@ -0,0 +1,110 @@
+import random
+
+MODEL_BASE = "http://model.geneontology.org/"
+OBO = "http://purl.obolibrary.org/obo/"
+MOLECULAR_FUNCTION = OBO + "GO_0003674"
+BIOLOGICAL_PROCESS = OBO + "GO_0008150"
+CELLULAR_COMPONENT = OBO + "GO_0005575"
+ENABLED_BY = OBO + "RO_0002333"
+PART_OF = OBO + "BFO_0000050"
+OCCURS_IN = OBO + "BFO_0000066"
+HAS_INPUT = OBO + "RO_0002233"
+CAUSALLY_UPSTREAM_OF = OBO + "RO_0002411"
+EVIDENCE_CLASS = OBO + "ECO_0000314"
+
+# Extension edges from a molecular function, after enabled_by. Only the head of a causal chain
+# gets part_of, so chained annotations still pass the multiple part_of check.
+EXTENSIONS = [(PART_OF, BIOLOGICAL_PROCESS), (OCCURS_IN, CELLULAR_COMPONENT)]
+
+PREFIX_BLOCK = """@prefix owl: <http://www.w3.org/2002/07/owl#> .
+@prefix dc: <http://purl.org/dc/elements/1.1/> .
+@prefix pav: <http://purl.org/pav/> .
+@prefix lego: <http://geneontology.org/lego/> .
+
+"""
+
+
+def generate_gocam_ttl(annotations=100, edges_per_annotation=3, evidence_per_edge=2, chain_depth=1,
+                       metadata_collision_rate=1.0, seed=0, model_id="SYNTH_0000001"):
+    """
+    Generate a synthetic GO-CAM model as Turtle text, for benchmarks and scaling tests.
+
+    annotations: number of annotation units, each a molecular function enabled_by a gene product
+    edges_per_annotation: edges from each molecular function (enabled_by, then part_of, occurs_in,
+        then has_input extensions)
+    evidence_per_edge: evidence individuals on every edge
+    chain_depth: annotations are linked into causally_upstream_of chains of this many units, each
+        chain forming one connected component
+    metadata_collision_rate: probability that an evidence individual shares its metadata with the
+        matching evidence on the other edges of its component. At 1.0 every component is a
+        consistent (standard) annotation; lower rates produce inconsistent, non-standard ones.
+    """
+    rng = random.Random(seed)
+    model = MODEL_BASE + model_id + "/"
+    lines = [PREFIX_BLOCK,
+             f"<{MODEL_BASE}{model_id}> a owl:Ontology ;\n\tdc:title \"Synthetic model {model_id}\" .\n"]
+    counters = {"individual": 0, "axiom": 0}
+
+    def individual(class_uri):
+        counters["individual"] += 1
+        uri = f"{model}i{counters['individual']}"
+        lines.append(f"<{uri}> a owl:NamedIndividual , <{class_uri}> .\n")
+        return uri
+
+    def edge(source, relation, target, signatures):
+        counters["axiom"] += 1
+        axiom = f"_:ax{counters['axiom']}"
+        evidence_uris = []
+        for date, contributor, source_ref in signatures:
+            evidence_uri = individual(EVIDENCE_CLASS)
+            lines.append(f"<{evidence_uri}> dc:date \"{date}\" ;\n\tdc:contributor \"{contributor}\" ;\n"
+                         f"\tdc:source \"{source_ref}\" ;\n\tpav:providedBy \"http://example.org\" .\n")
+            evidence_uris.append(f"<{evidence_uri}>")
+        lines.append(f"<{source}> <{relation}> <{target}> .\n")
+        lines.append(f"{axiom} a owl:Axiom ;\n\towl:annotatedSource <{source}> ;\n\towl:annotatedProperty <{relation}> ;\n"
+                     f"\towl:annotatedTarget <{target}> ;\n\tlego:evidence {' , '.join(evidence_uris)} ;\n"
+                     f"\tdc:contributor \"https://orcid.org/0000-0000-0000-0000\" ;\n\tdc:date \"2024-01-01\" .\n")
+
+    unique = [0]
+
+    def edge_signatures(component_signatures):
+        signatures = []
+        for signature in component_signatures:
+            if rng.random() < metadata_collision_rate:
+                signatures.append(signature)
+            else:
+                unique[0] += 1
+                signatures.append(("2001-01-01", f"https://orcid.org/unique-{unique[0]}", f"PMID:9{unique[0]}"))
+        return signatures
+
+    component = -1
+    previous_mf = None
+    for a in range(annotations):
+        if a % chain_depth == 0:
+            component += 1
+            previous_mf = None
+            component_signatures = [(f"2020-{1 + k % 12:02d}-{1 + k // 12 % 28:02d}",
+                                     f"https://orcid.org/0000-0000-0000-{component % 10000:04d}",
+                                     f"PMID:{component + 1}{k:03d}") for k in range(evidence_per_edge)]
+        mf = individual(MOLECULAR_FUNCTION)
+        gene_product = individual(f"http://identifiers.org/uniprot/P{a:05d}")
+        edge(mf, ENABLED_BY, gene_product, edge_signatures(component_signatures))
+        extensions = EXTENSIONS if previous_mf is None else EXTENSIONS[1:]
+        for j in range(1, edges_per_annotation):
+            if j - 1 < len(extensions):
+                relation, target_class = extensions[j - 1]
+            else:
+                relation, target_class = HAS_INPUT, f"http://identifiers.org/uniprot/Q{a:05d}{j}"
+            edge(mf, relation, individual(target_class), edge_signatures(component_signatures))
+        if previous_mf is not None:
+            edge(previous_mf, CAUSALLY_UPSTREAM_OF, mf, edge_signatures(component_signatures))
+        previous_mf = mf
+    return "".join(lines)
+
+
+def write_gocam_ttl(filename, **params):
+    """
+    Write a generate_gocam_ttl model to filename.
+    """
+    with open(filename, 'w') as f:
+        f.write(generate_gocam_ttl(**params))
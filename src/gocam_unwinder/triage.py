@@ -0,0 +1,90 @@
+import mmap
+import re
+from functools import lru_cache
+
+from .model_input import ArchiveMember, decode_model_data, is_compressed, read_model_bytes
+
+EVIDENCE_IRI = b"http://geneontology.org/lego/evidence"
+
+_IRI = rb'<[^<>"{}|^`\\\x00-\x20]*>'
+_PNAME = rb'[A-Za-z][\w\-]*(?:\.[\w\-]+)*:[\w\-]+(?:\.[\w\-]+)*'
+_BNODE = rb'_:[\w\-]+(?:\.[\w\-]+)*'
+_UNICODE_ESCAPE_RE = re.compile(rb'\\[uU]')
+# With no relative IRIs, @base can't change what an IRI means
+_RELATIVE_IRI_RE = re.compile(rb'<(?![A-Za-z][A-Za-z0-9+\-.]*:)')
+# IRIs that a prefix directive could bind to spell the evidence IRI as a prefixed name. (A prefix
+# for the whole IRI needs no check: its directive is itself a use that can't be accounted for.)
+_NAMESPACE_RE = re.compile(b"<(" + b"|".join(re.escape(EVIDENCE_IRI[:i]) for i in range(len(EVIDENCE_IRI) - 1, 0, -1))
+                           + b")>")
+_PLAIN_LOCAL_RE = re.compile(rb'[A-Za-z0-9]+')
+_DOT_SEGMENT_RE = re.compile(rb'/\.\.?(?:/|>)')
+
+
+@lru_cache(maxsize=64)
+def _evidence_patterns(locals):
+    """
+    Returns: (regex of every spelling of the evidence predicate, regex of a line that uses it as
+    the first predicate of a statement, regex of a use of it as the subject of "a")
+    """
+    forms = [re.escape(b"<" + EVIDENCE_IRI + b">")]
+    if locals:
+        # Any prefix will do, as long as the prefixed name is a whole token
+        forms.append(rb'(?<![\w\-.:%\\])(?:[A-Za-z][\w\-.]*)?:(?:' + b"|".join(map(re.escape, locals)) +
+                     rb')(?![\w\-:%\\])(?!\.[\w\-:%\\])')
+    evidence = b"(?:" + b"|".join(forms) + b")"
+    statement = re.compile(rb'[ \t]*(' + _BNODE + b"|" + _IRI + rb')[ \t]+(' + evidence + rb')[ \t]+(?:' + _IRI + b"|" +
+                           _BNODE + b"|" + _PNAME + rb')[ \t]*(?:;|\.(?=\s|$))')
+    declaration = re.compile(evidence + rb'[ \t]+a[ \t]')
+    return re.compile(evidence), statement, declaration
+
+
+def may_have_multi_evidence(data):
+    """
+    Conservative textual check of a model's Turtle (bytes, or e.g. an mmap) for an axiom with
+    more than one lego:evidence, without parsing it.
+
+    Returns False only if every use of the evidence predicate is provably the first predicate
+    of a statement about a distinct subject, with a single object: then no edge has more than
+    one evidence, and splitting can't change the model. Anything else (object lists, evidence
+    on a continuation line, prefixed-name subjects, relative or escaped IRIs...) returns True.
+    """
+    locals = set()
+    for namespace in set(_NAMESPACE_RE.findall(data)):
+        local = EVIDENCE_IRI[len(namespace):]
+        if not _PLAIN_LOCAL_RE.fullmatch(local):
+            return True  # the prefixed name would need escapes
+        locals.add(local)
+    evidence, statement, declaration = _evidence_patterns(tuple(sorted(locals)))
+
+    subjects = set()
+    for use in evidence.finditer(data):
+        if declaration.match(data, use.start()):
+            continue  # "<evidence> a owl:AnnotationProperty" can only be a subject
+        match = statement.match(data, data.rfind(b"\n", 0, use.start()) + 1)
+        if match is None or match.start(2) != use.start():
+            return True  # e.g. an object list, or evidence on a continuation line
+        subject = match.group(1)
+        if subject in subjects or _DOT_SEGMENT_RE.search(subject):
+            return True  # evidence repeated for a subject, or a subject with other spellings
+        subjects.add(subject)
+    # Checked last, as most models with multi-evidence edges are caught above
+    return bool(_UNICODE_ESCAPE_RE.search(data) or _RELATIVE_IRI_RE.search(data))
+
+
+def model_may_have_multi_evidence(model):
+    """
+    may_have_multi_evidence for a model path or ArchiveMember. Plain files are memory-mapped
+    rather than read.
+    """
+    if isinstance(model, ArchiveMember) or is_compressed(model):
+        data = read_model_bytes(model)
+        if is_compressed(model):
+            data = decode_model_data(model, data).encode("utf-8")
+        return may_have_multi_evidence(data)
+    with open(model, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return False
+        with data:
+            return may_have_multi_evidence(data)
@@ -0,0 +1,266 @@
+import re
+from urllib.parse import urljoin
+
+import rdflib
+
+XSD = "http://www.w3.org/2001/XMLSchema#"
+RDF_FIRST = rdflib.RDF.first
+RDF_REST = rdflib.RDF.rest
+RDF_NIL = rdflib.RDF.nil
+
+
+class TurtleSyntaxError(ValueError):
+    pass
+
+
+_TOKEN_RE = re.compile(r'''
+    (?P<ws>(?:\s+|\#[^\n]*)+)
+  | (?P<iri><[^<>"{}|^`\\\x00-\x20]*(?:\\u[0-9A-Fa-f]{4}[^<>"{}|^`\\\x00-\x20]*|\\U[0-9A-Fa-f]{8}[^<>"{}|^`\\\x00-\x20]*)*>)
+  | (?P<long_string>"""(?:[^"\\]|\\.|"(?!""))*"""|\'\'\'(?:[^'\\]|\\.|'(?!''))*\'\'\')
+  | (?P<string>"(?:[^"\\\n\r]|\\.)*"|'(?:[^'\\\n\r]|\\.)*')
+  | (?P<bnode>_:(?:[^\s;,()\[\]."'<>]|\.(?=[^\s;,()\[\]."'<>]))+)
+  | (?P<langtag>@[A-Za-z]+(?:-[A-Za-z0-9]+)*)
+  | (?P<datatype_marker>\^\^)
+  | (?P<number>[+-]?(?:\d+\.\d*[eE][+-]?\d+|\.?\d+[eE][+-]?\d+|\d*\.\d+|\d+))
+  | (?P<pname>(?:[A-Za-z](?:[\w\-.]*[\w\-])?)?:(?:[^\s;,()\[\]."'<>\\]|\\.|\.(?=[^\s;,()\[\]."'<>]))*)
+  | (?P<keyword>[A-Za-z]+)
+  | (?P<punct>[\[\]();,.])
+''', re.VERBOSE)
+
+_ECHAR = {'t': '\t', 'b': '\b', 'n': '\n', 'r': '\r', 'f': '\f', '"': '"', "'": "'", '\\': '\\'}
+_ESCAPE_RE = re.compile(r'\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))', re.DOTALL)
+
+
+def _unescape(match):
+    if match.group(1) or match.group(2):
+        return chr(int(match.group(1) or match.group(2), 16))
+    char = match.group(3)
+    if char not in _ECHAR:
+        raise TurtleSyntaxError(f"Invalid escape \\{char}")
+    return _ECHAR[char]
+
+
+def unescape_string(value):
+    if '\\' not in value:
+        return value
+    return _ESCAPE_RE.sub(_unescape, value)
+
+
+def tokenize(text):
+    """
+    Yield (kind, value) tokens of a Turtle document, skipping whitespace and comments.
+    """
+    pos = 0
+    end = len(text)
+    match = _TOKEN_RE.match
+    while pos < end:
+        m = match(text, pos)
+        if m is None:
+            line = text.count("\n", 0, pos) + 1
+            raise TurtleSyntaxError(f"Unexpected character {text[pos]!r} on line {line}")
+        kind = m.lastgroup
+        if kind != "ws":
+            yield kind, m.group()
+        pos = m.end()
+
+
+class TurtleScanner:
+    """
+    Single-pass Turtle reader that yields triples without building an rdflib Graph.
+
+    IRIs become (interned) URIRefs and blank nodes BNodes. Literals are passed to
+    literal_factory(lexical_value, datatype, language), which by default keeps only the
+    lexical value as a plain str. Raises TurtleSyntaxError for input it can't read.
+    """
+    def __init__(self, literal_factory=None):
+        self.literal_factory = literal_factory or (lambda value, datatype, language: value)
+        self.prefixes = {}
+        self.base = None
+        self._iris = {}
+        self._bnodes = {}
+
+    def iri(self, value):
+        term = self._iris.get(value)
+        if term is None:
+            if self.base and ':' not in value:
+                term = rdflib.URIRef(urljoin(self.base, value))
+            else:
+                term = rdflib.URIRef(value)
+            self._iris[value] = term
+        return term
+
+    def scan_file(self, filename):
+        with open(filename, encoding="utf-8") as f:
+            text = f.read()
+        return self.scan(text)
+
+    def scan(self, text):
+        self._tokens = tokenize(text)
+        self._peeked = None
+        while self._peek() is not None:
+            kind, value = self._peek()
+            if kind == "langtag" and value in ("@prefix", "@base"):
+                self._next()
+                self._directive(value[1:])
+                self._expect(".")
+            elif kind == "keyword" and value.upper() in ("PREFIX", "BASE"):
+                self._next()
+                self._directive(value.lower())
+            else:
+                yield from self._triples()
+                self._expect(".")
+
+    def _peek(self):
+        if self._peeked is None:
+            self._peeked = next(self._tokens, None)
+        return self._peeked
+
+    def _next(self):
+        token = self._peek()
+        if token is None:
+            raise TurtleSyntaxError("Unexpected end of document")
+        self._peeked = None
+        return token
+
+    def _expect(self, punct):
+        kind, value = self._next()
+        if kind != "punct" or value != punct:
+            raise TurtleSyntaxError(f"Expected {punct!r}, found {value!r}")
+
+    def _at(self, punct):
+        token = self._peek()
+        return token is not None and token[0] == "punct" and token[1] == punct
+
+    def _directive(self, name):
+        if name == "prefix":
+            kind, prefix = self._next()
+            if kind != "pname" or not prefix.endswith(":"):
+                raise TurtleSyntaxError(f"Invalid prefix name {prefix!r}")
+            kind, iri = self._next()
+            if kind != "iri":
+                raise TurtleSyntaxError(f"Invalid prefix IRI {iri!r}")
+            self.prefixes[prefix[:-1]] = str(self.iri(unescape_string(iri[1:-1])))
+        else:
+            kind, iri = self._next()
+            if kind != "iri":
+                raise TurtleSyntaxError(f"Invalid base IRI {iri!r}")
+            self.base = str(self.iri(unescape_string(iri[1:-1])))
+
+    def _triples(self):
+        triples = []
+        if self._at("["):
+            subject = self._blank_node_property_list(triples)
+            yield from triples
+            if self._at("."):
+                return
+        else:
+            subject = self._subject(triples)
+            yield from triples
+        yield from self._predicate_object_list(subject)
+
+    def _predicate_object_list(self, subject):
+        while True:
+            predicate = self._verb()
+            while True:
+                triples = []
+                obj = self._object(triples)
+                yield from triples
+                yield subject, predicate, obj
+                if not self._at(","):
+                    break
+                self._next()
+            # Any number of ';' may follow, optionally ending the list
+            if not self._at(";"):
+                return
+            while self._at(";"):
+                self._next()
+            if self._at(".") or self._at("]"):
+                return
+
+    def _verb(self):
+        kind, value = self._next()
+        if kind == "keyword" and value == "a":
+            return rdflib.RDF.type
+        return self._named(kind, value)
+
+    def _named(self, kind, value):
+        if kind == "iri":
+            return self.iri(unescape_string(value[1:-1]))
+        if kind == "pname":
+            prefix, _, local = value.partition(":")
+            if prefix not in self.prefixes:
+                raise TurtleSyntaxError(f"Undefined prefix {prefix!r}")
+            return self.iri(self.prefixes[prefix] + re.sub(r'\\(.)', r'\1', local))
+        raise TurtleSyntaxError(f"Expected an IRI, found {value!r}")
+
+    def _blank_node(self, label):
+        bnode = self._bnodes.get(label)
+        if bnode is None:
+            bnode = self._bnodes[label] = rdflib.BNode()
+        return bnode
+
+    def _subject(self, triples):
+        kind, value = self._next()
+        if kind == "bnode":
+            return self._blank_node(value[2:])
+        if kind == "punct" and value == "(":
+            return self._collection(triples)
+        return self._named(kind, value)
+
+    def _object(self, triples):
+        kind, value = self._peek()
+        if kind == "punct" and value == "[":
+            return self._blank_node_property_list(triples)
+        self._next()
+        if kind == "bnode":
+            return self._blank_node(value[2:])
+        if kind == "punct" and value == "(":
+            return self._collection(triples)
+        if kind in ("string", "long_string"):
+            quote_length = 3 if kind == "long_string" else 1
+            lexical = unescape_string(value[quote_length:-quote_length])
+            datatype = language = None
+            token = self._peek()
+            if token is not None and token[0] == "langtag":
+                language = self._next()[1][1:]
+            elif token is not None and token[0] == "datatype_marker":
+                self._next()
+                datatype = self._named(*self._next())
+            return self.literal_factory(lexical, datatype, language)
+        if kind == "number":
+            if 'e' in value.lower():
+                datatype = XSD + "double"
+            elif '.' in value:
+                datatype = XSD + "decimal"
+            else:
+                datatype = XSD + "integer"
+            return self.literal_factory(value, rdflib.URIRef(datatype), None)
+        if kind == "keyword" and value in ("true", "false"):
+            return self.literal_factory(value, rdflib.URIRef(XSD + "boolean"), None)
+        return self._named(kind, value)
+
+    def _blank_node_property_list(self, triples):
+        self._expect("[")
+        bnode = rdflib.BNode()
+        if not self._at("]"):
+            triples.extend(self._predicate_object_list(bnode))
+        self._expect("]")
+        return bnode
+
+    def _collection(self, triples):
+        # Opening '(' already consumed
+        head = node = None
+        while not self._at(")"):
+            item = self._object(triples)
+            next_node = rdflib.BNode()
+            if node is None:
+                head = next_node
+            else:
+                triples.append((node, RDF_REST, next_node))
+            triples.append((next_node, RDF_FIRST, item))
+            node = next_node
+        self._next()
+        if node is None:
+            return RDF_NIL
+        triples.append((node, RDF_REST, RDF_NIL))
+        return head
@@ -0,0 +1,383 @@
+import ctypes
+import gc
+import multiprocessing
+import os
+import queue
+import signal
+import socket
+import struct
+import threading
+import time
+from multiprocessing.connection import Connection, wait
+
+from .gocam_ttl import collect_model_file
+from .model_input import model_filename
+from .pipeline import model_cost
+from .profiling import ModelProfile, rss_available, rss_kb
+
+# How often busy workers are checked against the budgets, in seconds
+POLL_INTERVAL = 0.05
+
+_DONE = object()
+
+
+# How long to wait for the exit code of a worker that died, in seconds
+EXIT_CODE_TIMEOUT = 1.0
+
+_PID = struct.Struct("q")
+
+
+class _WorkerStatus(ctypes.Structure):
+    # Shared with the worker, which updates it as the model goes through its phases, and with the
+    # spawner, which records the worker's pid and exit code
+    _fields_ = [("phase", ctypes.c_char * 48), ("triples", ctypes.c_long), ("edges", ctypes.c_long),
+                ("evidence", ctypes.c_long), ("pid", ctypes.c_long), ("exited", ctypes.c_bool),
+                ("exit_code", ctypes.c_int)]
+
+
+class WatchedProfile(ModelProfile):
+    """
+    ModelProfile that also publishes the current phase and the model's graph counts to the
+    supervising process, so a model aborted by the watchdog can be reported with them.
+    """
+    def __init__(self, model_file, trace_memory, status: _WorkerStatus):
+        super().__init__(model_file, trace_memory)
+        self.status = status
+
+    def phase(self, name):
+        self.status.phase = name.encode("utf-8")[:47]
+        return super().phase(name)
+
+    def count_triples(self, gocam_graph):
+        super().count_triples(gocam_graph)
+        self.status.triples = self.counts["triples"]
+
+    def count_edges(self, edges):
+        super().count_edges(edges)
+        self.status.edges = self.counts["edges"]
+        self.status.evidence = self.counts["evidence"]
+
+    def __getstate__(self):
+        # The status is shared memory, which can't be sent back with the result
+        state = self.__dict__.copy()
+        state["status"] = None
+        return state
+
+
+class QuarantinedModel:
+    """
+    A model the watchdog aborted or that failed, yielded by process_model_files_watched in place
+    of its result.
+
+    reason: "timeout", "memory" (over the RSS budget), "error" (an exception, in detail) or
+    "crashed" (the worker died)
+    phase: the last phase the model entered (see profiling.phase), or None if it hadn't started one
+    counts: the graph counts known when the model was stopped: triples once it was parsed, and
+    edges and evidence once its edges were extracted (None before parsing finished)
+    """
+    def __init__(self, model_file, reason, phase, seconds, rss_growth_kb, counts, detail=None):
+        self.model_file = model_file
+        self.reason = reason
+        self.phase = phase
+        self.seconds = seconds
+        self.rss_growth_kb = rss_growth_kb
+        self.counts = counts
+        self.detail = detail
+
+    def message(self):
+        message = f"Quarantined {model_filename(self.model_file)}: {self.reason}"
+        if self.phase:
+            message += f" in phase {self.phase}"
+        message += f" after {self.seconds:.1f} s"
+        return message + (f" ({self.detail})" if self.detail else "")
+
+    def record(self):
+        """
+        Returns: JSON-serializable dict, one line of the quarantine report
+        """
+        return {"model": model_filename(self.model_file), "reason": self.reason, "phase": self.phase,
+                "seconds": round(self.seconds, 3),
+                "rss_growth_mb": None if self.rss_growth_kb is None else round(self.rss_growth_kb / 1024, 1),
+                "size_bytes": model_cost(self.model_file), "counts": self.counts, "detail": self.detail}
+
+
+def _worker_main(builder, connection, status):
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        model_file, options = task
+        profiled = options.get("profile", False)
+        options = dict(options, profile=lambda model_file, trace_memory: WatchedProfile(model_file, trace_memory,
+                                                                                          status))
+        try:
+            row, split_message, profile, columns = collect_model_file(builder, model_file, **options)
+        except Exception as e:
+            connection.send((False, f"{type(e).__name__}: {e}"))
+        else:
+            connection.send((True, (row, split_message, profile if profiled else None, columns)))
+
+
+def _recv_exactly(sock, size, data=b""):
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise EOFError("The worker spawner exited")
+        data += chunk
+    return data
+
+
+def _spawner_main(builder, control, statuses):
+    # Runs single-threaded, so each fork copies no lock another thread holds
+    worker_slots = {}  # pid -> status slot, until the worker is reaped
+
+    def reap(signum, frame):
+        while True:
+            try:
+                pid, wait_status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            slot = worker_slots.pop(pid, None)
+            if slot is not None and statuses[slot].pid == pid:
+                statuses[slot].exit_code = os.waitstatus_to_exitcode(wait_status)
+                statuses[slot].exited = True
+
+    signal.signal(signal.SIGCHLD, reap)
+    while True:
+        message, fds, _, _ = socket.recv_fds(control, _PID.size, 1)
+        if not message:
+            return
+        slot, = _PID.unpack(_recv_exactly(control, _PID.size, message))
+        # Until the worker is recorded, its exit can't be reaped
+        signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGCHLD})
+        pid = os.fork()
+        if pid == 0:
+            try:
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGCHLD})
+                control.close()
+                _worker_main(builder, Connection(fds[0]), statuses[slot])
+            finally:
+                os._exit(0)
+        os.close(fds[0])
+        statuses[slot].pid = pid
+        statuses[slot].exited = False
+        worker_slots[pid] = slot
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGCHLD})
+        control.sendall(_PID.pack(pid))
+
+
+class _Spawner:
+    """
+    A process that forks the workers on request. It's forked before the supervising process
+    starts any thread (like the one reading the models), and stays single-threaded. Forking
+    the workers, including replacements for killed ones, straight from the supervising process
+    could copy a lock another of its threads held at that moment, and deadlock the worker.
+    Workers still inherit the loaded builder, from the spawner.
+
+    The workers' statuses are allocated up front, one per concurrent worker, since shared
+    memory created after the spawner was forked wouldn't be shared with it.
+    """
+    def __init__(self, context, builder, jobs):
+        self.statuses = [context.RawValue(_WorkerStatus) for _ in range(jobs)]
+        self.control, child_control = socket.socketpair()
+        self.process = context.Process(target=_spawner_main, args=(builder, child_control, self.statuses),
+                                       name="model-spawner", daemon=True)
+        self.process.start()
+        child_control.close()
+
+    def spawn(self, slot, connection):
+        """
+        Fork a worker serving connection, which reports to status slot.
+
+        Returns: the worker's pid
+        """
+        socket.send_fds(self.control, [_PID.pack(slot)], [connection.fileno()])
+        pid, = _PID.unpack(_recv_exactly(self.control, _PID.size))
+        return pid
+
+    def stop(self):
+        self.control.close()
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+
+class _Worker:
+    """
+    A worker process forked by the _Spawner, processing one model at a time.
+    """
+    def __init__(self, context, spawner: _Spawner, slot):
+        self.slot = slot
+        self.status = spawner.statuses[slot]
+        self.connection, child_connection = context.Pipe()
+        self.pid = spawner.spawn(slot, child_connection)
+        # Only the worker holds the other end now, so the connection reports EOF once it dies
+        child_connection.close()
+        self.task = None  # (sequence, model file) while busy
+
+    def start(self, sequence, model_file, options):
+        self.status.phase = b""
+        self.status.triples = self.status.edges = self.status.evidence = -1
+        self.task = sequence, model_file
+        self.started = time.monotonic()
+        # The worker shares the spawner's pages, so only its growth counts against the budget
+        self.base_rss_kb = rss_kb(self.pid)
+        self.peak_rss_growth_kb = None
+        self.connection.send((model_file, options))
+
+    def check_rss(self):
+        """
+        Returns: the worker's RSS growth since it started the model in KiB, or None if unknown
+        """
+        rss = rss_kb(self.pid)
+        if rss is None or self.base_rss_kb is None:
+            return None
+        growth = max(0, rss - self.base_rss_kb)
+        self.peak_rss_growth_kb = max(growth, self.peak_rss_growth_kb or 0)
+        return growth
+
+    def exit_code(self):
+        """
+        Returns: the exit code of the worker, which has died, or None if the spawner hasn't
+        reaped it in time
+        """
+        deadline = time.monotonic() + EXIT_CODE_TIMEOUT
+        while not self.status.exited and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self.status.exit_code if self.status.exited else None
+
+    def quarantine(self, reason, detail=None):
+        status = self.status
+        # Only the counts known by the time the model was stopped
+        counts = {name: getattr(status, name) for name in ("triples", "edges", "evidence")
+                  if getattr(status, name) >= 0} or None
+        return QuarantinedModel(self.task[1], reason, status.phase.decode("utf-8") or None,
+                                time.monotonic() - self.started, self.peak_rss_growth_kb, counts, detail)
+
+    def kill(self):
+        try:
+            os.kill(self.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass  # already gone
+        self.connection.close()
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.connection.close()
+
+
+def _feed(model_files, tasks, wake):
+    # Runs on its own thread, so waiting for the next model never holds up the budget checks
+    try:
+        for model_file in model_files:
+            tasks.put(model_file)
+            wake.send_bytes(b"")
+    except BaseException as e:
+        tasks.put(e)
+    finally:
+        tasks.put(_DONE)
+        wake.send_bytes(b"")
+
+
+def process_model_files_watched(builder, model_files, jobs=1, model_timeout=None, model_max_rss_mb=None,
+                                **options):
+    """
+    Process model files with collect_model_file in forked worker processes, one model at a
+    time per worker, aborting any model that runs longer than model_timeout seconds or grows
+    its worker's resident memory by more than model_max_rss_mb megabytes.
+
+    An aborted model's worker is killed and replaced, and the other models carry on. Models
+    that raise an exception or kill their worker are set aside the same way. Results (see
+    collect_model_file) are yielded in model_files order, with a QuarantinedModel for each
+    model set aside. Like process_model_files_in_parallel, workers inherit the loaded builder,
+    here from a _Spawner forked before model_files is first read, so model_files may be read on
+    another thread (e.g. a pipeline.ModelReader) without it holding a lock while a worker forks.
+    The memory budget requires /proc (see rss_available).
+    options: keyword arguments for collect_model_file
+    """
+    context = multiprocessing.get_context("fork")
+    max_rss_kb = None if model_max_rss_mb is None else model_max_rss_mb * 1024
+    tasks = queue.Queue()
+    wake_receiver, wake_sender = context.Pipe(duplex=False)
+    idle = []
+    busy = []
+    free_slots = list(range(jobs))
+    finished = {}  # sequence -> result, until it can be yielded in order
+    sequence = next_result = 0
+    fed_all = False
+    # Keep the ontology out of the cyclic GC's reach so collections in the workers don't copy it
+    gc.freeze()
+    spawner = None
+    feeder = threading.Thread(target=_feed, args=(model_files, tasks, wake_sender), name="model-feeder",
+                              daemon=True)
+    try:
+        # The spawner must be forked before the feeder thread starts
+        spawner = _Spawner(context, builder, jobs)
+        feeder.start()
+        while True:
+            while len(busy) < jobs and not fed_all:
+                try:
+                    model_file = tasks.get_nowait()
+                except queue.Empty:
+                    break
+                if model_file is _DONE:
+                    fed_all = True
+                    break
+                if isinstance(model_file, BaseException):
+                    raise model_file
+                worker = idle.pop() if idle else _Worker(context, spawner, free_slots.pop())
+                worker.start(sequence, model_file, options)
+                busy.append(worker)
+                sequence += 1
+            while next_result in finished:
+                yield finished.pop(next_result)
+                next_result += 1
+            if fed_all and not busy:
+                return
+
+            ready = wait([wake_receiver] + [worker.connection for worker in busy], POLL_INTERVAL)
+            while wake_receiver.poll():
+                wake_receiver.recv_bytes()
+            for worker in list(busy):
+                result = None
+                if worker.connection in ready:
+                    try:
+                        ok, value = worker.connection.recv()
+                    except (EOFError, OSError):
+                        # The worker died
+                        exit_code = worker.exit_code()
+                        result = worker.quarantine("crashed", "worker died" if exit_code is None
+                                                   else f"exit code {exit_code}")
+                    else:
+                        busy.remove(worker)
+                        idle.append(worker)
+                        finished[worker.task[0]] = value if ok else worker.quarantine("error", value)
+                        continue
+                elif model_timeout is not None and time.monotonic() - worker.started > model_timeout:
+                    result = worker.quarantine("timeout")
+                elif max_rss_kb is not None and (worker.check_rss() or 0) > max_rss_kb:
+                    result = worker.quarantine("memory")
+                if result is not None:
+                    busy.remove(worker)
+                    worker.kill()
+                    free_slots.append(worker.slot)
+                    finished[worker.task[0]] = result
+    finally:
+        for worker in busy:
+            worker.kill()
+        for worker in idle:
+            worker.stop()
+        if spawner:
+            spawner.stop()
+        wake_receiver.close()
+        gc.unfreeze()
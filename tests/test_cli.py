@@ -0,0 +1,63 @@
+import json
+import subprocess
+import sys
+
+# Cumulative import time budget for the CLI entry point, in microseconds
+CLI_IMPORT_BUDGET_US = 100_000
+
+
+def import_times(*args):
+    """
+    Run python -X importtime with args and return {module: cumulative microseconds}.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_import_budget():
+    times = import_times("-c", "import gocam_unwinder.cli")
+    assert not [m for m in times if m.startswith(("ontobio", "rdflib"))]
+    assert times["gocam_unwinder.cli"] < CLI_IMPORT_BUDGET_US, f"CLI import took {times['gocam_unwinder.cli']}us"
+
+
+def test_help_skips_heavy_imports():
+    times = import_times("-m", "gocam_unwinder", "--help")
+    assert not [m for m in times if m.startswith(("ontobio", "rdflib"))]
+
+
+def test_library_import_defers_ontobio():
+    times = import_times("-c", "import gocam_unwinder.gocam_ttl")
+    assert "gocam_unwinder.gocam_ttl" in times
+    assert not [m for m in times if m.startswith("ontobio")]
+
+
+def test_profile_records(tmp_path):
+    from gocam_unwinder.cli import main
+    from gocam_unwinder.profiling import rss_available
+
+    profile_filename = str(tmp_path / "profile.jsonl")
+    main(["-d", "resources/test", "-o", "target/go_20250601.json", "--split-evidence", "--output-dir",
+          str(tmp_path / "split"), "--report-file", str(tmp_path / "report.tsv"),
+          "--profile", profile_filename, "--profile-slowest", "1"])
+    with open(profile_filename) as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == 7
+    analysis = {"triage", "parse", "extract_edges", "extract_standard_annotations", "filter_out_non_std_annotations",
+                "plan_split"}
+    for record in records:
+        # Models the split doesn't change are copied rather than split and serialized
+        assert set(record["phases"]) in (analysis | {"split_evidence", "serialize"}, analysis | {"copy"})
+        assert record["wall"] >= sum(timing["wall"] for timing in record["phases"].values())
+        assert record["counts"]["triples"] > 0 and record["counts"]["edges"] > 0
+        if rss_available():
+            assert record["rss_start_kb"] > 0
+            assert record["rss_growth_kb"] == record["rss_end_kb"] - record["rss_start_kb"]
+            assert record["peak_rss_kb"] >= max(record["rss_start_kb"], record["rss_end_kb"])
+    assert len(list(tmp_path.glob("profile.*.prof"))) == 1
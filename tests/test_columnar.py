@@ -0,0 +1,65 @@
+import glob
+import json
+import os
+
+import pytest
+
+from gocam_unwinder.cli import main
+from gocam_unwinder.columnar import aggregate, read_columns
+from gocam_unwinder.gocam_ttl import GoCamGraphBuilder
+
+ontology_file = "target/go_20250601.json"
+
+
+def export_columns(tmp_path, filename, *args):
+    columns_file = str(tmp_path / filename)
+    main(["-d", "resources/test", "-o", ontology_file, "--report-file", str(tmp_path / "report.tsv"),
+          "--export-columns", columns_file, *args])
+    return read_columns(columns_file)
+
+
+def test_export_and_aggregate(tmp_path, capsys):
+    arrays = export_columns(tmp_path, "columns.npz", "-j", "2")
+    strings = arrays["strings"]
+
+    builder = GoCamGraphBuilder(ontology_file)
+    for model_file in sorted(glob.glob("resources/test/*.ttl")):
+        gocam_graph = builder.parse_ttl(model_file)
+        model = "gomodel:" + os.path.basename(model_file)[:-len(".ttl")]
+        rows = strings[arrays["edge_model"]] == model
+        edges = [edge for annot in gocam_graph.standard_annotations for edge in annot.edges.values()]
+        assert arrays["edge_standard"][rows].sum() == len(edges)
+        assert sorted(arrays["edge_evidence_count"][rows & (arrays["edge_standard"] == 1)]) == \
+            sorted(len(edge.evidence_uris) for edge in edges)
+
+    aggregates = aggregate(arrays)
+    assert aggregates["models"] == 7
+    assert sum(aggregates["evidence_per_edge"].values()) == aggregates["edges"] == len(arrays["edge_model"])
+    assert sum(n * count for n, count in aggregates["evidence_per_edge"].items()) == aggregates["evidence"]
+    assert sum(count for _, count in aggregates["evidence_by_type"]) == aggregates["evidence"]
+    standard = aggregate(arrays, standard_only=True)
+    assert standard["edges"] == int(arrays["edge_standard"].sum()) < aggregates["edges"]
+
+    main(["aggregate", str(tmp_path / "columns.npz"), "--json", "--top", "3"])
+    printed = json.loads(capsys.readouterr().out)
+    assert printed["edges"] == aggregates["edges"]
+    assert len(printed["evidence_by_contributor"]) == 3
+
+
+def decoded(arrays, name):
+    values = arrays[name]
+    if name in ("edge_annotation", "edge_standard", "edge_evidence_count", "evidence_edge"):
+        return list(values)
+    return [str(arrays["strings"][code]) if code >= 0 else None for code in values]
+
+
+def test_parquet_export(tmp_path):
+    pytest.importorskip("pyarrow")
+    expected = export_columns(tmp_path, "columns.npz")
+    arrays = export_columns(tmp_path, "columns.parquet")
+    assert os.path.exists(tmp_path / "columns.evidence.parquet")
+    # Codes may be numbered differently, so compare the decoded values
+    for name in expected:
+        if name != "strings":
+            assert decoded(arrays, name) == decoded(expected, name)
+    assert aggregate(arrays)["evidence_by_source"] == aggregate(expected)["evidence_by_source"]
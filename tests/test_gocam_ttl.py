@@ -1,6 +1,13 @@
+import glob
+import inspect
+import os
+import shutil
+import sys
+import time
+
 import pytest
 import rdflib
-from gocam_unwinder.gocam_ttl import GoCamGraph, GoCamGraphBuilder
+from gocam_unwinder.gocam_ttl import GoCamGraph, GoCamGraphBuilder, process_model_file, process_model_files_in_parallel
 
 ontology_file = "target/go_20250601.json"  # TODO: Make this GitHub-friendly, maybe LFS
 
@@ -120,3 +127,169 @@ def test_multi_edge_evidence_grouping():
     split_individual = rdflib.term.URIRef('http://model.geneontology.org/MGI_MGI_1927246/a2f2216c-0cf5-4436-8a75-b3aa41974936-2')
     split_annot = gocam_graph_split.get_standard_annotation_by_individual(split_individual)
     assert split_annot is not None, "MGI_MGI_1927246 should have -2 split individual"
+
+
+def test_graph_index():
+    builder = GoCamGraphBuilder(ontology_file)
+    gocam_graph = builder.parse_ttl("resources/test/MGI_MGI_1927246.ttl")
+    index = gocam_graph.index
+
+    # Index lookups agree with direct rdflib queries
+    for edge in gocam_graph.edges:
+        assert gocam_graph.get_edge_by_bnode_id(edge.bnode_id) is edge
+        assert gocam_graph.find_axiom_bnode_by_triple(edge.source_uri, edge.property_uri, edge.target_uri) == edge.bnode
+        assert index.evidence[edge.bnode] == list(gocam_graph.g.objects(edge.bnode, index.EVIDENCE_PRED))
+    for sa in gocam_graph.standard_annotations:
+        for bnode_id in sa.edges:
+            assert gocam_graph.get_standard_annotation_by_bnode_id(bnode_id) is sa
+        for individual in sa.individuals:
+            assert sa in gocam_graph.get_standard_annotations_by_individual(individual)
+
+    # Splitting keeps the index in sync with the graph
+    gocam_graph.split_evidence_and_write_ttl("target/MGI_MGI_1927246_index.ttl")
+    for bnode, evidence_uris in index.evidence.items():
+        assert sorted(evidence_uris) == sorted(gocam_graph.g.objects(bnode, index.EVIDENCE_PRED))
+    split_individual = rdflib.term.URIRef('http://model.geneontology.org/MGI_MGI_1927246/a2f2216c-0cf5-4436-8a75-b3aa41974936-2')
+    assert gocam_graph.get_individual_type(split_individual) is not None
+    split_bnodes = [b for b in index.evidence if str(b).endswith("-2")]
+    assert split_bnodes
+    for bnode in split_bnodes:
+        assert index.get_axiom_bnode(*index.axiom_parts[bnode]) == bnode
+
+
+def test_long_causal_chain_without_recursion():
+    # Generated chain: i0 -> i1 -> ... -> iN through causally upstream of, each edge with evidence
+    chain_length = 12000
+    model = "http://model.geneontology.org/chain/"
+    relation = rdflib.URIRef("http://purl.obolibrary.org/obo/RO_0002411")  # causally upstream of
+    gocam_graph = GoCamGraph()
+    g = gocam_graph.g
+    for i in range(chain_length + 1):
+        g.add((rdflib.URIRef(f"{model}i{i}"), rdflib.RDF.type, rdflib.URIRef("http://purl.obolibrary.org/obo/GO_0003674")))
+    for i in range(chain_length):
+        source, target = rdflib.URIRef(f"{model}i{i}"), rdflib.URIRef(f"{model}i{i + 1}")
+        axiom = rdflib.BNode(f"axiom{i}")
+        g.add((source, relation, target))
+        g.add((axiom, rdflib.namespace.OWL.annotatedSource, source))
+        g.add((axiom, rdflib.namespace.OWL.annotatedProperty, relation))
+        g.add((axiom, rdflib.namespace.OWL.annotatedTarget, target))
+        g.add((axiom, rdflib.URIRef("http://geneontology.org/lego/evidence"), rdflib.URIRef(f"{model}ev{i}")))
+    gocam_graph.build_index()
+
+    # A recursive walk would need one frame per chain link
+    recursion_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(len(inspect.stack()) + 100)
+    try:
+        start = time.perf_counter()
+        gocam_graph.extract_standard_annotations()
+        elapsed = time.perf_counter() - start
+    finally:
+        sys.setrecursionlimit(recursion_limit)
+
+    assert len(gocam_graph.standard_annotations) == 1
+    assert len(gocam_graph.standard_annotations[0].edges) == chain_length
+    assert elapsed < 10, f"Chain of {chain_length} edges took {elapsed:.1f}s"
+
+
+def test_parallel_rows_match_sequential():
+    builder = GoCamGraphBuilder(ontology_file)
+    model_files = sorted(glob.glob("resources/test/*.ttl"))
+    sequential = [process_model_file(builder, f) for f in model_files]
+    parallel = list(process_model_files_in_parallel(builder, model_files, 3))
+    # Same rows, in input order regardless of which worker finishes first
+    assert parallel == sequential
+
+
+def test_batched_evidence_signatures():
+    builder = GoCamGraphBuilder(ontology_file)
+    gocam_graph = builder.parse_ttl("resources/test/MGI_MGI_1100089.ttl")
+
+    # Batched signatures match querying each evidence individual separately
+    signatures = gocam_graph.get_evidence_signatures()
+    assert signatures
+    for evidence_uri, signature in signatures.items():
+        expected = []
+        for pred in gocam_graph.EVIDENCE_METADATA_PREDICATES:
+            values = sorted(str(obj) for obj in gocam_graph.g.objects(evidence_uri, pred))
+            if values:
+                expected.append((str(pred), tuple(values)))
+        assert signature == tuple(sorted(expected))
+
+    # Equal signatures are interned, and groupings are reused by the split
+    by_value = {}
+    for signature in signatures.values():
+        assert by_value.setdefault(signature, signature) is signature
+    std_annot = gocam_graph.standard_annotations[0]
+    assert gocam_graph.group_evidence_by_bnode(std_annot) is gocam_graph.group_evidence_by_bnode(std_annot)
+    assert gocam_graph.group_evidence_by_metadata(std_annot) == gocam_graph.group_evidence_by_metadata(std_annot)
+
+
+def test_compact_edges():
+    builder = GoCamGraphBuilder(ontology_file)
+    gocam_graph = builder.parse_ttl("resources/test/MGI_MGI_1100089.ttl")
+
+    for std_annot in gocam_graph.standard_annotations:
+        for bnode_id, edge in std_annot.edges.items():
+            # Slotted edges with derived, read-only bnode_id and evidence
+            assert not hasattr(edge, "__dict__")
+            assert edge.bnode_id == bnode_id == str(edge.bnode)
+            assert std_annot.edges[bnode_id] is edge
+            assert isinstance(edge.evidence_uris, tuple)
+            with pytest.raises(AttributeError):
+                edge.bnode_id = "other"
+        with pytest.raises(TypeError):
+            std_annot.edges["other"] = None
+        assert not hasattr(std_annot, "__dict__")
+    assert "missing" not in gocam_graph.standard_annotations[0].edges
+
+
+def test_split_plan(tmp_path):
+    builder = GoCamGraphBuilder(ontology_file)
+    for model_file in sorted(glob.glob("resources/test/*.ttl")):
+        # Planning needs no rdflib graph, so the streamed graph plans the same split
+        gocam_graph = builder.parse_ttl(model_file)
+        plan = gocam_graph.plan_split()
+        assert builder.scan_ttl(model_file).plan_split().summary() == plan.summary()
+        triple_count = gocam_graph.triple_count()
+        assert gocam_graph.split_evidence().summary() == plan.summary()
+        if plan.is_empty():
+            assert gocam_graph.triple_count() == triple_count
+        else:
+            assert gocam_graph.triple_count() > triple_count
+
+    # Unchanged models are copied (or linked) instead of reserialized
+    unchanged = "resources/test/R-HSA-9937080.ttl"
+    assert builder.parse_ttl(unchanged).plan_split().is_empty()
+    _, message = process_model_file(builder, unchanged, split_evidence=True, output_dir=str(tmp_path))
+    assert message.endswith("(unchanged)")
+    with open(unchanged, 'rb') as f, open(tmp_path / "R-HSA-9937080.ttl", 'rb') as copy:
+        assert f.read() == copy.read()
+    process_model_file(builder, unchanged, split_evidence=True, output_dir=str(tmp_path), link_unchanged=True)
+    assert (tmp_path / "R-HSA-9937080.ttl").samefile(unchanged)
+
+    # Splitting a model whose output is still linked to it (e.g. after an edit or a new ontology)
+    # replaces the output instead of writing through the link into the model
+    models_dir = tmp_path / "models"
+    models_dir.mkdir()
+    model_file = str(models_dir / "MGI_MGI_1927246.ttl")
+    shutil.copy("resources/test/MGI_MGI_1927246.ttl", model_file)
+    with open(model_file, 'rb') as f:
+        original = f.read()
+    for output_format, extension in [("ttl", ".ttl"), ("ttl-fast", ".ttl"), ("nt", ".nt"), ("patch", ".rdfp"),
+                                     ("sparql", ".ru")]:
+        output_dir = tmp_path / f"linked-{output_format}"
+        output_dir.mkdir()
+        output_filename = output_dir / f"MGI_MGI_1927246{extension}"
+        os.link(model_file, output_filename)
+        _, message = process_model_file(builder, model_file, split_evidence=True, output_dir=str(output_dir),
+                                        output_format=output_format)
+        assert not message.endswith("(unchanged)")
+        assert not output_filename.samefile(model_file)
+        assert os.listdir(output_dir) == [output_filename.name]
+        with open(model_file, 'rb') as f:
+            assert f.read() == original, output_format
+    assert sorted(os.listdir(models_dir)) == ["MGI_MGI_1927246.ttl"]
+
+    _, message = process_model_file(builder, "resources/test/MGI_MGI_1335098.ttl", split_evidence=True, dry_run=True)
+    assert message.startswith("Dry run for MGI_MGI_1335098.ttl: ") and "0 new axioms" not in message
+    assert not (tmp_path / "MGI_MGI_1335098.ttl").exists()
@@ -0,0 +1,97 @@
+import os
+import shutil
+
+from gocam_unwinder.cli import main
+from gocam_unwinder.manifest import RunManifest
+
+ontology_file = "target/go_20250601.json"
+
+
+def run_incremental(models_dir, output_dir, capsys, split_evidence=True):
+    main(["-d", str(models_dir), "-o", ontology_file, "--output-dir", str(output_dir), "--incremental"] +
+         (["--split-evidence"] if split_evidence else []))
+    out = capsys.readouterr().out.splitlines()
+    rows = sorted(line for line in out if line.startswith("gomodel:"))
+    split_messages = [line for line in out if line.startswith("Split evidence")]
+    return rows, split_messages
+
+
+def test_incremental_run_skips_unchanged_models(tmp_path, capsys):
+    models_dir = tmp_path / "models"
+    output_dir = tmp_path / "output"
+    models_dir.mkdir()
+    for model in ["MGI_MGI_1927246.ttl", "SGD_S000004491.ttl", "SYNGO_5371.ttl"]:
+        shutil.copy(os.path.join("resources/test", model), models_dir)
+
+    rows, split_messages = run_incremental(models_dir, output_dir, capsys)
+    assert len(rows) == 3
+    assert len(split_messages) == 3
+
+    # Nothing changed: rows come from the manifest and nothing is re-split
+    cached_rows, split_messages = run_incremental(models_dir, output_dir, capsys)
+    assert cached_rows == rows
+    assert split_messages == []
+
+    # Touching a file doesn't change its content hash
+    os.utime(models_dir / "SYNGO_5371.ttl", ns=(0, 0))
+    _, split_messages = run_incremental(models_dir, output_dir, capsys)
+    assert split_messages == []
+
+    # A changed model and a missing split output are reprocessed
+    with open(models_dir / "SGD_S000004491.ttl", "a") as f:
+        f.write("\n# changed\n")
+    os.remove(output_dir / "MGI_MGI_1927246.ttl")
+    cached_rows, split_messages = run_incremental(models_dir, output_dir, capsys)
+    assert cached_rows == rows
+    assert sorted(m.split()[3] for m in split_messages) == ["MGI_MGI_1927246.ttl", "SGD_S000004491.ttl"]
+
+
+def test_report_only_run_keeps_split_records(tmp_path, capsys):
+    models_dir = tmp_path / "models"
+    output_dir = tmp_path / "output"
+    models_dir.mkdir()
+    for model in ["MGI_MGI_1927246.ttl", "SYNGO_5371.ttl"]:
+        shutil.copy(os.path.join("resources/test", model), models_dir)
+
+    rows, split_messages = run_incremental(models_dir, output_dir, capsys)
+    assert len(split_messages) == 2
+    # Touched, so the report-only run records the model again
+    os.utime(models_dir / "SYNGO_5371.ttl", ns=(0, 0))
+    report_rows, split_messages = run_incremental(models_dir, output_dir, capsys, split_evidence=False)
+    assert report_rows == rows and split_messages == []
+    cached_rows, split_messages = run_incremental(models_dir, output_dir, capsys)
+    assert cached_rows == rows and split_messages == []
+
+    # Re-recording an unchanged model without splitting keeps its split output
+    manifest_filename = str(output_dir / RunManifest.FILENAME)
+    model_file = str(models_dir / "SYNGO_5371.ttl")
+    output_filename = str(output_dir / "SYNGO_5371.ttl")
+    manifest = RunManifest(manifest_filename, "v1")
+    manifest.record(model_file, ["gomodel:SYNGO_5371"], True, output_filename)
+    manifest.record(model_file, ["gomodel:SYNGO_5371"])
+    assert manifest.is_current(model_file, True, output_filename)
+    # ...but not once the ontology changed, since the split depends on it
+    manifest.close()
+    manifest = RunManifest(manifest_filename, "v2")
+    manifest.record(model_file, ["gomodel:SYNGO_5371"])
+    assert not manifest.is_current(model_file, True, output_filename)
+    manifest.close()
+
+
+def test_manifest_resumes_after_interruption(tmp_path):
+    manifest_filename = str(tmp_path / RunManifest.FILENAME)
+    model_file = "resources/test/SYNGO_5371.ttl"
+    manifest = RunManifest(manifest_filename, "v1")
+    manifest.record(model_file, ["gomodel:SYNGO_5371"])
+    # Simulate a crash: no close(), and a partially written last line
+    with open(manifest_filename, "a") as f:
+        f.write('{"model": "MGI_')
+
+    resumed = RunManifest(manifest_filename, "v1")
+    assert resumed.is_current(model_file)
+    assert resumed.get_row(model_file) == ["gomodel:SYNGO_5371"]
+    resumed.record("resources/test/SGD_S000004491.ttl", ["gomodel:SGD_S000004491"])
+    resumed.close()
+    assert RunManifest(manifest_filename, "v1").is_current("resources/test/SGD_S000004491.ttl")
+    # A different ontology version invalidates everything
+    assert not RunManifest(manifest_filename, "v2").is_current(model_file)
@@ -0,0 +1,55 @@
+import glob
+import os
+
+import rdflib
+from rdflib.compare import isomorphic
+
+from gocam_unwinder.cli import main
+from gocam_unwinder.model_cache import ParsedModelCache, decode_graph, encode_graph
+
+ontology_file = "target/go_20250601.json"
+
+
+def test_cached_graph_round_trip():
+    g = rdflib.Graph()
+    g.bind("lego", "http://geneontology.org/lego/")
+    g.add((rdflib.BNode("b1"), rdflib.RDFS.label, rdflib.Literal("chat", lang="fr")))
+    g.add((rdflib.BNode("b1"), rdflib.RDFS.comment, rdflib.Literal("42", datatype=rdflib.XSD.integer)))
+    g.add((rdflib.BNode("b1"), rdflib.RDFS.comment, rdflib.Literal("plain")))
+    for model_file in sorted(glob.glob("resources/test/*.ttl")):
+        g.parse(model_file, format="ttl")
+
+    loaded = decode_graph(encode_graph(g))
+    assert set(loaded) == set(g)
+    assert ("lego", rdflib.URIRef("http://geneontology.org/lego/")) in set(loaded.namespaces())
+    # Each predicate scans in the same order, so edges and evidence come out in the same order
+    for pred in set(g.predicates()):
+        assert list(loaded.triples((None, pred, None))) == list(g.triples((None, pred, None)))
+
+
+def test_model_cache_runs(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    reports = []
+    for run in range(2):
+        report_file = str(tmp_path / f"report{run}.tsv")
+        main(["-d", "resources/test", "-o", ontology_file, "--split-evidence", "--output-dir",
+              str(tmp_path / f"split{run}"), "--report-file", report_file, "--model-cache", cache_dir, "--reader", "rdflib"])
+        with open(report_file) as f:
+            reports.append(f.read())
+    assert reports[0] == reports[1]
+    model_cache = ParsedModelCache(cache_dir)
+    assert len(model_cache.entries()) == 7
+    for filename in os.listdir(tmp_path / "split0"):
+        split = [rdflib.Graph().parse(str(tmp_path / f"split{run}" / filename), format="ttl") for run in range(2)]
+        assert isomorphic(*split)
+
+    # Loading an entry makes it the most recently used, so it survives eviction
+    for i, (_, _, path) in enumerate(sorted(model_cache.entries())):
+        os.utime(path, (1000 + i, 1000 + i))
+    entries = sorted(model_cache.entries())
+    oldest_path = entries[0][2]
+    model_cache.load(os.path.basename(oldest_path)[:-len(".gcm")])
+    model_cache.evict(max_bytes=entries[0][1])
+    assert [path for _, _, path in model_cache.entries()] == [oldest_path]
+    assert model_cache.evict(max_bytes=0) == 1
+    assert model_cache.entries() == []
@@ -0,0 +1,80 @@
+import bz2
+import glob
+import gzip
+import os
+import tarfile
+
+from gocam_unwinder.cli import main
+from gocam_unwinder.model_input import ArchiveMember, iter_model_files, read_model_text, strip_model_extension
+
+ontology_file = "target/go_20250601.json"
+
+
+def compressed_copies(model_files, directory):
+    # Alternate .ttl.gz and .ttl.bz2 copies of the test models
+    os.makedirs(directory)
+    for i, model_file in enumerate(model_files):
+        with open(model_file, 'rb') as f:
+            data = f.read()
+        if i % 2:
+            with bz2.open(os.path.join(directory, os.path.basename(model_file) + ".bz2"), 'wb') as f:
+                f.write(data)
+        else:
+            with gzip.open(os.path.join(directory, os.path.basename(model_file) + ".gz"), 'wb') as f:
+                f.write(data)
+
+
+def report_rows(tmp_path, name, *args):
+    report_file = str(tmp_path / f"{name}.tsv")
+    main(["-o", ontology_file, "--report-file", report_file, *args])
+    with open(report_file) as f:
+        header, *rows = f.read().splitlines()
+    return sorted(rows)
+
+
+def test_compressed_and_archived_models(tmp_path):
+    model_files = sorted(glob.glob("resources/test/*.ttl"))
+    compressed_copies(model_files, str(tmp_path / "compressed"))
+    archive = str(tmp_path / "models.tar.gz")
+    with tarfile.open(archive, "w:gz") as tar:
+        tar.add(str(tmp_path / "compressed"), arcname="release/compressed")
+        tar.add("resources/test/SYNGO_5371.ttl", arcname="release/SYNGO_5371.ttl")
+        tar.add("README.md", arcname="release/README.md")
+
+    for compressed_file in iter_model_files(str(tmp_path / "compressed")):
+        model_file = os.path.join("resources/test", strip_model_extension(os.path.basename(compressed_file)) + ".ttl")
+        with open(model_file, encoding="utf-8") as f:
+            assert read_model_text(compressed_file) == f.read()
+
+    expected = report_rows(tmp_path, "plain", "-d", "resources/test")
+    assert report_rows(tmp_path, "compressed", "-d", str(tmp_path / "compressed")) == expected
+    # The archive has SYNGO_5371 twice (.ttl.gz and .ttl); only its first member is processed
+    assert report_rows(tmp_path, "archive", "-d", archive, "--reader", "rdflib") == expected
+
+    # Filtered members are skipped without being read
+    id_list = tmp_path / "ids.txt"
+    id_list.write_text("SYNGO_5371\nMGI_MGI_1100089\n")
+    members = list(iter_model_files(archive, {"SYNGO_5371", "MGI_MGI_1100089"}))
+    assert all(isinstance(member, ArchiveMember) for member in members)
+    assert sorted(os.path.basename(member.name) for member in members) == \
+        ["MGI_MGI_1100089.ttl.bz2", "SYNGO_5371.ttl.gz"]
+
+    output_dir = tmp_path / "split"
+    rows = report_rows(tmp_path, "archive_split", "-d", archive, "-l", str(id_list), "--split-evidence",
+                       "--output-dir", str(output_dir), "-j", "2")
+    assert [row.split("\t")[0] for row in rows] == ["gomodel:MGI_MGI_1100089", "gomodel:SYNGO_5371"]
+    assert sorted(os.listdir(output_dir)) == ["MGI_MGI_1100089.ttl", "SYNGO_5371.ttl"]
+
+
+def test_one_file_per_model(tmp_path):
+    # A directory with both X.ttl and a compressed copy processes X.ttl only
+    compressed_copies(["resources/test/SYNGO_5371.ttl", "resources/test/SGD_S000004491.ttl"],
+                      str(tmp_path / "models"))
+    for model_file in ("resources/test/SYNGO_5371.ttl", "resources/test/MGI_MGI_1927246.ttl"):
+        with open(model_file, 'rb') as f, open(tmp_path / "models" / os.path.basename(model_file), 'wb') as copy:
+            copy.write(f.read())
+    assert sorted(os.path.basename(f) for f in iter_model_files(str(tmp_path / "models"))) == \
+        ["MGI_MGI_1927246.ttl", "SGD_S000004491.ttl.bz2", "SYNGO_5371.ttl"]
+    rows = report_rows(tmp_path, "models", "-d", str(tmp_path / "models"))
+    assert [row.split("\t")[0] for row in rows] == ["gomodel:MGI_MGI_1927246", "gomodel:SGD_S000004491",
+                                                    "gomodel:SYNGO_5371"]
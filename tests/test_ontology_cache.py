@@ -0,0 +1,37 @@
+import glob
+import os
+
+import rdflib
+from gocam_unwinder.gocam_ttl import GoCamGraphBuilder
+from gocam_unwinder.ontology_cache import MolecularFunctionCache
+
+ontology_file = "target/go_20250601.json"
+
+
+def test_molecular_function_cache_matches_go_aspector(tmp_path):
+    builder = GoCamGraphBuilder(ontology_file)
+    cached_builder = GoCamGraphBuilder(ontology_file, ontology_cache=str(tmp_path))
+    assert cached_builder.go_aspector is None
+    # Other caches (e.g. relations) may share the directory, depending on what ran before
+    cache_files = glob.glob(os.path.join(tmp_path, MolecularFunctionCache.FILENAME_TEMPLATE.format(digest="*")))
+    assert len(cache_files) == 1
+
+    # Every class used in the test models, plus the aspect roots
+    uris = {rdflib.URIRef("http://purl.obolibrary.org/obo/GO_0003674"),
+            rdflib.URIRef("http://purl.obolibrary.org/obo/GO_0008150"),
+            rdflib.URIRef("http://purl.obolibrary.org/obo/GO_0005575"),
+            rdflib.URIRef("http://purl.obolibrary.org/obo/go/extensions/reacto.owl#molecular_event")}
+    for model_file in glob.glob("resources/test/*.ttl"):
+        g = rdflib.Graph()
+        g.parse(model_file, format="ttl")
+        uris.update(o for o in g.objects(None, rdflib.RDF.type) if isinstance(o, rdflib.URIRef))
+    for uri in uris:
+        assert cached_builder.uri_is_molecular_function(uri) == builder.uri_is_molecular_function(uri), uri
+    assert cached_builder.uri_is_molecular_function(rdflib.URIRef("http://purl.obolibrary.org/obo/GO_0003674"))
+
+    # A second builder reuses the compiled cache instead of loading the ontology
+    cache_path = cache_files[0]
+    mtime = os.path.getmtime(cache_path)
+    reused_builder = GoCamGraphBuilder(ontology_file, ontology_cache=str(tmp_path))
+    assert os.path.getmtime(cache_path) == mtime
+    assert len(reused_builder.mf_cache) == len(cached_builder.mf_cache)
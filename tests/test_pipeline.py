@@ -0,0 +1,56 @@
+import glob
+import threading
+
+import pytest
+
+from gocam_unwinder.model_input import ArchiveMember
+from gocam_unwinder.pipeline import InFlightBudget, ModelReader
+
+
+def test_reader_stays_within_budget():
+    model_files = sorted(glob.glob("resources/test/*.ttl"))
+    budget = InFlightBudget(max_models=2)
+    reader = ModelReader(model_files, budget)
+    seen = []
+    for model_file in reader:
+        assert budget.models <= 2
+        seen.append(model_file)
+        reader.task_done()
+    assert seen == model_files
+    assert budget.models == 0 and budget.bytes == 0
+
+
+def test_budget_bytes():
+    members = [ArchiveMember("corpus.tar", f"M{i}.ttl", b"x" * size) for i, size in enumerate([60, 50, 200, 10])]
+    budget = InFlightBudget(max_bytes=100)
+    reader = ModelReader(members, budget)
+    models = iter(reader)
+    assert next(models) is members[0]
+    # The second model doesn't fit until the first is released
+    waiting = threading.Thread(target=lambda: next(models))
+    waiting.start()
+    waiting.join(0.2)
+    assert waiting.is_alive() and budget.models == 1
+    reader.task_done()
+    waiting.join()
+    # A model larger than the budget goes through on its own
+    reader.task_done()
+    assert next(models) is members[2] and budget.bytes == 200
+    reader.task_done()
+    assert next(models) is members[3]
+    reader.task_done()
+    with pytest.raises(StopIteration):
+        next(models)
+
+
+def test_reader_close_and_errors():
+    budget = InFlightBudget(max_models=1)
+    reader = ModelReader(iter(["resources/test/SYNGO_5371.ttl"] * 5), budget)
+    models = iter(reader)
+    next(models)
+    reader.close()
+    assert list(models) == []
+
+    reader = ModelReader(["resources/test/missing.ttl"], InFlightBudget())
+    with pytest.raises(FileNotFoundError):
+        list(reader)
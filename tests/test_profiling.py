@@ -0,0 +1,44 @@
+import tracemalloc
+
+import pytest
+
+from gocam_unwinder.profiling import ModelProfile, reset_peak_rss
+
+BALLAST_BYTES = 200 * 1024 * 1024
+
+
+def allocate_and_free():
+    ballast = bytearray(BALLAST_BYTES)
+    ballast[::4096] = b"x" * len(range(0, BALLAST_BYTES, 4096))  # touch every page
+    del ballast
+
+
+@pytest.mark.skipif(not reset_peak_rss(), reason="requires /proc/self/clear_refs")
+def test_peak_rss_is_per_model():
+    with ModelProfile("spiky.ttl") as spiky:
+        allocate_and_free()
+    # Freed before the model finished, so only the peak shows it
+    assert spiky.peak_rss_kb - spiky.rss_start_kb > BALLAST_BYTES // 1024 * 0.9
+    assert spiky.rss_end_kb - spiky.rss_start_kb < BALLAST_BYTES // 1024 * 0.5
+
+    # The next model doesn't inherit the earlier spike
+    with ModelProfile("flat.ttl") as flat:
+        pass
+    assert flat.peak_rss_kb < spiky.peak_rss_kb - BALLAST_BYTES // 1024 * 0.5
+    assert flat.record()["peak_rss_kb"] == flat.peak_rss_kb
+
+
+def test_tracemalloc_session_left_running():
+    tracemalloc.start()
+    try:
+        with ModelProfile("model.ttl", trace_memory=True) as profile:
+            ballast = bytearray(1024 * 1024)
+            del ballast
+        assert tracemalloc.is_tracing()
+        assert profile.tracemalloc_peak_bytes >= 1024 * 1024
+    finally:
+        tracemalloc.stop()
+
+    with ModelProfile("model.ttl", trace_memory=True):
+        assert tracemalloc.is_tracing()
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,109 @@
+import collections
+import glob
+import os
+
+import pytest
+import rdflib
+from rdflib.compare import isomorphic
+
+from gocam_unwinder.cli import main
+from gocam_unwinder.gocam_ttl import GoCamGraphBuilder
+from gocam_unwinder.model_input import strip_model_extension
+from gocam_unwinder.rdf_patch import apply_patch, axiom_labels
+
+ontology_file = "target/go_20250601.json"
+
+
+def labelled_triples(g):
+    # Cheaper than an isomorphism check on a whole corpus: axioms are told apart by their label
+    labels = {bnode: label for label, bnode in axiom_labels(g).items()}
+    return collections.Counter(tuple(labels.get(node, "_:") if isinstance(node, rdflib.BNode) else node
+                                     for node in triple) for triple in g)
+
+
+def relabelled(g):
+    # A copy of g as a triple store would hold it, with blank node IDs of its own
+    bnodes = collections.defaultdict(rdflib.BNode)
+    copy = rdflib.Graph()
+    for triple in g:
+        copy.add(tuple(bnodes[node] if isinstance(node, rdflib.BNode) else node for node in triple))
+    return copy
+
+
+@pytest.fixture(scope="module")
+def builder():
+    return GoCamGraphBuilder(ontology_file)
+
+
+def test_patch_reproduces_split(tmp_path, builder):
+    for model_file in sorted(glob.glob("resources/test/*.ttl")):
+        split_file = str(tmp_path / "split.ttl")
+        builder.parse_ttl(model_file).split_evidence_and_write_ttl(split_file)
+        patches = []
+        for run in range(2):
+            patch_file = str(tmp_path / f"split{run}.rdfp")
+            builder.parse_ttl(model_file).split_evidence_and_write_ttl(patch_file, "patch")
+            with open(patch_file) as f:
+                patches.append(f.read())
+        # Blank nodes are labelled by their axiom, so the patch doesn't depend on the parse
+        assert patches[0] == patches[1]
+        split = rdflib.Graph().parse(split_file, format="ttl")
+        model = rdflib.Graph().parse(model_file, format="ttl")
+        assert isomorphic(apply_patch(relabelled(model), patches[0]), split), model_file
+
+        # The SPARQL update matches axioms by content, so any store can run it
+        update_file = str(tmp_path / "split.ru")
+        builder.parse_ttl(model_file).split_evidence_and_write_ttl(update_file, "sparql")
+        with open(update_file) as f:
+            update = f.read()
+        updated = relabelled(model)
+        if update:
+            updated.update(update)
+        assert isomorphic(updated, split), model_file
+
+
+def test_patch_format(tmp_path, builder):
+    patch_file = str(tmp_path / "split.rdfp")
+    builder.parse_ttl("resources/test/SYNGO_5371.ttl").split_evidence_and_write_ttl(patch_file, "patch")
+    with open(patch_file) as f:
+        lines = f.read().splitlines()
+    assert lines[0] == "TX ." and lines[-1] == "TC ."
+    ops = [line.split(" ", 1)[0] for line in lines[1:-1]]
+    # Evidence moves off the original axioms first, then the new axioms and individuals are added
+    assert set(ops) == {"A", "D"} and ops.index("A") == ops.count("D")
+    with pytest.raises(ValueError):
+        apply_patch(rdflib.Graph(), "X <http://x/a> <http://x/b> <http://x/c> .")
+
+
+def test_corpus_patch(tmp_path):
+    for output_format in ("ttl", "patch"):
+        main(["-d", "resources/test", "-o", ontology_file, "--split-evidence", "--output-dir",
+              str(tmp_path / output_format), "--output-format", output_format, "--report-file",
+              str(tmp_path / f"{output_format}.tsv")])
+    with open(tmp_path / "ttl.tsv") as f, open(tmp_path / "patch.tsv") as patch_report:
+        assert f.read() == patch_report.read()
+    # Unchanged models get an empty patch
+    assert os.path.getsize(tmp_path / "patch" / "R-HSA-9937080.rdfp") == 0
+
+    corpus = rdflib.Graph()
+    expected = rdflib.Graph()
+    for model_file in sorted(glob.glob("resources/test/*.ttl")):
+        corpus.parse(model_file, format="ttl")
+        expected.parse(str(tmp_path / "ttl" / os.path.basename(model_file)), format="ttl")
+    with open(tmp_path / "patch" / "corpus.rdfp") as f:
+        apply_patch(corpus, f.read())
+    assert labelled_triples(corpus) == labelled_triples(expected)
+
+
+def test_corpus_sparql_update(tmp_path):
+    main(["-d", "resources/test", "-o", ontology_file, "--split-evidence", "--output-dir", str(tmp_path),
+          "--output-format", "sparql", "--report-file", str(tmp_path / "report.tsv")])
+    model_updates = []
+    for model_file in sorted(glob.glob("resources/test/*.ttl")):
+        with open(tmp_path / (strip_model_extension(os.path.basename(model_file)) + ".ru")) as f:
+            model_updates.append(f.read())
+    assert model_updates[0] == ""  # 61452e3d00000323 is unchanged
+    # Every operation ends with ";", so the corpus update is the models' updates one after another
+    with open(tmp_path / "corpus.ru") as f:
+        assert f.read() == "".join(model_updates)
+    rdflib.Graph().update("".join(model_updates[-2:]))  # parses as one request
@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from gocam_unwinder.cli import main
+from gocam_unwinder.report import read_report, report_totals
+from gocam_unwinder.sampling import ESTIMATE_HEADERS, allocate, draw_sample, estimate_corpus
+
+ontology_file = "target/go_20250601.json"
+
+
+def read_estimates(estimates_file):
+    with open(estimates_file) as f:
+        assert f.readline().startswith("# Estimated from")
+        assert f.readline().rstrip("\n").split("\t") == ESTIMATE_HEADERS
+        return {line.split("\t")[0]: line.rstrip("\n").split("\t")[1:] for line in f}
+
+
+def test_allocate():
+    assert allocate([10, 10, 10], 6) == [2, 2, 2]
+    assert allocate([80, 10, 10], 10) == [6, 2, 2]
+    assert allocate([1, 10, 100], 20) == [1, 2, 17]
+    assert allocate([3, 4], 10) == [3, 4]
+    assert allocate([10, 10, 10], 2) == [1, 1, 0]
+
+
+def test_draw_sample():
+    model_sizes = [(f"model{i}", i * 100) for i in range(50)]
+    sample = draw_sample(model_sizes, 12, seed=7, strata=3)
+    assert sample.population_size() == 50 and sample.sample_size() == 12
+    # Strata are the smallest, middle and largest models
+    assert "model0" in sample.strata[0] and "model49" in sample.strata[2]
+    assert [len(sampled) for sampled in sample.sampled] == [4, 4, 4]
+    # The same sample whatever the listing order; a different one for another seed
+    shuffled = list(model_sizes)
+    random.Random(1).shuffle(shuffled)
+    assert draw_sample(shuffled, 12, seed=7, strata=3).model_ids == sample.model_ids
+    assert draw_sample(model_sizes, 12, seed=8, strata=3).model_ids != sample.model_ids
+
+
+def test_estimates_cover_population():
+    rng = random.Random(3)
+    rows = {}
+    for i in range(2000):
+        standard = rng.randint(0, 30)
+        non_standard = 1 if rng.random() < 0.1 else 0
+        rows[f"model{i}"] = [f"gomodel:model{i}", "", str(standard), str(non_standard), str(standard // 10),
+                             "Yes" if standard and non_standard else "No"]
+    true_total = sum(int(row[2]) for row in rows.values())
+    true_share = sum(row[3] == "1" for row in rows.values()) / len(rows)
+    covered = 0
+    for seed in range(40):
+        sample = draw_sample([(model_id, 0) for model_id in rows], 200, seed)
+        estimates = estimate_corpus(sample, {model_id: rows[model_id] for model_id in sample.model_ids})
+        standard, non_standard = estimates[1], estimates[2]
+        assert float(standard[3]) <= float(standard[2]) <= float(standard[4])
+        covered += float(standard[3]) <= true_total <= float(standard[4])
+        covered += float(non_standard[6]) <= true_share <= float(non_standard[7])
+    assert covered >= 70
+
+
+def test_sample_cli(tmp_path):
+    full_report = str(tmp_path / "full.tsv")
+    main(["-d", "resources/test", "-o", ontology_file, "--report-file", full_report])
+    full_rows = read_report(full_report)
+
+    report = str(tmp_path / "report.tsv")
+    estimates = str(tmp_path / "estimates.tsv")
+    main(["-d", "resources/test", "-o", ontology_file, "--report-file", report, "--sample", "3",
+          "--sample-strata", "2", "--estimates-file", estimates])
+    rows = read_report(report)
+    assert len(rows) == 3 and all(row in full_rows for row in rows)
+    by_column = read_estimates(estimates)
+    assert by_column["Models"][:2] == ["3", "7"]
+    assert by_column["Standard Annotations"][0] == str(sum(int(row[2]) for row in rows))
+
+    # Sampling every model gives the exact totals, with no uncertainty
+    main(["-d", "resources/test", "-o", ontology_file, "--report-file", report, "--sample-fraction", "1",
+          "--estimates-file", estimates])
+    by_column = read_estimates(estimates)
+    totals = report_totals(full_rows)
+    for column, total in zip(["Standard Annotations", "Non-Standard Annotations", "Multi-Evidence Annotations",
+                              "Mixed Annotation Type"], totals[2:]):
+        estimate, low, high = (float(value) for value in by_column[column][1:4])
+        assert estimate == low == high == int(total)
+
+
+def test_sample_requires_models_folder():
+    with pytest.raises(SystemExit):
+        main(["-m", "resources/test/SYNGO_5371.ttl", "-o", ontology_file, "--sample", "1"])
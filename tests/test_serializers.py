@@ -0,0 +1,38 @@
+import glob
+
+import pytest
+import rdflib
+from rdflib.compare import isomorphic
+from gocam_unwinder.gocam_ttl import GoCamGraphBuilder
+from gocam_unwinder.serializers import serialize
+
+ontology_file = "target/go_20250601.json"
+
+
+@pytest.fixture(scope="module")
+def builder():
+    return GoCamGraphBuilder(ontology_file)
+
+
+@pytest.mark.parametrize("model_file", sorted(glob.glob("resources/test/*.ttl")))
+def test_streaming_writers_round_trip(builder, model_file, tmp_path):
+    gocam_graph = builder.parse_ttl(model_file)
+    gocam_graph.split_evidence_and_write_ttl(str(tmp_path / "split.ttl"))
+    expected = rdflib.Graph().parse(str(tmp_path / "split.ttl"), format="ttl")
+
+    serialize(gocam_graph.g, str(tmp_path / "split_fast.ttl"), "ttl-fast")
+    serialize(gocam_graph.g, str(tmp_path / "split.nt"), "nt")
+    assert isomorphic(expected, rdflib.Graph().parse(str(tmp_path / "split_fast.ttl"), format="ttl"))
+    assert isomorphic(expected, rdflib.Graph().parse(str(tmp_path / "split.nt"), format="nt"))
+
+
+def test_literal_escaping(tmp_path):
+    g = rdflib.Graph()
+    subject = rdflib.URIRef("http://example.org/a")
+    g.add((subject, rdflib.RDFS.comment, rdflib.Literal('line "one"\nline \\two\r')))
+    g.add((subject, rdflib.RDFS.label, rdflib.Literal("label", lang="en")))
+    g.add((subject, rdflib.RDFS.seeAlso, rdflib.BNode("b1")))
+    for output_format, parse_format in [("nt", "nt"), ("ttl-fast", "ttl")]:
+        filename = str(tmp_path / f"out.{parse_format}")
+        serialize(g, filename, output_format)
+        assert isomorphic(g, rdflib.Graph().parse(filename, format=parse_format))
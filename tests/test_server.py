@@ -0,0 +1,69 @@
+import io
+import json
+import threading
+import urllib.request
+
+import pytest
+import rdflib
+from rdflib.compare import isomorphic
+
+from gocam_unwinder.server import UnwinderService, make_http_server, serve_jsonl
+
+ontology_file = "target/go_20250601.json"
+model_file = "resources/test/MGI_MGI_1335098.ttl"
+
+
+@pytest.fixture(scope="module")
+def service(tmp_path_factory):
+    return UnwinderService(ontology_file, str(tmp_path_factory.mktemp("ontology_cache")))
+
+
+def test_analyze_and_split(service, tmp_path):
+    response = service.handle({"id": 1, "op": "analyze", "model": model_file})
+    assert response["ok"] and response["id"] == 1
+    assert response["row"]["Model ID"] == "gomodel:MGI_MGI_1335098"
+    assert response["row"]["Standard Annotations"] == "34"
+    assert response["latency_ms"] > 0 and "parse" in response["phases"]
+
+    with open(model_file) as f:
+        ttl = f.read()
+    inline = service.handle({"id": 2, "op": "split", "ttl": ttl, "model_id": "MGI_MGI_1335098", "output_format": "nt"})
+    assert inline["row"] == response["row"]
+    service.handle({"op": "split", "model": model_file, "output_dir": str(tmp_path), "output_format": "nt"})
+    expected = rdflib.Graph().parse(str(tmp_path / "MGI_MGI_1335098.nt"), format="nt")
+    assert isomorphic(rdflib.Graph().parse(data=inline["output"], format="nt"), expected)
+
+    assert not service.handle({"op": "analyze", "model": "resources/test/missing.ttl"})["ok"]
+    assert not service.handle({"op": "analyze", "ttl": "not turtle", "model_id": "bad"})["ok"]
+    assert not service.handle({"op": "unwind"})["ok"]
+    builder = service.builder
+    assert service.handle({"op": "reload"})["ok"] and service.builder is not builder
+    stats = service.handle({"op": "stats"})
+    assert stats["requests"] >= 6 and stats["errors"] >= 3
+
+
+def test_jsonl_protocol(service):
+    requests = [{"id": i, "op": "analyze", "model": model_file} for i in range(4)]
+    lines = [json.dumps(request) for request in requests] + ["{oops"]
+    output = io.StringIO()
+    serve_jsonl(service, io.StringIO("\n".join(lines)), output, workers=2)
+    responses = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert sorted(r["id"] for r in responses if r["ok"]) == [0, 1, 2, 3]
+    assert [r["error"] for r in responses if not r["ok"]][0].startswith("Invalid JSON")
+
+
+def test_http(service):
+    server = make_http_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        request = urllib.request.Request(f"{url}/analyze", data=json.dumps({"model": model_file}).encode(),
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request) as response:
+            assert json.load(response)["row"]["Multi-Evidence Annotations"] == "10"
+        with urllib.request.urlopen(f"{url}/stats") as response:
+            assert json.load(response)["requests"] >= 1
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,49 @@
+import pytest
+
+from gocam_unwinder.cli import main
+from gocam_unwinder.report import REPORT_HEADERS, read_report
+from gocam_unwinder.sharding import balance_by_size, parse_shard, shard_of
+
+ontology_file = "target/go_20250601.json"
+
+
+def test_parse_shard():
+    assert parse_shard("1/4") == (0, 4)
+    assert parse_shard("4/4") == (3, 4)
+    for text in ("0/4", "5/4", "1", "a/b"):
+        with pytest.raises(ValueError):
+            parse_shard(text)
+    assert shard_of("MGI_MGI_1335098", 7) == shard_of("MGI_MGI_1335098", 7)
+
+
+def test_balance_by_size():
+    shards = balance_by_size([("a", 10), ("b", 6), ("c", 5), ("d", 4), ("a", 1)], 2)
+    assert shards == [{"a", "d"}, {"b", "c"}]
+
+
+@pytest.mark.parametrize("balance", ["hash", "size"])
+def test_shards_merge(tmp_path, capsys, balance):
+    reports = []
+    for i in range(1, 4):
+        report = str(tmp_path / f"report.{i}.tsv")
+        main(["-d", "resources/test", "-o", ontology_file, "--report-file", report,
+              "--shard", f"{i}/3", "--shard-balance", balance])
+        reports.append(report)
+    shard_ids = [[row[0] for row in read_report(report)] for report in reports]
+    assert sum(len(ids) for ids in shard_ids) == len(set().union(*shard_ids)) == 7
+
+    merged = str(tmp_path / "report.tsv")
+    main(["merge-reports", *reports, "-d", "resources/test", "--output", merged])
+    main(["-d", "resources/test", "-o", ontology_file, "--report-file", str(tmp_path / "single.tsv")])
+    rows = read_report(merged)
+    assert rows[:-1] == sorted(read_report(str(tmp_path / "single.tsv")))
+    assert rows[-1][:2] == ["Total", "7 models"]
+    assert int(rows[-1][2]) == sum(int(row[2]) for row in rows[:-1])
+    with open(merged) as f:
+        assert f.readline().rstrip("\n").split("\t") == REPORT_HEADERS
+
+    capsys.readouterr()
+    with pytest.raises(SystemExit):
+        main(["merge-reports", reports[0], reports[0], reports[2], "-d", "resources/test"])
+    errors = capsys.readouterr().err
+    assert "appears 2 times" in errors and "is missing" in errors
@@ -0,0 +1,27 @@
+from gocam_unwinder.gocam_ttl import GoCamGraphBuilder
+from gocam_unwinder.synthetic import generate_gocam_ttl, write_gocam_ttl
+
+ontology_file = "target/go_20250601.json"
+
+
+def test_synthetic_models(tmp_path):
+    builder = GoCamGraphBuilder(ontology_file)
+    model_file = str(tmp_path / "synthetic.ttl")
+
+    # Chains of 4 annotations, each 3 edges plus the causal edges linking them
+    write_gocam_ttl(model_file, annotations=20, edges_per_annotation=3, evidence_per_edge=2, chain_depth=4)
+    gocam_graph = builder.parse_ttl(model_file)
+    assert len(gocam_graph.standard_annotations) == 5
+    assert len(gocam_graph.non_standard_annotations) == 0
+    assert all(len(std_annot.edges) == 4 * 3 + 3 for std_annot in gocam_graph.standard_annotations)
+    assert len(builder.scan_ttl(model_file).standard_annotations) == 5
+
+    # No shared metadata makes every multi-evidence annotation inconsistent
+    write_gocam_ttl(model_file, annotations=20, metadata_collision_rate=0.0)
+    gocam_graph = builder.parse_ttl(model_file)
+    assert len(gocam_graph.standard_annotations) == 0
+    assert len(gocam_graph.non_standard_annotations) == 20
+
+    # Same seed, same model
+    assert generate_gocam_ttl(annotations=10, metadata_collision_rate=0.5, seed=3) == \
+        generate_gocam_ttl(annotations=10, metadata_collision_rate=0.5, seed=3)
@@ -0,0 +1,87 @@
+import glob
+import os
+import re
+
+import pytest
+import rdflib
+
+from gocam_unwinder.cli import main
+from gocam_unwinder.gocam_ttl import GoCamGraphBuilder
+from gocam_unwinder.triage import may_have_multi_evidence, model_may_have_multi_evidence
+
+ontology_file = "target/go_20250601.json"
+EVIDENCE = rdflib.URIRef("http://geneontology.org/lego/evidence")
+# Keeps only the first evidence of each axiom written in the usual one-line form
+SINGLE_EVIDENCE_RE = re.compile(rb'(<http://geneontology.org/lego/evidence> <[^>]+>)(?: , <[^>]+>)+')
+
+
+def max_evidence_per_subject(g):
+    counts = {}
+    for subj, _, _ in g.triples((None, EVIDENCE, None)):
+        counts[subj] = counts.get(subj, 0) + 1
+    return max(counts.values(), default=0)
+
+
+@pytest.fixture(scope="module")
+def single_evidence_models(tmp_path_factory):
+    models_dir = tmp_path_factory.mktemp("single_evidence")
+    for model_file in glob.glob("resources/test/*.ttl"):
+        with open(model_file, 'rb') as f:
+            data = SINGLE_EVIDENCE_RE.sub(rb'\1', f.read())
+        with open(models_dir / os.path.basename(model_file), 'wb') as f:
+            f.write(data)
+    return str(models_dir)
+
+
+def test_triage_matches_full_parse(single_evidence_models):
+    builder = GoCamGraphBuilder(ontology_file)
+    negatives = 0
+    for model_file in sorted(glob.glob("resources/test/*.ttl") + glob.glob(f"{single_evidence_models}/*.ttl")):
+        gocam_graph = builder.parse_ttl(model_file)
+        if not model_may_have_multi_evidence(model_file):
+            negatives += 1
+            assert max_evidence_per_subject(gocam_graph.g) <= 1, model_file
+            assert gocam_graph.plan_split().is_empty()
+        else:
+            assert model_file.startswith(single_evidence_models) or max_evidence_per_subject(gocam_graph.g) > 1
+    # Reactome's pretty-printed Turtle writes evidence on continuation lines, so it's never cleared
+    assert negatives == 6
+
+
+HEADER = """@prefix lego: <http://geneontology.org/lego/> .
+@prefix owl: <http://www.w3.org/2002/07/owl#> .
+<http://geneontology.org/lego/evidence> a owl:AnnotationProperty .
+"""
+
+
+@pytest.mark.parametrize("body, expected", [
+    ("_:a lego:evidence <http://x/e1> ;\n\ta owl:Axiom .\n_:b <http://geneontology.org/lego/evidence> <http://x/e2> .\n",
+     False),
+    ("_:a lego:evidence <http://x/e1> , <http://x/e2> .\n", True),
+    ("_:a a owl:Axiom ;\n\tlego:evidence <http://x/e1> .\n", True),
+    ("_:a lego:evidence <http://x/e1> .\n_:a lego:evidence <http://x/e2> .\n", True),
+    ("_:a lego:evidence <http://x/e1> ; lego:evidence <http://x/e2> .\n", True),
+    ("[] lego:evidence <http://x/e1> , <http://x/e2> .\n", True),
+    ("<http://x/a> lego:evidence <http://x/e1> .\n<http://x/b/../a> lego:evidence <http://x/e2> .\n", True),
+    ("_:a lego:evidence <http://x/e1.x> .\n_:b <http://x/p> \"lego:evidence , ;\" .\n", True),
+])
+def test_triage_cases(body, expected):
+    data = HEADER + body
+    assert may_have_multi_evidence(data.encode()) == expected
+    if not expected:
+        assert max_evidence_per_subject(rdflib.Graph().parse(data=data, format="ttl")) <= 1
+
+
+def test_triaged_split_run(tmp_path, single_evidence_models):
+    output_dir = tmp_path / "split"
+    reports = []
+    for reader in ("auto", "rdflib"):
+        report_file = str(tmp_path / f"{reader}.tsv")
+        main(["-d", single_evidence_models, "-o", ontology_file, "--split-evidence", "--output-dir", str(output_dir),
+              "--report-file", report_file, "--reader", reader])
+        with open(report_file) as f:
+            reports.append(f.read())
+    assert reports[0] == reports[1]
+    for model_file in glob.glob(f"{single_evidence_models}/*.ttl"):
+        with open(model_file, 'rb') as f, open(output_dir / os.path.basename(model_file), 'rb') as copied:
+            assert f.read() == copied.read()
@@ -0,0 +1,77 @@
+import glob
+
+import pytest
+import rdflib
+from rdflib.compare import isomorphic
+from gocam_unwinder.gocam_ttl import GoCamGraphBuilder, ReadOnlyGraphError, StreamedGoCamGraph
+from gocam_unwinder.report import report_row
+from gocam_unwinder.turtle_scan import TurtleScanner, TurtleSyntaxError
+
+ontology_file = "target/go_20250601.json"
+model_files = sorted(glob.glob("resources/test/*.ttl"))
+
+
+def rdflib_literal(value, datatype, language):
+    return rdflib.Literal(value, datatype=datatype, lang=language)
+
+
+def scanned_graph(triples):
+    g = rdflib.Graph()
+    for triple in triples:
+        g.add(triple)
+    return g
+
+
+@pytest.mark.parametrize("model_file", model_files)
+def test_scanner_reads_same_triples_as_rdflib(model_file):
+    expected = rdflib.Graph().parse(model_file, format="ttl")
+    scanned = scanned_graph(TurtleScanner(rdflib_literal).scan_file(model_file))
+    assert isomorphic(expected, scanned)
+
+
+def test_scanner_syntax():
+    doc = """@prefix ex: <http://example.org/> .
+PREFIX ex2: <http://example.org/2/>
+ex:a ex:p "x\\"y\\u00e9"@en , 'z' , \"\"\"multi
+line\"\"\" , 12 , 1.5 , true ; ex:q [ ex:r ( ex:b ex2:c ) ] ;; .
+[ ex:s ex2:t ] .
+_:b1 a ex:C .
+"""
+    expected = rdflib.Graph().parse(data=doc, format="ttl")
+    assert isomorphic(expected, scanned_graph(TurtleScanner(rdflib_literal).scan(doc)))
+    with pytest.raises(TurtleSyntaxError):
+        list(TurtleScanner().scan("ex:a <http://example.org/p> ex:b ."))
+
+
+def annotation_signature(annotations):
+    return sorted(sorted((str(e.source_uri), str(e.property_uri), str(e.target_uri), sorted(map(str, e.evidence_uris)))
+                         for e in sa.edges.values()) for sa in annotations)
+
+
+def test_streamed_analysis_matches_rdflib():
+    builder = GoCamGraphBuilder(ontology_file)
+    for model_file in model_files:
+        parsed = builder.parse_ttl(model_file)
+        streamed = builder.scan_ttl(model_file)
+        assert isinstance(streamed, StreamedGoCamGraph)
+        assert report_row(streamed, "model") == report_row(parsed, "model"), model_file
+        assert annotation_signature(streamed.standard_annotations) == annotation_signature(parsed.standard_annotations)
+        assert annotation_signature(streamed.non_standard_annotations) == annotation_signature(parsed.non_standard_annotations)
+        assert streamed.get_evidence_signatures() == parsed.get_evidence_signatures()
+
+
+def test_streamed_graph_is_read_only(tmp_path):
+    builder = GoCamGraphBuilder(ontology_file)
+    streamed = builder.scan_ttl("resources/test/MGI_MGI_1927246.ttl")
+    triple = (rdflib.URIRef("http://example.org/s"), rdflib.RDF.type, rdflib.OWL.NamedIndividual)
+    with pytest.raises(ReadOnlyGraphError, match="read-only"):
+        streamed.add_triple(triple)
+    with pytest.raises(ReadOnlyGraphError, match="read-only"):
+        streamed.remove_triple(triple)
+    with pytest.raises(TypeError, match="read-only"):
+        streamed.write_ttl(str(tmp_path / "out.ttl"))
+    assert not (tmp_path / "out.ttl").exists()
+    # Splitting changes the graph, so it fails the same way; planning doesn't
+    assert not streamed.plan_split().is_empty()
+    with pytest.raises(ReadOnlyGraphError):
+        streamed.split_evidence()
@@ -0,0 +1,134 @@
+import glob
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from gocam_unwinder.cli import main
+from gocam_unwinder.gocam_ttl import GoCamGraph, GoCamGraphBuilder
+from gocam_unwinder.watchdog import QuarantinedModel, process_model_files_watched, rss_available
+
+ontology_file = "target/go_20250601.json"
+
+
+def read_report(report_file):
+    with open(report_file) as f:
+        return f.read().splitlines()
+
+
+def make_models_pathological(monkeypatch):
+    # Forked workers inherit the patched method
+    extract_standard_annotations = GoCamGraph.extract_standard_annotations
+
+    def misbehave(self, *args, **kwargs):
+        title = str(self.title)
+        if title.startswith("Tnfsf11"):
+            while True:
+                time.sleep(0.01)
+        if title.startswith("Lig4"):
+            ballast = b"x" * (200 * 1024 * 1024)
+            time.sleep(60)
+            return ballast
+        if title.startswith("Zfp326"):
+            raise RuntimeError("unreadable model")
+        return extract_standard_annotations(self, *args, **kwargs)
+
+    monkeypatch.setattr(GoCamGraph, "extract_standard_annotations", misbehave)
+
+
+@pytest.mark.skipif(not rss_available(), reason="requires /proc")
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_quarantine(tmp_path, monkeypatch, jobs):
+    expected_file = tmp_path / "expected.tsv"
+    main(["-d", "resources/test", "-o", ontology_file, "--report-file", str(expected_file)])
+    make_models_pathological(monkeypatch)
+
+    report_file = tmp_path / "report.tsv"
+    quarantine_file = tmp_path / "quarantine.jsonl"
+    output_dir = tmp_path / "split"
+    start = time.monotonic()
+    main(["-d", "resources/test", "-o", ontology_file, "--report-file", str(report_file), "--split-evidence",
+          "--output-dir", str(output_dir), "--model-timeout", "5", "--model-max-rss", "100",
+          "--quarantine-report", str(quarantine_file), "-j", jobs])
+    assert time.monotonic() - start < 30
+
+    # The other models are processed as usual, in order
+    quarantined = {"gomodel:MGI_MGI_1100089", "gomodel:MGI_MGI_1335098", "gomodel:MGI_MGI_1927246"}
+    expected = [row for row in read_report(expected_file) if row.split("\t")[0] not in quarantined]
+    assert read_report(report_file) == expected
+    assert sorted(os.listdir(output_dir)) == ["61452e3d00000323.ttl", "R-HSA-9937080.ttl", "SGD_S000004491.ttl",
+                                             "SYNGO_5371.ttl"]
+
+    with open(quarantine_file) as f:
+        records = [json.loads(line) for line in f]
+    assert [(r["model"], r["reason"], r["phase"]) for r in records] == [
+        ("MGI_MGI_1100089.ttl", "timeout", "extract_standard_annotations"),
+        ("MGI_MGI_1335098.ttl", "memory", "extract_standard_annotations"),
+        ("MGI_MGI_1927246.ttl", "error", "extract_standard_annotations"),
+    ]
+    timeout, memory, error = records
+    assert timeout["seconds"] >= 5
+    assert memory["rss_growth_mb"] > 100
+    assert error["detail"] == "RuntimeError: unreadable model"
+    for record in records:
+        assert record["size_bytes"] == os.path.getsize(os.path.join("resources/test", record["model"]))
+        # Parsed and with edges extracted before being stopped in extract_standard_annotations
+        assert record["counts"]["triples"] > 0 and record["counts"]["edges"] > 0
+        assert record["counts"]["evidence"] >= record["counts"]["edges"]
+
+
+def test_workers_dont_inherit_feeder_locks(monkeypatch):
+    # Held by the thread reading the models whenever it waits for the next one, as a tar reader's
+    # or a queue's lock might be. A worker forked while it's held would copy it locked.
+    lock = threading.Lock()
+
+    def models():
+        for model_file in sorted(glob.glob("resources/test/*.ttl")):
+            with lock:
+                yield model_file
+
+    extract_standard_annotations = GoCamGraph.extract_standard_annotations
+
+    def locking(self, *args, **kwargs):
+        with lock:
+            return extract_standard_annotations(self, *args, **kwargs)
+
+    builder = GoCamGraphBuilder(ontology_file)
+    monkeypatch.setattr(GoCamGraph, "extract_standard_annotations", locking)
+    for jobs in (1, 2):
+        results = list(process_model_files_watched(builder, models(), jobs, model_timeout=10))
+        assert len(results) == 7
+        assert not [result.message() for result in results if isinstance(result, QuarantinedModel)]
+
+
+def test_crashed_worker_is_replaced(monkeypatch):
+    extract_standard_annotations = GoCamGraph.extract_standard_annotations
+
+    def crash(self, *args, **kwargs):
+        if str(self.title).startswith("Zfp326"):
+            os._exit(3)
+        return extract_standard_annotations(self, *args, **kwargs)
+
+    builder = GoCamGraphBuilder(ontology_file)
+    monkeypatch.setattr(GoCamGraph, "extract_standard_annotations", crash)
+    results = list(process_model_files_watched(builder, sorted(glob.glob("resources/test/*.ttl")), 1,
+                                               model_timeout=10))
+    crashed = [result.record() for result in results if isinstance(result, QuarantinedModel)]
+    assert [(r["model"], r["reason"], r["detail"]) for r in crashed] == [
+        ("MGI_MGI_1927246.ttl", "crashed", "exit code 3")]
+    assert len(results) == 7
+
+
+def test_watched_run_matches(tmp_path):
+    expected_file = tmp_path / "expected.tsv"
+    main(["-d", "resources/test", "-o", ontology_file, "--report-file", str(expected_file)])
+    report_file = tmp_path / "report.tsv"
+    main(["-d", "resources/test", "-o", ontology_file, "--report-file", str(report_file), "--model-timeout", "60"])
+    assert read_report(report_file) == read_report(expected_file)
+
+
+def test_quarantine_report_requires_budget():
+    with pytest.raises(SystemExit):
+        main(["-d", "resources/test", "-o", ontology_file, "--quarantine-report", "quarantine.jsonl"])